@@ -0,0 +1,203 @@
+"""Adaptive vs fixed concurrency against a Gemini fake with injected slowdowns.
+
+A pool of worker threads calls the real `call_gemini` (and so the "gemini"
+adaptive limiter) in a loop against `FakeGenaiClient`. The fake serves
+`capacity` calls at full speed, slows every call down in proportion beyond
+that, and rejects calls with a 429 once twice the capacity is in flight. A
+schedule of phases changes the capacity and latency mid-run. For each mode the
+report holds, per phase, the throughput, error rate, latency percentiles
+(including time queued behind the limiter) and the mean limit, plus a timeline
+of the limit.
+
+The run checks the adaptive limiter against the fixed modes, phase by phase,
+and exits with status 1 if it loses: it must stay (nearly) error-free where
+every fixed limit did, see less than half the errors of the worst fixed limit
+where one overloaded the backend, and serve at least 90% of the throughput of
+the best error-free fixed limit.
+
+Usage (from the project root):
+    python -m benchmarks.bench_adaptive --modes adaptive,fixed-4,fixed-16 \
+        --schedule normal:8:1:8,slow:8:2:3,recover:8:1:8 --output adaptive.json
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import threading
+import time
+
+from benchmarks.common import log_to_temp_dir, summarize_latencies, write_results
+from benchmarks.fakes import FakeGenaiClient
+
+
+def parse_schedule(value):
+    """'name:seconds:slowdown:capacity,...' -> list of phase dicts."""
+    phases = []
+    for item in value.split(","):
+        name, seconds, slowdown, capacity = item.split(":")
+        phases.append(
+            {"name": name, "seconds": float(seconds), "slowdown": float(slowdown), "capacity": int(capacity)}
+        )
+    return phases
+
+
+def run_mode(mode, args, schedule):
+    from gemini.chat import call_gemini
+    from utils.concurrency_limit import get_limiter, reset_limiters
+
+    reset_limiters()
+    if mode == "adaptive":
+        limiter = get_limiter("gemini", max_limit=args.workers)
+    else:
+        n = int(mode.split("-", 1)[1])
+        limiter = get_limiter("gemini", initial=n, min_limit=n, max_limit=n)
+
+    client = FakeGenaiClient(latency=args.latency, jitter=args.jitter, capacity=schedule[0]["capacity"])
+    stop = threading.Event()
+    lock = threading.Lock()
+    current = {"phase": schedule[0]["name"]}
+    stats = {p["name"]: {"latencies": [], "errors": 0, "limits": []} for p in schedule}
+    timeline = []
+
+    def worker():
+        chat = client.chats.create(model="gemini-2.5-flash")
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                call_gemini("benchmark prompt", chat)
+            except Exception:
+                with lock:
+                    stats[current["phase"]]["errors"] += 1
+                time.sleep(args.latency * 0.1)  # Callers back off briefly after an error
+                continue
+            # Calls count towards the phase they finish in
+            with lock:
+                stats[current["phase"]]["latencies"].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(args.workers)]
+    run_start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+
+    for phase in schedule:
+        current["phase"] = phase["name"]
+        client.slowdown = phase["slowdown"]
+        client.capacity = phase["capacity"]
+        phase_end = time.perf_counter() + phase["seconds"]
+        while time.perf_counter() < phase_end:
+            time.sleep(args.sample_interval)
+            stats[phase["name"]]["limits"].append(limiter.limit)
+            timeline.append(
+                {
+                    "t": round(time.perf_counter() - run_start, 2),
+                    "phase": phase["name"],
+                    "limit": limiter.limit,
+                    "inflight": limiter.inflight,
+                }
+            )
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    phases = []
+    for phase in schedule:
+        s = stats[phase["name"]]
+        completed = len(s["latencies"])
+        attempts = completed + s["errors"]
+        phases.append(
+            {
+                **phase,
+                "completed": completed,
+                "throughput_per_s": round(completed / phase["seconds"], 2),
+                "error_rate": round(s["errors"] / attempts, 4) if attempts else 0.0,
+                "latency_ms": summarize_latencies(s["latencies"]),
+                "mean_limit": round(sum(s["limits"]) / len(s["limits"]), 2) if s["limits"] else None,
+            }
+        )
+
+    metrics = limiter.metrics()
+    metrics.pop("decisions")
+    return {"mode": mode, "phases": phases, "limiter": metrics, "timeline": timeline}
+
+
+def check_results(results, max_error_rate=0.01, min_throughput_ratio=0.9):
+    """Compare the adaptive run with the fixed runs, phase by phase.
+
+    A phase is healthy when every fixed limit got through it without errors.
+    There the adaptive limiter must stay (nearly) error-free. In an overloaded
+    phase it must see less than half the error rate of the worst fixed limit.
+    In every phase it must serve at least `min_throughput_ratio` of the best
+    error-free fixed limit.
+
+    Returns:
+        One message per check the adaptive limiter failed.
+    """
+    by_mode = {result["mode"]: {p["name"]: p for p in result["phases"]} for result in results}
+    adaptive = by_mode.pop("adaptive", None)
+    if adaptive is None or not by_mode:
+        return []
+
+    failures = []
+    for name, ours in adaptive.items():
+        fixed = {mode: phases[name] for mode, phases in by_mode.items()}
+        worst = max(fixed, key=lambda mode: fixed[mode]["error_rate"])
+        if fixed[worst]["error_rate"] == 0:
+            if ours["error_rate"] > max_error_rate:
+                failures.append(f"{name}: adaptive error rate {ours['error_rate']} in a healthy phase")
+        elif ours["error_rate"] >= fixed[worst]["error_rate"] / 2:
+            failures.append(
+                f"{name}: adaptive error rate {ours['error_rate']}, {worst} {fixed[worst]['error_rate']}"
+            )
+        clean = [mode for mode in fixed if fixed[mode]["error_rate"] == 0]
+        if clean:
+            best = max(clean, key=lambda mode: fixed[mode]["throughput_per_s"])
+            if ours["throughput_per_s"] < fixed[best]["throughput_per_s"] * min_throughput_ratio:
+                failures.append(
+                    f"{name}: adaptive served {ours['throughput_per_s']}/s, {best} {fixed[best]['throughput_per_s']}/s"
+                )
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--modes", default="adaptive,fixed-4,fixed-16", help="'adaptive' and/or 'fixed-N'.")
+    parser.add_argument(
+        "--schedule",
+        type=parse_schedule,
+        default=parse_schedule("normal:8:1:8,slow:8:2:3,recover:8:1:8"),
+        help="Phases as name:seconds:slowdown:capacity, comma-separated.",
+    )
+    parser.add_argument("--workers", type=int, default=32, help="Caller threads (and the adaptive maximum).")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per call at or below capacity.")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Latency std-dev as a fraction of the mean.")
+    parser.add_argument("--sample-interval", type=float, default=0.25, help="Seconds between limit samples.")
+    parser.add_argument("--output", default="-", help="JSON output path ('-' for stdout).")
+    args = parser.parse_args(argv)
+    log_to_temp_dir()
+
+    results = []
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        # Overload errors are logged by nothing here, but keep stray output out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = run_mode(mode, args, args.schedule)
+        results.append(result)
+        for phase in result["phases"]:
+            print(
+                f"{mode:<10} {phase['name']:<9} {phase['throughput_per_s']:>7}/s  "
+                f"errors={phase['error_rate']:<7} p50={phase['latency_ms'].get('p50')}ms "
+                f"p99={phase['latency_ms'].get('p99')}ms  limit~{phase['mean_limit']}",
+                file=sys.stderr,
+            )
+
+    config = {k: v for k, v in vars(args).items() if k != "output"}
+    write_results(args.output, "adaptive_concurrency", results, config)
+    failures = check_results(results)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
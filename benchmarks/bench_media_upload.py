@@ -0,0 +1,219 @@
+"""Memory and CPU benchmark for video upload media sources.
+
+Uploads a generated file to `FakeYouTubeServer` with each media source, at
+several file sizes and concurrency levels, and reports the peak RSS growth, CPU
+time and wall time. Every case runs in a fresh interpreter, since peak RSS is a
+per-process high-water mark. The fake server runs in the same process and reads
+request bodies in 1 MiB blocks, which adds the same cost to every source.
+
+Mapped file pages count towards RSS but are the page cache itself, not extra
+memory, so on Linux the peak growth of anonymous memory (`RssAnon`, sampled
+every few milliseconds) is reported as well; it is the memory an upload really
+costs.
+
+Sources:
+    file          MediaFileUpload(chunksize=-1), the previous upload_video path
+    file+sha256   the same, plus the separate read pass needed to hash the file
+    file-chunked  MediaFileUpload with --chunk-mb chunks read into bytes
+    mmap          MmapMediaUpload with --chunk-mb chunks, hashing included
+
+Usage (from the project root):
+    python -m benchmarks.bench_media_upload --sizes-mb 64,512 --concurrency 1,4 --output media.json
+"""
+
+import argparse
+import hashlib
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.common import PROJECT_ROOT, log_to_temp_dir, write_results
+
+SOURCES = ("file", "file+sha256", "file-chunked", "mmap")
+
+
+def _max_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _rss_anon_mb():
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class _AnonSampler(threading.Thread):
+    """Track the peak of RssAnon while the uploads run."""
+
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.baseline = _rss_anon_mb()
+        self.peak = self.baseline
+        self._done = threading.Event()
+
+    def run(self):
+        while self.baseline is not None and not self._done.wait(self.interval):
+            self.peak = max(self.peak, _rss_anon_mb())
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        if self.baseline is None:
+            return None
+        return round(max(self.peak, _rss_anon_mb()) - self.baseline, 1)
+
+
+def _cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _make_media(source, path, chunk_bytes):
+    from googleapiclient.http import MediaFileUpload
+    from youtube.media import MmapMediaUpload
+
+    if source in ("file", "file+sha256"):
+        return MediaFileUpload(path, chunksize=-1, resumable=True)
+    if source == "file-chunked":
+        return MediaFileUpload(path, chunksize=chunk_bytes, resumable=True)
+    return MmapMediaUpload(path, chunksize=chunk_bytes)
+
+
+def run_child(source, path, concurrency, chunk_mb):
+    """Upload `path` `concurrency` times in parallel and print the measurements."""
+    from benchmarks.fakes import FakeYouTubeServer
+
+    chunk_bytes = chunk_mb * 1024 * 1024
+    with FakeYouTubeServer() as server:
+        clients = [server.build_client() for _ in range(concurrency)]
+        rss_before = _max_rss_mb()
+        cpu_before = _cpu_seconds()
+        errors = []
+
+        def upload(youtube):
+            try:
+                media = _make_media(source, path, chunk_bytes)
+                request = youtube.videos().insert(
+                    part="snippet,status", body={"snippet": {"title": "bench"}}, media_body=media
+                )
+                response = None
+                while response is None:
+                    _, response = request.next_chunk()
+                if source == "file+sha256":
+                    _sha256_file(path)
+                elif source == "mmap":
+                    media.close()
+                    assert media.hexdigest()
+            except Exception as e:
+                errors.append(repr(e))
+
+        sampler = _AnonSampler()
+        sampler.start()
+        start = time.perf_counter()
+        threads = [threading.Thread(target=upload, args=(c,)) for c in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - start
+        anon_growth = sampler.stop()
+
+        print(json.dumps({
+            "peak_rss_growth_mb": round(_max_rss_mb() - rss_before, 1),
+            "peak_anon_growth_mb": anon_growth,
+            "cpu_s": round(_cpu_seconds() - cpu_before, 3),
+            "wall_s": round(wall, 3),
+            "bytes_received": server.stats["bytes_received"],
+            "errors": errors,
+        }))
+
+
+def make_file(path, size_mb):
+    block = bytes(range(256)) * 4096  # 1 MiB of non-zero data
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+
+def parse_ints(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sources", default=",".join(SOURCES), help="Comma-separated sources.")
+    parser.add_argument("--sizes-mb", type=parse_ints, default=[64, 512])
+    parser.add_argument("--concurrency", type=parse_ints, default=[1, 4])
+    parser.add_argument("--chunk-mb", type=int, default=32, help="Chunk size of the chunked sources.")
+    parser.add_argument("--output", default="-", help="JSON output path ('-' for stdout).")
+    parser.add_argument("--child", nargs=3, metavar=("SOURCE", "PATH", "CONCURRENCY"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    log_to_temp_dir()
+
+    if args.child:
+        source, path, concurrency = args.child
+        run_child(source, path, int(concurrency), args.chunk_mb)
+        return 0
+
+    sources = [s for s in args.sources.split(",") if s]
+    unknown = set(sources) - set(SOURCES)
+    if unknown:
+        parser.error(f"Unknown source(s): {', '.join(sorted(unknown))}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in args.sizes_mb:
+            path = Path(tmp) / f"video-{size_mb}mb.mov"
+            make_file(path, size_mb)
+            for concurrency in args.concurrency:
+                for source in sources:
+                    proc = subprocess.run(
+                        [
+                            sys.executable, "-m", "benchmarks.bench_media_upload",
+                            "--chunk-mb", str(args.chunk_mb),
+                            "--child", source, str(path), str(concurrency),
+                        ],
+                        cwd=PROJECT_ROOT,
+                        capture_output=True,
+                        text=True,
+                    )
+                    if proc.returncode != 0:
+                        raise RuntimeError(f"{source} failed: {proc.stderr[-500:]}")
+                    result = json.loads(proc.stdout.strip().splitlines()[-1])
+                    result.update({"source": source, "size_mb": size_mb, "concurrency": concurrency})
+                    results.append(result)
+                    print(
+                        f"{source:<13} size={size_mb:>5}MB conc={concurrency:<3} "
+                        f"rss+={result['peak_rss_growth_mb']:>7}MB  anon+={result['peak_anon_growth_mb']}MB  cpu={result['cpu_s']:>7}s  "
+                        f"wall={result['wall_s']:>7}s  errors={len(result['errors'])}",
+                        file=sys.stderr,
+                    )
+
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "child")}
+    write_results(args.output, "media_upload", results, config)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+"""End-to-end throughput benchmark for description, upload and email.
+
+Drives the real `DescriptionGenerator`, the batch backlog mode,
+`upload_video`/`upload_caption`, `upload_caption_tracks` and
+`email_description` against the local fakes in `benchmarks.fakes`, across a
+grid of batch sizes and concurrency levels, and writes throughput and latency
+percentiles as JSON. Scenarios also check their results, and the run exits
+with status 1 if any item failed.
+
+Usage (from the project root):
+    python -m benchmarks.bench_services --batch-sizes 1,8,32 --concurrency 1,4,8 \
+        --gemini-latency 0.5 --output bench_services.json
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks.common import PROJECT_ROOT, log_to_temp_dir, summarize_latencies, write_results
+from benchmarks.fakes import FakeGenaiClient, FakeYouTubeServer, SmtpSink
+
+SCENARIOS = ("describe", "describe-cached", "batch", "upload", "captions", "email")
+
+
+def _timecode(ms):
+    seconds, ms = divmod(ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{ms:03d}"
+
+
+# A well-formed transcript (ordered cues, short lines), so caption uploads take
+# the normal path rather than the SRT normalizer's
+SAMPLE_SRT = "".join(
+    f"{i}\n{_timecode(i * 2000)} --> {_timecode(i * 2000 + 1900)}\n"
+    f"This is line {i} of the benchmark\ntranscript about the film.\n\n"
+    for i in range(1, 121)
+)
+
+
+def make_fixtures(workdir: Path, video_mb: int) -> dict:
+    """Create the transcript, video and description files the scenarios use."""
+    srt = workdir / "transcript.srt"
+    srt.write_text(SAMPLE_SRT, encoding="utf-8")
+
+    video = workdir / "video.mov"
+    with open(video, "wb") as f:
+        block = b"\0" * (1 << 20)
+        for _ in range(video_mb):
+            f.write(block)
+
+    description = workdir / "Fake Movie Review (2025-01-01).md"
+    description.write_text(FakeGenaiClient.DEFAULT_RESPONSE, encoding="utf-8")
+
+    outputs = workdir / "outputs"
+    outputs.mkdir()
+    return {"srt": srt, "video": video, "description": description, "outputs": outputs}
+
+
+def run_batch(task, batch_size: int, concurrency: int) -> dict:
+    """Run `task(i)` for a batch on a thread pool and time every item."""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def timed(i):
+        start = time.perf_counter()
+        try:
+            task(i)
+        except Exception as e:
+            with lock:
+                errors.append(repr(e))
+            return
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, range(batch_size)))
+    wall = time.perf_counter() - start
+
+    return {
+        "batch_size": batch_size,
+        "concurrency": concurrency,
+        "completed": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "wall_s": round(wall, 4),
+        "throughput_per_s": round(len(latencies) / wall, 3) if wall else None,
+        "latency_ms": summarize_latencies(latencies),
+    }
+
+
+def describe_task(args, fixtures, cached=False):
+    """Ideas and proofreading for one video per item, as the pipeline runs them.
+
+    With `cached`, the few-shot prefix goes through a shared `PromptCache` and
+    every chat must start on the cached context. The task's `metrics()` report
+    prompt tokens per video, so the two variants can be compared.
+    """
+    from gemini.description_generator import DescriptionGenerator
+    from gemini.gemini_prompts import GEMINI_PROOFREAD_DESCRIPTION_PROMPT
+    from gemini.prompt_cache import PromptCache
+
+    client = FakeGenaiClient(
+        latency=args.gemini_latency, jitter=args.jitter, token_latency=args.token_latency
+    )
+    prompt_cache = PromptCache(client) if cached else None
+    examples_dir = str(PROJECT_ROOT / "shorts_descriptions")
+    videos = []
+
+    def task(i):
+        generator = DescriptionGenerator(client=client, examples_dir=examples_dir)
+        prefix, suffix = generator.generate_prompt_parts(f"Fake Movie {i}", str(fixtures["srt"]))
+        prompt = generator.start_chat(prefix, suffix, prompt_cache=prompt_cache)
+        if cached and generator.chat.cached_content is None:
+            raise RuntimeError("The chat did not start on the cached prefix.")
+        filename = fixtures["outputs"] / generator.get_filename(f"Fake Movie {i}")
+        for text, phase in (
+            (prompt, "Calling Gemini for Ideas"),
+            (GEMINI_PROOFREAD_DESCRIPTION_PROMPT, "Calling Gemini for Proofreading"),
+        ):
+            description = generator.generate_description(text, phase)
+            if description is None:
+                raise RuntimeError(f"{phase} failed")
+            generator.save_output(str(filename), description)
+        with client._lock:
+            videos.append(i)
+
+    def metrics():
+        with client._lock:
+            count = max(len(videos), 1)
+            uncached = client.prompt_tokens - client.cached_tokens
+            return {
+                "prompt_tokens_per_video": round(client.prompt_tokens / count),
+                "uncached_tokens_per_video": round(uncached / count),
+                "caches_created": client.caches.created,
+            }
+
+    task.metrics = metrics
+    return task
+
+
+def batch_task(args, fixtures):
+    """Backlog mode against the fake batch service, checked end to end.
+
+    Each item runs a three-video backlog that is interrupted after submitting
+    its first job and then resumed, and checks that no job was submitted twice,
+    every file holds the ideas and the proofread reply, and a state file left by
+    a different manifest is refused.
+    """
+    from gemini.batch import run_backlog
+
+    examples_dir = str(PROJECT_ROOT / "shorts_descriptions")
+    batch_latency = max(args.gemini_latency, 0.05)
+
+    def task(i):
+        client = FakeGenaiClient(latency=0, batch_latency=batch_latency)
+        # A fresh folder per run: the check below deliberately leaves a state file
+        output_dir = Path(tempfile.mkdtemp(prefix="batch-", dir=fixtures["outputs"]))
+        manifest = [
+            {"topic": f"Batch Movie {i}-{k}", "srt": str(fixtures["srt"])} for k in range(3)
+        ]
+        options = {"output_dir": str(output_dir), "examples_dir": examples_dir, "poll_seconds": batch_latency / 5}
+
+        try:
+            run_backlog(client, manifest, timeout=0, **options)
+            raise AssertionError("The first run should stop while its batch job is running.")
+        except TimeoutError:
+            pass
+        results = run_backlog(client, manifest, **options)
+
+        if len(client.batches._jobs) != 2:
+            raise AssertionError(f"Expected 2 batch jobs (ideas, proofread), got {len(client.batches._jobs)}")
+        for topic, filename in results.items():
+            if filename is None:
+                raise AssertionError(f"No description for {topic}")
+            if Path(filename).read_text(encoding="utf-8").count(client.response_text) != 2:
+                raise AssertionError(f"{filename} should hold the ideas and the proofread reply once each")
+
+        # A leftover state file from another manifest must not be resumed
+        try:
+            run_backlog(client, manifest, timeout=0, **options)
+        except TimeoutError:
+            pass
+        try:
+            run_backlog(client, manifest[:1], **options)
+            raise AssertionError("A state file from a different manifest was resumed.")
+        except ValueError:
+            pass
+
+    return task
+
+
+def upload_task(args, fixtures, server):
+    from youtube.youtube import upload_caption, upload_video
+
+    local = threading.local()
+
+    def task(i):
+        # googleapiclient services are not thread-safe: one per worker thread
+        if getattr(local, "youtube", None) is None:
+            local.youtube = server.build_client()
+        video_id = upload_video(
+            video_file=str(fixtures["video"]),
+            title=f"Fake Movie {i}",
+            description="Benchmark upload",
+            tags=["benchmark"],
+            srt_file_path=None,
+            youtube=local.youtube,
+        )
+        upload_caption(local.youtube, video_id, str(fixtures["srt"]))
+
+    return task
+
+
+def captions_task(args, fixtures, server):
+    from youtube.youtube import upload_caption_tracks
+
+    local = threading.local()
+    tracks = {"en-US": str(fixtures["srt"]), "es": str(fixtures["srt"])}
+
+    def task(i):
+        if getattr(local, "youtube", None) is None:
+            local.youtube = server.build_client()
+        results = upload_caption_tracks(local.youtube, f"video-{i}", tracks)
+        failed = {lang: r for lang, r in results.items() if isinstance(r, Exception)}
+        if failed:
+            raise RuntimeError(f"Caption tracks failed: {failed!r}")
+
+    return task
+
+
+def email_task(args, fixtures, sink):
+    from scripts.email_description import email_description
+
+    conf = sink.config()
+
+    def task(i):
+        email_description(fixtures["description"], conf)
+
+    return task
+
+
+def parse_ints(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenarios.")
+    parser.add_argument("--batch-sizes", type=parse_ints, default=[1, 8, 32])
+    parser.add_argument("--concurrency", type=parse_ints, default=[1, 4, 8])
+    parser.add_argument("--gemini-latency", type=float, default=0.5, help="Mean seconds per Gemini call.")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Latency std-dev as a fraction of the mean.")
+    parser.add_argument(
+        "--token-latency", type=float, default=0.1, help="Extra Gemini seconds per 1000 uncached prompt tokens."
+    )
+    parser.add_argument("--youtube-latency", type=float, default=0.05, help="Seconds per upload/caption request.")
+    parser.add_argument("--smtp-latency", type=float, default=0.02, help="Seconds per accepted email.")
+    parser.add_argument("--video-mb", type=int, default=8, help="Size of the fake video file.")
+    parser.add_argument("--output", default="-", help="JSON output path ('-' for stdout).")
+    args = parser.parse_args(argv)
+    log_to_temp_dir()
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, FakeYouTubeServer(
+        latency=args.youtube_latency
+    ) as server, SmtpSink(latency=args.smtp_latency) as sink:
+        fixtures = make_fixtures(Path(tmp), args.video_mb)
+        tasks = {
+            "describe": lambda: describe_task(args, fixtures),
+            "describe-cached": lambda: describe_task(args, fixtures, cached=True),
+            "batch": lambda: batch_task(args, fixtures),
+            "upload": lambda: upload_task(args, fixtures, server),
+            "captions": lambda: captions_task(args, fixtures, server),
+            "email": lambda: email_task(args, fixtures, sink),
+        }
+
+        for scenario in scenarios:
+            task = tasks[scenario]()
+            for batch_size in args.batch_sizes:
+                for concurrency in args.concurrency:
+                    # The project logs every phase to stdout; keep the report readable
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        result = run_batch(task, batch_size, concurrency)
+                    result["scenario"] = scenario
+                    result.update(getattr(task, "metrics", dict)())
+                    results.append(result)
+                    latency = result["latency_ms"]
+                    print(
+                        f"{scenario:<15} batch={batch_size:<4} conc={concurrency:<3} "
+                        f"{result['throughput_per_s']:>8}/s  p50={latency.get('p50')}ms "
+                        f"p99={latency.get('p99')}ms  errors={result['errors']}",
+                        file=sys.stderr,
+                    )
+
+    config = {k: v for k, v in vars(args).items() if k != "output"}
+    write_results(args.output, "services", results, config)
+    # Errors mean a code path is broken against the fakes, not a slow run
+    return 1 if any(result["errors"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""Startup-time benchmark for the CLI entry points, based on `-X importtime`.
+
+Each case runs in a fresh interpreter several times. The report holds the median
+wall time, the median total import time, the slowest top-level imports and any
+heavy client library that got imported even though the command does not need it.
+The exit code is non-zero when a case exceeds `--budget-ms` or loads a heavy
+module, so the check can run in CI.
+
+Usage (from the project root):
+    python -m benchmarks.bench_startup --repeat 7 --budget-ms 150 --output startup.json
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import PROJECT_ROOT, write_results
+
+# Libraries that must only load once a command actually talks to a service
+HEAVY_MODULES = (
+    "google.genai",
+    "googleapiclient",
+    "google_auth_oauthlib",
+    "httplib2",
+    "getkey",
+    "yaml",
+)
+
+SAMPLE_DESCRIPTION = "shorts_descriptions/Hamnet Review (2025-12-05).md"
+
+CASES = {
+    "cli --help": ["cli.py", "--help"],
+    "cli parse": ["cli.py", "parse", SAMPLE_DESCRIPTION],
+    "cli describe --help": ["cli.py", "describe", "--help"],
+    "cli upload --help": ["cli.py", "upload", "--help"],
+    "cli pipeline --help": ["cli.py", "pipeline", "--help"],
+    "import gemini": ["-c", "import gemini"],
+    "import youtube": ["-c", "import youtube"],
+    "import pipeline": ["-c", "import pipeline"],
+}
+
+
+def parse_importtime(stderr: str):
+    """Parse `-X importtime` output.
+
+    Returns:
+        (total_us, top_level, modules): total cumulative microseconds of top-level
+        imports, a list of (module, cumulative_us) for top-level imports, and the
+        set of every imported module name.
+    """
+    top_level = []
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        modules.add(name.strip())
+        # Nested imports are indented below their parent
+        if not name[1:].startswith(" "):
+            top_level.append((name.strip(), int(cumulative)))
+    return sum(us for _, us in top_level), top_level, modules
+
+
+def run_case(argv, repeat: int):
+    walls, imports = [], []
+    top_level, modules = [], set()
+    # One warm-up run so every case starts with compiled bytecode on disk
+    for i in range(repeat + 1):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", *argv],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            stdin=subprocess.DEVNULL,
+        )
+        wall = time.perf_counter() - start
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(argv)} exited with {proc.returncode}: {proc.stderr[-500:]}")
+        total_us, top_level, modules = parse_importtime(proc.stderr)
+        if i:
+            walls.append(wall)
+            imports.append(total_us)
+
+    heavy = sorted(
+        m for m in modules if any(m == h or m.startswith(h + ".") for h in HEAVY_MODULES)
+    )
+    slowest = sorted(top_level, key=lambda item: item[1], reverse=True)[:5]
+    return {
+        "wall_ms": round(statistics.median(walls) * 1000, 2),
+        "import_ms": round(statistics.median(imports) / 1000, 2),
+        "modules_imported": len(modules),
+        "slowest_imports_ms": {name: round(us / 1000, 2) for name, us in slowest},
+        "heavy_modules": heavy,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case.")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if a case's median wall time exceeds this.")
+    parser.add_argument("--cases", default=",".join(CASES), help="Comma-separated case names.")
+    parser.add_argument("--output", default="-", help="JSON output path ('-' for stdout).")
+    args = parser.parse_args(argv)
+
+    results = []
+    failed = False
+    for name in [c.strip() for c in args.cases.split(",") if c.strip()]:
+        result = run_case(CASES[name], args.repeat)
+        result["case"] = name
+        result["over_budget"] = bool(args.budget_ms and result["wall_ms"] > args.budget_ms)
+        failed |= result["over_budget"] or bool(result["heavy_modules"])
+        results.append(result)
+        print(
+            f"{name:<22} wall={result['wall_ms']:>8}ms  imports={result['import_ms']:>8}ms"
+            + (f"  HEAVY: {', '.join(result['heavy_modules'])}" if result["heavy_modules"] else "")
+            + ("  OVER BUDGET" if result["over_budget"] else ""),
+            file=sys.stderr,
+        )
+
+    config = {"repeat": args.repeat, "budget_ms": args.budget_ms}
+    write_results(args.output, "startup", results, config)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
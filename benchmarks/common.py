@@ -0,0 +1,92 @@
+"""Helpers shared by the benchmark scripts: timing summaries, JSON output and log redirection."""
+
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Where the code under test logs while a benchmark runs
+LOG_PATH = Path(tempfile.gettempdir()) / "video-automation-benchmarks.log"
+
+
+def log_to_temp_dir() -> Path:
+    """Send log file output to LOG_PATH instead of files in the working directory.
+
+    `Logger(...)` only adds its file handler when the logger has none yet, so
+    installing this one first keeps automation*.log out of the project root.
+    """
+    logger = logging.getLogger("logger")
+    if not logger.handlers:
+        handler = logging.FileHandler(LOG_PATH)
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+        logger.addHandler(handler)
+    return LOG_PATH
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of `values` (pct in 0-100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize_latencies(latencies):
+    """Return mean and p50/p90/p99/max of `latencies` (seconds) in milliseconds."""
+    if not latencies:
+        return {}
+    return {
+        "mean": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50": round(percentile(latencies, 50) * 1000, 3),
+        "p90": round(percentile(latencies, 90) * 1000, 3),
+        "p99": round(percentile(latencies, 99) * 1000, 3),
+        "max": round(max(latencies) * 1000, 3),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path, benchmark, results, config=None):
+    """Write benchmark results with run metadata as JSON.
+
+    Args:
+        path: Output file, or None/'-' to print to stdout.
+        benchmark: Name of the benchmark.
+        results: List of result dicts.
+        config: The settings the benchmark ran with.
+    """
+    document = {
+        "benchmark": benchmark,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": config or {},
+        "results": results,
+    }
+    text = json.dumps(document, indent=2)
+    if path in (None, "-"):
+        print(text)
+    else:
+        Path(path).write_text(text + "\n", encoding="utf-8")
+    return document
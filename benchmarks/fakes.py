@@ -0,0 +1,607 @@
+"""Local stand-ins for Gemini (chats, models, batch jobs and caches), the YouTube
+upload API and an SMTP server.
+
+Nothing here talks to the network beyond 127.0.0.1, so benchmarks can drive the
+real project code end to end without API keys, quota or an email account.
+"""
+
+import base64
+import itertools
+import json
+import random
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def _sleep(latency, jitter):
+    if latency > 0:
+        time.sleep(max(0.0, random.gauss(latency, latency * jitter)))
+
+
+class FakeAPIError(Exception):
+    """Mimics google.genai's APIError, which carries the HTTP status as `.code`."""
+
+    def __init__(self, code, message):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+def _tokens(text):
+    # Roughly four characters per token, as for Gemini's English tokenizer
+    return len(text) // 4
+
+
+class FakeUsageMetadata:
+    """Mimics the token counts of a google.genai response's `usage_metadata`."""
+
+    def __init__(self, prompt_token_count=0, cached_content_token_count=0):
+        self.prompt_token_count = prompt_token_count
+        self.cached_content_token_count = cached_content_token_count
+
+
+class FakeResponse:
+    """Mimics the `.text` and `.usage_metadata` attributes of a google.genai response."""
+
+    def __init__(self, text, usage_metadata=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class FakeChat:
+    """A google.genai chat whose `send_message` sleeps for a configurable latency."""
+
+    def __init__(self, client, model, cached_content=None):
+        self.client = client
+        self.model = model
+        self.cached_content = cached_content
+        self.history = []
+
+    def send_message(self, message):
+        # The whole history is prompt input; a cached prefix is not processed again
+        cached = 0
+        if self.cached_content:
+            cache = self.client.caches._caches[self.cached_content]
+            cached = _tokens(
+                "".join(part.get("text", "") for content in cache.contents for part in content["parts"])
+            )
+        uncached = _tokens("".join(self.history) + message)
+        self.client._serve(uncached, cached)
+        reply = self.client.response_text
+        self.history += [message, reply]
+        return FakeResponse(reply, FakeUsageMetadata(cached + uncached, cached))
+
+
+class _FakeChats:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, model, config=None, **kwargs):
+        cached_content = (config or {}).get("cached_content")
+        if cached_content and cached_content not in self._client.caches._caches:
+            raise ValueError(f"Cached content {cached_content} not found")
+        return FakeChat(self._client, model, cached_content)
+
+
+class FakeCachedContent:
+    """Mimics a google.genai `CachedContent`."""
+
+    def __init__(self, name, model, display_name, contents, ttl_seconds):
+        self.name = name
+        self.model = f"models/{model}"
+        self.display_name = display_name
+        self.contents = contents
+        self.expire_at = time.time() + ttl_seconds
+
+
+def _ttl_seconds(config):
+    return float(str((config or {}).get("ttl", "3600s")).rstrip("s"))
+
+
+class _FakeCaches:
+    def __init__(self, client):
+        self._client = client
+        self._caches = {}
+        self._ids = itertools.count(1)
+        self.created = 0
+        self.deleted = 0
+
+    def create(self, model, config=None, **kwargs):
+        config = config or {}
+        text = "".join(
+            part.get("text", "") for content in config.get("contents", []) for part in content["parts"]
+        )
+        if len(text) < self._client.cache_min_chars:
+            raise ValueError("Cached content is too small")
+        cache = FakeCachedContent(
+            f"cachedContents/fake-{next(self._ids)}",
+            model,
+            config.get("display_name"),
+            config.get("contents"),
+            _ttl_seconds(config),
+        )
+        with self._client._lock:
+            self._caches[cache.name] = cache
+            self.created += 1
+        return cache
+
+    def get(self, name, **kwargs):
+        return self._caches[name]
+
+    def update(self, name, config=None, **kwargs):
+        cache = self._caches[name]
+        cache.expire_at = time.time() + _ttl_seconds(config)
+        return cache
+
+    def delete(self, name, **kwargs):
+        with self._client._lock:
+            del self._caches[name]
+            self.deleted += 1
+
+    def list(self, **kwargs):
+        now = time.time()
+        return [cache for cache in list(self._caches.values()) if cache.expire_at > now]
+
+
+class _FakeModels:
+    def __init__(self, client):
+        self._client = client
+
+    def generate_content(self, model, contents, **kwargs):
+        tokens = _tokens(contents if isinstance(contents, str) else json.dumps(contents))
+        self._client._serve(tokens)
+        return FakeResponse(self._client.response_text, FakeUsageMetadata(tokens))
+
+
+class _FakeJobState:
+    """Mimics a google.genai `JobState` enum member."""
+
+    def __init__(self, name):
+        self.name = name
+
+
+class _FakeInlinedResponse:
+    def __init__(self, response=None, error=None):
+        self.response = response
+        self.error = error
+
+
+class _FakeBatchDest:
+    def __init__(self, inlined_responses):
+        self.inlined_responses = inlined_responses
+
+
+class FakeBatchJob:
+    """A batch job that runs for `batch_latency` seconds after it is created."""
+
+    def __init__(self, name, requests, ready_at, fail_indices=()):
+        self.name = name
+        self.requests = requests
+        self.ready_at = ready_at
+        self.fail_indices = set(fail_indices)
+        self.state = _FakeJobState("JOB_STATE_PENDING")
+        self.dest = None
+
+
+class _FakeBatches:
+    def __init__(self, client):
+        self._client = client
+        self._jobs = {}
+        self._ids = itertools.count(1)
+
+    def create(self, model, src, config=None, **kwargs):
+        client = self._client
+        name = f"batches/fake-{next(self._ids)}"
+        job = FakeBatchJob(
+            name, list(src), time.monotonic() + client.batch_latency, client.batch_fail_indices
+        )
+        with client._lock:
+            self._jobs[name] = job
+            client.batch_requests += len(job.requests)
+        return job
+
+    def get(self, name, **kwargs):
+        job = self._jobs[name]
+        if job.dest is None and time.monotonic() >= job.ready_at:
+            job.dest = _FakeBatchDest(
+                [
+                    _FakeInlinedResponse(error={"code": 500, "message": "Injected failure"})
+                    if i in job.fail_indices
+                    else _FakeInlinedResponse(FakeResponse(self._client.response_text))
+                    for i in range(len(job.requests))
+                ]
+            )
+            job.state = _FakeJobState("JOB_STATE_SUCCEEDED")
+        elif job.dest is None:
+            job.state = _FakeJobState("JOB_STATE_RUNNING")
+        return job
+
+
+class FakeGenaiClient:
+    """Drop-in for `google.genai.Client` covering the calls this project makes."""
+
+    DEFAULT_RESPONSE = (
+        "Fake Movie Review | A Benchmark Title\n\n"
+        "A short synopsis of the film used for benchmarking.\n\n"
+        "Some thoughts about the film.\n"
+        "-\n"
+        "#fakemovie #moviereview #filmtok"
+    )
+
+    def __init__(
+        self,
+        latency=0.5,
+        jitter=0.1,
+        response_text=None,
+        batch_latency=0.0,
+        batch_fail_indices=(),
+        cache_min_chars=0,
+        capacity=None,
+        overload_factor=2.0,
+        token_latency=0.0,
+    ):
+        """Create a fake client.
+
+        Args:
+            latency: Mean seconds each Gemini call takes.
+            jitter: Standard deviation of the latency, as a fraction of `latency`.
+            response_text: Text every call returns.
+            batch_latency: Seconds a batch job stays running before it succeeds.
+            batch_fail_indices: Request indices that fail inside every batch job.
+            cache_min_chars: Smallest context `caches.create` accepts, standing
+                in for the model's minimum cacheable token count.
+            capacity: Calls served at full speed at once (None: unlimited).
+                Beyond it every call slows down in proportion to the load.
+            overload_factor: Calls beyond `capacity * overload_factor` in
+                flight are rejected with a 429 `FakeAPIError`.
+            token_latency: Extra seconds per 1000 uncached prompt tokens, so
+                longer prompts take longer and cached prefixes save time.
+
+        `capacity` and `slowdown` (a latency multiplier, 1.0 by default) can be
+        changed while calls run to inject slowdowns.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.response_text = response_text or self.DEFAULT_RESPONSE
+        self.batch_latency = batch_latency
+        self.batch_fail_indices = tuple(batch_fail_indices)
+        self.cache_min_chars = cache_min_chars
+        self.capacity = capacity
+        self.overload_factor = overload_factor
+        self.token_latency = token_latency
+        self.slowdown = 1.0
+        self.inflight = 0
+        self.rejected = 0
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.batch_requests = 0
+        self._lock = threading.Lock()
+        self.chats = _FakeChats(self)
+        self.models = _FakeModels(self)
+        self.batches = _FakeBatches(self)
+        self.caches = _FakeCaches(self)
+
+    def _serve(self, uncached_tokens=0, cached_tokens=0):
+        """Simulate one chats/models call under the current load."""
+        capacity = self.capacity
+        with self._lock:
+            self.inflight += 1
+            inflight = self.inflight
+            rejected = capacity is not None and inflight > capacity * self.overload_factor
+            if rejected:
+                self.inflight -= 1
+                self.rejected += 1
+        if rejected:
+            raise FakeAPIError(429, "Resource has been exhausted (e.g. check quota).")
+        try:
+            load = max(1.0, inflight / capacity) if capacity else 1.0
+            latency = self.latency + self.token_latency * uncached_tokens / 1000
+            _sleep(latency * self.slowdown * load, self.jitter)
+        finally:
+            with self._lock:
+                self.inflight -= 1
+                self.calls += 1
+                self.prompt_tokens += uncached_tokens + cached_tokens
+                self.cached_tokens += cached_tokens
+
+
+_GOOGLE_API_HOSTS = ("https://youtube.googleapis.com", "https://www.googleapis.com")
+
+
+class _YouTubeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def _read_body(self):
+        # Discard the body in blocks; only the byte count matters
+        remaining = int(self.headers.get("Content-Length", 0))
+        received = 0
+        while remaining > 0:
+            block = self.rfile.read(min(remaining, 1 << 20))
+            if not block:
+                break
+            received += len(block)
+            remaining -= len(block)
+        self.server.stats_add("bytes_received", received)
+        return received
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        self._read_body()
+        _sleep(self.server.latency, 0.1)
+
+        if url.path.endswith("/videos") and query.get("uploadType") == ["resumable"]:
+            session = next(self.server.ids)
+            location = f"{self.server.base_url}/upload/session/{session}"
+            self.send_response(200)
+            self.send_header("Location", location)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if url.path.endswith("/captions"):
+            caption_id = f"caption-{next(self.server.ids)}"
+            self.server.stats_add("captions", 1)
+            self._send_json(
+                200,
+                {"id": caption_id, "snippet": {"status": "serving", "language": "en-US"}},
+            )
+            return
+
+        self._send_json(404, {"error": {"message": f"Unknown endpoint {url.path}"}})
+
+    def do_PUT(self):
+        # Resumable upload chunk: "Content-Range: bytes start-end/total", or a
+        # status query after an error: "Content-Range: bytes */total"
+        self._read_body()
+        content_range = self.headers.get("Content-Range", "")
+        end, total = None, None
+        if content_range.startswith("bytes ") and "/" in content_range:
+            span, _, total = content_range[6:].partition("/")
+            if "-" in span:
+                end = int(span.split("-")[1])
+            total = int(total) if total.isdigit() else None
+
+        if end is not None and self.server.take_chunk_failure():
+            status = self.server.chunk_failure_status
+            self._send_json(status, {"error": {"code": status, "message": "Injected chunk failure"}})
+            return
+
+        with self.server.sessions_lock:
+            if end is not None:
+                self.server.sessions[self.path] = end + 1
+            committed = self.server.sessions.get(self.path, 0)
+
+        if total is not None and committed < total:
+            self.send_response(308)
+            if committed:
+                self.send_header("Range", f"bytes=0-{committed - 1}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        video_id = f"video-{next(self.server.ids)}"
+        self.server.stats_add("videos", 1)
+        self._send_json(200, {"id": video_id, "snippet": {}, "status": {}})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.endswith("/captions"):
+            video_id = parse_qs(url.query).get("videoId", [""])[0]
+            self._send_json(
+                200,
+                {
+                    "items": [
+                        {
+                            "id": f"caption-{video_id}",
+                            "snippet": {
+                                "name": "",
+                                "language": "en-US",
+                                "status": "serving",
+                                "trackKind": "standard",
+                            },
+                        }
+                    ]
+                },
+            )
+            return
+        self._send_json(404, {"error": {"message": f"Unknown endpoint {url.path}"}})
+
+
+class FakeYouTubeServer:
+    """A local HTTP server speaking the parts of the YouTube Data API we use.
+
+    Supports resumable `videos.insert` (single or chunked PUTs, and status
+    queries after an error), multipart `captions.insert` and `captions.list`.
+    Use `build_client()` to get a real googleapiclient service pointed at it,
+    and `fail_chunks()` to make upload chunks fail.
+    """
+
+    def __init__(self, latency=0.0):
+        """Start the server on a free port.
+
+        Args:
+            latency: Seconds added to every upload-session and caption request.
+        """
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _YouTubeHandler)
+        self._server.daemon_threads = True
+        host, port = self._server.server_address
+        self._server.base_url = f"http://{host}:{port}"
+        self._server.latency = latency
+        self._server.ids = itertools.count(1)
+        self._server.stats = {"bytes_received": 0, "videos": 0, "captions": 0}
+        self._stats_lock = threading.Lock()
+        self._server.stats_add = self._stats_add
+        # Bytes committed per upload session, and injected chunk failures
+        self._server.sessions = {}
+        self._server.sessions_lock = threading.Lock()
+        self._server.chunk_failures = 0
+        self._server.chunk_failure_status = 503
+        self._server.take_chunk_failure = self._take_chunk_failure
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return self._server.base_url
+
+    @property
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._server.stats)
+
+    def _stats_add(self, key, amount):
+        with self._stats_lock:
+            self._server.stats[key] += amount
+
+    def fail_chunks(self, count, status=503):
+        """Answer the next `count` upload chunks with HTTP `status`, committing nothing."""
+        with self._stats_lock:
+            self._server.chunk_failures = count
+            self._server.chunk_failure_status = status
+
+    def _take_chunk_failure(self):
+        with self._stats_lock:
+            if self._server.chunk_failures <= 0:
+                return False
+            self._server.chunk_failures -= 1
+            return True
+
+    def build_client(self):
+        """Build a googleapiclient YouTube service that talks to this server."""
+        import httplib2
+        import googleapiclient.discovery
+
+        base_url = self.base_url
+
+        class _LocalHttp(httplib2.Http):
+            # Media uploads use absolute URLs from the discovery document, so
+            # rewrite every Google API host instead of relying on api_endpoint
+            def request(self, uri, *args, **kwargs):
+                for prefix in _GOOGLE_API_HOSTS:
+                    if uri.startswith(prefix):
+                        uri = base_url + uri[len(prefix):]
+                        break
+                return super().request(uri, *args, **kwargs)
+
+        # As in googleapiclient.http.build_http: 308 means "resume incomplete"
+        http = _LocalHttp()
+        http.redirect_codes = http.redirect_codes - {308}
+        return googleapiclient.discovery.build(
+            "youtube", "v3", http=http, static_discovery=True
+        )
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._server.shutdown()
+        self._server.server_close()
+        return False
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+    def handle(self):
+        self._reply("220 smtp-sink ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+
+            if verb in ("EHLO", "HELO"):
+                self.wfile.write(
+                    b"250-smtp-sink\r\n250-8BITMIME\r\n250-SMTPUTF8\r\n250 AUTH PLAIN\r\n"
+                )
+            elif verb == "AUTH":
+                parts = command.split(" ")
+                if len(parts) == 3:
+                    base64.b64decode(parts[2])  # Any credentials are accepted
+                self._reply("235 Authentication successful")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                for data_line in self.rfile:
+                    if data_line in (b".\r\n", b".\n"):
+                        break
+                    size += len(data_line)
+                _sleep(self.server.latency, 0.1)
+                self.server.record(size)
+                self._reply("250 Message accepted")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class SmtpSink:
+    """A local SMTP server that accepts any login and discards messages.
+
+    It does not offer STARTTLS, so pair it with `"starttls": False` in the email
+    config.
+    """
+
+    def __init__(self, latency=0.0):
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SmtpHandler)
+        self._server.daemon_threads = True
+        self._server.latency = latency
+        self._server.record = self._record
+        self._lock = threading.Lock()
+        self.messages = 0
+        self.bytes_received = 0
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def host(self):
+        return self._server.server_address[0]
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def config(self):
+        """Return an email config dict for `scripts.email_description`."""
+        return {
+            "host": self.host,
+            "port": self.port,
+            "user_name": "benchmark@example.com",
+            "credential": "benchmark",
+            "starttls": False,
+        }
+
+    def _record(self, size):
+        with self._lock:
+            self.messages += 1
+            self.bytes_received += size
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._server.shutdown()
+        self._server.server_close()
+        return False
@@ -0,0 +1,60 @@
+"""Single entry point for every workflow in this project.
+
+Subcommands are resolved lazily: only the module behind the chosen command is
+imported, so `python cli.py --help` or parsing a description file never loads
+the Gemini or YouTube client libraries.
+
+Usage:
+    python cli.py <command> [args...]
+    python cli.py <command> --help
+"""
+
+import importlib
+import sys
+
+# command -> (module, function, help). Each function takes an argv list without
+# the program name and returns an exit code (None means success).
+COMMANDS = {
+    "describe": ("generate_description", "main", "Generate a description with Gemini."),
+    "batch": ("gemini.batch", "main", "Generate descriptions for a manifest with a Gemini batch job."),
+    "upload": ("youtube.youtube", "main", "Upload a video, its description and captions."),
+    "email": ("scripts.email_description", "main", "Email a description file to yourself."),
+    "parse": ("utils.description_to_list", "main", "Print a description file as a JSON list."),
+    "descriptions": ("utils.description_store", "main", "Search, show, import or export stored descriptions."),
+    "srt": ("utils.srt", "main", "Validate and normalize an SRT file."),
+    "keywords": ("utils.keywords", "main", "Build the keyword table or suggest tags for a video."),
+    "pipeline": ("run_pipeline", "main", "Run video folders through the full pipeline."),
+    "jobs": ("job_worker", "main", "Queue folders and run workers on the SQLite job table."),
+}
+
+
+def usage() -> str:
+    lines = [__doc__.strip().split("\n")[0], "", "Commands:"]
+    for name, (_, _, help_text) in COMMANDS.items():
+        lines.append(f"  {name:<10} {help_text}")
+    lines += ["", "Run 'python cli.py <command> --help' for command options."]
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0
+
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"Unknown command '{command}'.\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    module_name, func_name, _ = COMMANDS[command]
+    func = getattr(importlib.import_module(module_name), func_name)
+    return func(rest) or 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\nInterrupted by user.")
+        sys.exit(1)
@@ -1,16 +1,34 @@
-from .client import create_gemini_client
-from .chat import create_gemini_chat, call_gemini
-from .gemini_prompts import (
-	GEMINI_GENERATE_DESCRIPTION_PROMPT,
-	GEMINI_PROOFREAD_DESCRIPTION_PROMPT,
-)
-from .description_generator import DescriptionGenerator
+import importlib
 
-__all__ = [
-	"create_gemini_client",
-	"create_gemini_chat",
-	"call_gemini",
-	"GEMINI_GENERATE_DESCRIPTION_PROMPT",
-	"GEMINI_PROOFREAD_DESCRIPTION_PROMPT",
-	"DescriptionGenerator",
-]
+# Submodules are imported on first attribute access so `import gemini` stays
+# cheap; `google.genai` is only loaded once a client is actually created.
+_EXPORTS = {
+	"create_gemini_client": ".client",
+	"create_gemini_chat": ".chat",
+	"call_gemini": ".chat",
+	"GEMINI_GENERATE_DESCRIPTION_PROMPT": ".gemini_prompts",
+	"GEMINI_DESCRIPTION_PREFIX_PROMPT": ".gemini_prompts",
+	"GEMINI_DESCRIPTION_SUFFIX_PROMPT": ".gemini_prompts",
+	"GEMINI_PROOFREAD_DESCRIPTION_PROMPT": ".gemini_prompts",
+	"GEMINI_TRANSLATE_CAPTIONS_PROMPT": ".gemini_prompts",
+	"DescriptionGenerator": ".description_generator",
+	"translate_srt": ".caption_translator",
+	"load_manifest": ".batch",
+	"run_backlog": ".batch",
+	"PromptCache": ".prompt_cache",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+	module = _EXPORTS.get(name)
+	if module is None:
+		raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+	value = getattr(importlib.import_module(module, __name__), name)
+	globals()[name] = value
+	return value
+
+
+def __dir__():
+	return sorted(set(globals()) | set(__all__))
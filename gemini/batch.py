@@ -0,0 +1,433 @@
+"""Backlog mode: generate descriptions for many videos with Gemini batch jobs.
+
+Batch jobs are asynchronous and billed at a discount, which suits back-catalog
+re-captioning where nobody waits on the result. Prompts are rendered with
+`DescriptionGenerator.generate_prompt`, submitted as one batch, and each reply is
+appended to the topic's markdown file with `save_output`. Proofreading runs as a
+second batch that replays the ideas turn, the same way the chat flow does.
+
+The rendered prompts and batch job names are saved to a small state file, so a
+killed run resumes polling the jobs it already submitted instead of paying for
+them twice. The state is tied to a fingerprint of the manifest (topics and
+transcripts) and model; a state file left by a different run is refused rather
+than resumed. Resumes reuse the saved prompts, since the newest example files
+they were built from may have changed since (e.g. when the output goes to
+`shorts_descriptions`).
+
+Manifest format (JSON; `srt` paths are relative to the manifest):
+    [{"topic": "Hamnet Review", "srt": "hamnet/transcript.srt"}, ...]
+
+Usage:
+    python cli.py batch manifest.json --output-dir shorts_descriptions
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shlex
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from logger import Logger
+from .description_generator import DescriptionGenerator
+from .gemini_prompts import GEMINI_PROOFREAD_DESCRIPTION_PROMPT
+
+# State file kept in the output folder while a backlog run is in progress
+STATE_FILENAME = ".gemini_batch.json"
+
+# Terminal states of a batch job (google.genai `JobState` names)
+COMPLETED_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
+
+
+def load_manifest(path: str | Path) -> List[Dict[str, str]]:
+    """Read a backlog manifest.
+
+    Args:
+        path: JSON file holding a list of {"topic", "srt"} objects.
+
+    Returns:
+        The entries, with `srt` resolved against the manifest's folder.
+
+    Raises:
+        ValueError: If the manifest is not a list of entries with a topic and srt.
+    """
+    path = Path(path)
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    if not isinstance(entries, list):
+        raise ValueError(f"{path} must contain a JSON list of entries.")
+
+    manifest = []
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict) or not entry.get("topic") or not entry.get("srt"):
+            raise ValueError(f"Entry {i} of {path} needs a 'topic' and an 'srt' path.")
+        manifest.append({"topic": entry["topic"], "srt": str(path.parent / entry["srt"])})
+    return manifest
+
+
+def _content(role: str, text: str) -> dict:
+    return {"role": role, "parts": [{"text": text}]}
+
+
+def build_requests(conversations: List[List[dict]]) -> List[dict]:
+    """Wrap each conversation (a list of contents) as an inline batch request."""
+    return [{"contents": contents} for contents in conversations]
+
+
+def submit_batch(client: Any, requests: List[dict], model: str, display_name: str) -> str:
+    """Submit inline requests as one batch job and return the job name."""
+    job = client.batches.create(
+        model=model,
+        src=requests,
+        config={"display_name": display_name},
+    )
+    Logger.info(f"Submitted batch job {job.name} with {len(requests)} request(s).")
+    return job.name
+
+
+def _state_name(job: Any) -> str:
+    return getattr(job.state, "name", str(job.state))
+
+
+def wait_for_batch(
+    client: Any, name: str, poll_seconds: float = 60, timeout: float | None = None
+) -> Any:
+    """Poll a batch job until it reaches a terminal state.
+
+    Args:
+        client: A google.genai client.
+        name: Batch job name (e.g. 'batches/123').
+        poll_seconds: Seconds between polls.
+        timeout: Give up after this many seconds (None waits indefinitely).
+
+    Returns:
+        The finished job.
+
+    Raises:
+        TimeoutError: If the job is still running after `timeout` seconds.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    last_state = None
+    while True:
+        job = client.batches.get(name=name)
+        state = _state_name(job)
+        if state != last_state:
+            Logger.info(f"Batch job {name}: {state}")
+            last_state = state
+        if state in COMPLETED_STATES:
+            return job
+        if deadline is not None and time.monotonic() >= deadline:
+            raise TimeoutError(f"Batch job {name} still {state} after {timeout} seconds.")
+        time.sleep(poll_seconds)
+
+
+def batch_responses(job: Any, expected: int) -> List[str | None]:
+    """Return the text of each inline response, in request order.
+
+    Requests that failed (or are missing from the result) map to None.
+    """
+    if _state_name(job) != "JOB_STATE_SUCCEEDED":
+        Logger.error(f"Batch job {job.name} ended as {_state_name(job)}.")
+        return [None] * expected
+
+    responses = list(getattr(job.dest, "inlined_responses", None) or [])
+    texts: List[str | None] = []
+    for i in range(expected):
+        item = responses[i] if i < len(responses) else None
+        error = getattr(item, "error", None) if item is not None else "missing"
+        response = getattr(item, "response", None) if item is not None else None
+        if error or response is None:
+            Logger.warning(f"Batch request {i} of {job.name} failed: {error}")
+            texts.append(None)
+        else:
+            texts.append(response.text)
+    return texts
+
+
+def _digest(texts: List[str]) -> str:
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def manifest_fingerprint(manifest: List[Dict[str, str]], model: str, proofread: bool) -> str:
+    """Hash of everything a backlog run's prompts are built for: topics, transcripts and model."""
+    parts = [model, str(proofread)]
+    for entry in manifest:
+        try:
+            transcript = Path(entry["srt"]).read_bytes()
+        except OSError:
+            transcript = b""
+        parts += [entry["topic"], entry["srt"], hashlib.sha256(transcript).hexdigest()]
+    return _digest(parts)
+
+
+class _BatchState:
+    """Prompts and job names of a backlog run, saved so an interrupted run can resume."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.fingerprint = None
+        self.prompt_hash = None
+        self.entries: List[Dict[str, str]] = []
+        self.prompts: List[str] = []
+        self.jobs: Dict[str, str] = {}
+        self.saved: List[str] = []
+        if self.path.exists():
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+            self.fingerprint = state.get("fingerprint")
+            self.prompt_hash = state.get("prompt_hash")
+            self.entries = state.get("entries", [])
+            self.prompts = state.get("prompts", [])
+            self.jobs = state.get("jobs", {})
+            self.saved = state.get("saved", [])
+
+    @property
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def start(self, fingerprint: str, entries: List[Dict[str, str]], prompts: List[str]) -> None:
+        """Record the run's inputs and rendered prompts before any job is submitted."""
+        self.fingerprint = fingerprint
+        self.entries = entries
+        self.prompts = prompts
+        self.prompt_hash = _digest(prompts)
+        self._save()
+
+    def check(self, fingerprint: str) -> None:
+        """Raise ValueError unless the saved run is the one being started.
+
+        Raises:
+            ValueError: If the manifest, transcripts or model differ from the
+                saved run's, or its saved prompts are incomplete.
+        """
+        if self.fingerprint != fingerprint:
+            raise ValueError(
+                f"{self.path} belongs to a different backlog run (manifest, transcripts or model "
+                f"changed). Re-run with the original inputs to resume it, or delete it to start over."
+            )
+        if self.prompt_hash != _digest(self.prompts) or len(self.prompts) != len(self.entries):
+            raise ValueError(f"{self.path} is damaged (saved prompts do not match). Delete it to start over.")
+
+    def set(self, phase: str, name: str) -> None:
+        self.jobs[phase] = name
+        self._save()
+
+    def mark_saved(self, phase: str) -> None:
+        """Record that a phase's replies were written, so a resume does not append them twice."""
+        self.saved.append(phase)
+        self._save()
+
+    def _save(self) -> None:
+        tmp_path = self.path.with_suffix(".tmp")
+        state = {
+            "fingerprint": self.fingerprint,
+            "prompt_hash": self.prompt_hash,
+            "entries": self.entries,
+            "prompts": self.prompts,
+            "jobs": self.jobs,
+            "saved": self.saved,
+        }
+        tmp_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        if self.path.exists():
+            self.path.unlink()
+
+
+def _run_phase(client, state, phase, conversations, model, poll_seconds, timeout):
+    name = state.jobs.get(phase)
+    if name:
+        Logger.info(f"Resuming batch job {name} ({phase}).")
+    else:
+        name = submit_batch(client, build_requests(conversations), model, f"descriptions-{phase}")
+        state.set(phase, name)
+    job = wait_for_batch(client, name, poll_seconds, timeout)
+    return batch_responses(job, len(conversations))
+
+
+def run_backlog(
+    client: Any,
+    manifest: List[Dict[str, str]],
+    output_dir: str = ".",
+    examples_dir: str = "shorts_descriptions",
+    model: str = "gemini-2.5-flash",
+    proofread: bool = True,
+    poll_seconds: float = 60,
+    timeout: float | None = None,
+    state_path: str | Path | None = None,
+    store: Any = None,
+) -> Dict[str, str | None]:
+    """Generate descriptions for every manifest entry with batch jobs.
+
+    Args:
+        client: A google.genai client.
+        manifest: Entries from `load_manifest`.
+        output_dir: Folder the per-topic markdown files are written to.
+        examples_dir: Folder of example captions for the few-shot prompt.
+        model: Gemini model name.
+        proofread: Also run the proofreading pass as a second batch.
+        poll_seconds: Seconds between status polls.
+        timeout: Maximum seconds to wait for each batch job.
+        state_path: Where submitted job names are kept for resuming
+            (default: `STATE_FILENAME` in `output_dir`).
+        store: Optional `DescriptionStore` every description is also recorded in.
+
+    Returns:
+        A dict mapping each topic to its markdown file, or None if it failed.
+
+    Raises:
+        ValueError: If the state file at `state_path` was left by a run with a
+            different manifest, transcripts or model.
+    """
+    generator = DescriptionGenerator(
+        client=client, examples_dir=examples_dir, store=store, model=model
+    )
+    os.makedirs(output_dir, exist_ok=True)
+    state = _BatchState(state_path or Path(output_dir) / STATE_FILENAME)
+    fingerprint = manifest_fingerprint(manifest, model, proofread)
+
+    results: Dict[str, str | None] = {entry["topic"]: None for entry in manifest}
+    if state.exists:
+        state.check(fingerprint)
+        entries, prompts = state.entries, state.prompts
+        Logger.info(f"Resuming backlog run from {state.path} ({len(prompts)} prompt(s)).")
+    else:
+        # Prompts are rendered locally; entries without a transcript are skipped
+        entries, prompts = [], []
+        for entry in manifest:
+            prompt = generator.generate_prompt(entry["topic"], entry["srt"])
+            if prompt is None:
+                Logger.warning(f"Skipping '{entry['topic']}': no prompt.")
+                continue
+            # Filenames carry today's date, so they are saved for a resume too
+            filename = os.path.join(output_dir, generator.get_filename(entry["topic"]))
+            entries.append({**entry, "filename": filename})
+            prompts.append(prompt)
+        if not prompts:
+            Logger.error("No prompts to submit.")
+            return results
+        state.start(fingerprint, entries, prompts)
+
+    filenames = [entry["filename"] for entry in entries]
+
+    with Logger.phase("Gemini Batch Ideas"):
+        conversations = [[_content("user", prompt)] for prompt in prompts]
+        ideas = _run_phase(client, state, "ideas", conversations, model, poll_seconds, timeout)
+        if "ideas" not in state.saved:
+            for entry, prompt, text in zip(entries, prompts, ideas):
+                if text is not None:
+                    generator.save_output(
+                        entry["filename"], text, "Gemini Batch Ideas", prompt, entry["topic"]
+                    )
+            state.mark_saved("ideas")
+
+    finals = ideas
+    if proofread:
+        # Replay the ideas turn so Gemini proofreads its own description
+        pending = [i for i, text in enumerate(ideas) if text is not None]
+        finals = [None] * len(ideas)
+        if pending:
+            with Logger.phase("Gemini Batch Proofreading"):
+                conversations = [
+                    [
+                        _content("user", prompts[i]),
+                        _content("model", ideas[i]),
+                        _content("user", GEMINI_PROOFREAD_DESCRIPTION_PROMPT),
+                    ]
+                    for i in pending
+                ]
+                texts = _run_phase(
+                    client, state, "proofread", conversations, model, poll_seconds, timeout
+                )
+                save = "proofread" not in state.saved
+                for i, text in zip(pending, texts):
+                    if text is not None:
+                        if save:
+                            generator.save_output(
+                                filenames[i],
+                                text,
+                                "Gemini Batch Proofreading",
+                                GEMINI_PROOFREAD_DESCRIPTION_PROMPT,
+                                entries[i]["topic"],
+                            )
+                        finals[i] = text
+                if save:
+                    state.mark_saved("proofread")
+
+    for entry, filename, text in zip(entries, filenames, finals):
+        results[entry["topic"]] = filename if text is not None else None
+
+    state.clear()
+    done = sum(1 for filename in results.values() if filename)
+    Logger.success(f"Batch backlog finished: {done}/{len(manifest)} description(s).")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate descriptions for a manifest of videos with Gemini batch jobs."
+    )
+    parser.add_argument("manifest", help='JSON list of {"topic": ..., "srt": ...} entries.')
+    parser.add_argument("--output-dir", default=".", help="Folder for the markdown files.")
+    parser.add_argument("--examples-dir", default="shorts_descriptions", help="Example captions folder.")
+    parser.add_argument("--model", default="gemini-2.5-flash", help="Gemini model name.")
+    parser.add_argument("--api-keys", default="api_keys.yml", help="Path to api_keys.yml.")
+    parser.add_argument("--poll-seconds", type=float, default=60, help="Seconds between status polls.")
+    parser.add_argument("--timeout-hours", type=float, default=None, help="Give up after this many hours.")
+    parser.add_argument("--no-proofread", action="store_true", help="Skip the proofreading batch.")
+    parser.add_argument("--db", default="descriptions.db", help="Description store path ('' disables it).")
+    args = parser.parse_args(argv)
+
+    Logger(log_file_path="automation_debug.log", trace_file_path="automation_trace.json")
+
+    try:
+        manifest = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        Logger.error(str(e))
+        return 2
+
+    from utils.description_store import DescriptionStore
+    from .client import create_gemini_client
+
+    client = create_gemini_client(args.api_keys)
+    if client is None:
+        return 1
+
+    try:
+        results = run_backlog(
+            client,
+            manifest,
+            output_dir=args.output_dir,
+            examples_dir=args.examples_dir,
+            model=args.model,
+            proofread=not args.no_proofread,
+            poll_seconds=args.poll_seconds,
+            timeout=args.timeout_hours * 3600 if args.timeout_hours else None,
+            store=DescriptionStore(args.db) if args.db else None,
+        )
+    except ValueError as e:
+        Logger.error(str(e))
+        return 2
+    except TimeoutError as e:
+        # The jobs keep running and the state file stays, so the same command resumes them
+        Logger.error(str(e))
+        Logger.info(f"Backlog state saved to {Path(args.output_dir) / STATE_FILENAME}. To resume, run:")
+        print(f"    python cli.py batch {shlex.join(sys.argv[1:] if argv is None else argv)}")
+        return 1
+    return 0 if all(results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from logger import Logger
+from utils.concurrency_limit import get_limiter
+from utils.srt import compose_srt, parse_srt
+from .gemini_prompts import GEMINI_TRANSLATE_CAPTIONS_PROMPT
+
+# Strips a ```json ... ``` fence if the model adds one despite the instructions
+_FENCE_PATTERN = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def _batches(texts: List[str], max_cues: int, max_chars: int) -> List[List[str]]:
+    """Split cue texts into batches bounded by cue count and total characters."""
+    batches, current, size = [], [], 0
+    for text in texts:
+        if current and (len(current) >= max_cues or size + len(text) > max_chars):
+            batches.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def translate_cue_texts(
+    client: Any, texts: List[str], language: str, model: str = "gemini-2.5-flash"
+) -> List[str]:
+    """Translate one batch of cue texts in a single Gemini request.
+
+    If the reply does not contain exactly one string per cue, the batch is split
+    in half and each half is retried, so one bad reply never shifts captions.
+
+    Args:
+        client: A google.genai client.
+        texts: Cue texts to translate.
+        language: Target language (BCP-47 code such as 'es' or 'pt-BR').
+        model: Gemini model name.
+
+    Returns:
+        Translated texts, aligned with `texts`.
+    """
+    prompt = GEMINI_TRANSLATE_CAPTIONS_PROMPT.format(
+        language=language,
+        count=len(texts),
+        cues=json.dumps(texts, ensure_ascii=False),
+    )
+    with get_limiter("gemini").slot():
+        response = client.models.generate_content(
+            model=model,
+            contents=prompt,
+            config={"response_mime_type": "application/json"},
+        )
+
+    # A blocked or empty reply has no text; it takes the same fallback as bad JSON
+    text = response.text
+    try:
+        translated = json.loads(_FENCE_PATTERN.sub("", text.strip())) if text is not None else None
+    except (TypeError, ValueError):
+        translated = None
+
+    if isinstance(translated, list) and len(translated) == len(texts):
+        return [str(t) for t in translated]
+
+    if len(texts) == 1:
+        Logger.warning(f"Could not translate a caption to {language}; keeping the original.")
+        return texts
+
+    Logger.warning(
+        f"Gemini returned a mismatched batch for {language} ({len(texts)} cues); splitting and retrying."
+    )
+    half = len(texts) // 2
+    return translate_cue_texts(client, texts[:half], language, model) + translate_cue_texts(
+        client, texts[half:], language, model
+    )
+
+
+def translate_srt(
+    client: Any,
+    srt_text: str,
+    languages: List[str],
+    model: str = "gemini-2.5-flash",
+    max_cues: int = 200,
+    max_chars: int = 12000,
+    max_workers: int = 8,
+) -> Dict[str, str]:
+    """Translate an SRT transcript into several languages with batched requests.
+
+    Only the cue text is sent to Gemini; sequence numbers and timecodes are kept
+    from the source and re-attached locally, so timing is preserved exactly. All
+    (language, batch) requests run concurrently.
+
+    Args:
+        client: A google.genai client.
+        srt_text: The source SRT content.
+        languages: Target language codes.
+        model: Gemini model name.
+        max_cues: Maximum cues per request.
+        max_chars: Maximum characters of cue text per request.
+        max_workers: Maximum concurrent Gemini requests.
+
+    Returns:
+        A dict mapping each language to its translated SRT text.
+    """
+    cues = parse_srt(srt_text)
+    if not cues or not languages:
+        return {}
+
+    batches = _batches([cue.text for cue in cues], max_cues, max_chars)
+    Logger.info(
+        f"Translating {len(cues)} cues into {len(languages)} language(s) "
+        f"with {len(batches) * len(languages)} Gemini request(s)..."
+    )
+
+    # Spans are per thread, so pool threads are tagged with the caller's video
+    video = Logger.current_video()
+
+    def translate(batch, language):
+        with Logger.phase(f"Caption Translation [{language}]", video=video):
+            return translate_cue_texts(client, batch, language, model)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            language: [pool.submit(translate, batch, language) for batch in batches]
+            for language in languages
+        }
+        translations = {}
+        for language, batch_futures in futures.items():
+            texts = [text for future in batch_futures for text in future.result()]
+            translations[language] = compose_srt(
+                [cue.with_text(text) for cue, text in zip(cues, texts)]
+            )
+
+    Logger.success(f"Translated captions: {', '.join(languages)}")
+    return translations
@@ -1,11 +1,23 @@
 from typing import Any
 
+from utils.concurrency_limit import get_limiter
 
-def create_gemini_chat(client: Any, model: str = "gemini-2.5-flash"):
-    """Starts a stateful chat session to maintain context between multiple calls."""
+
+def create_gemini_chat(client: Any, model: str = "gemini-2.5-flash", cached_content: str | None = None):
+    """Starts a stateful chat session to maintain context between multiple calls.
+
+    With `cached_content` (a cache name from `PromptCache`), the chat starts on
+    top of that cached context instead of resending it.
+    """
+    if cached_content:
+        return client.chats.create(model=model, config={"cached_content": cached_content})
     return client.chats.create(model=model)
 
 
 def call_gemini(prompt: str, chat: Any):
-    """Sends a message through the chat object (maintains history)."""
-    return chat.send_message(prompt)
+    """Sends a message through the chat object (maintains history).
+
+    Concurrent calls share the adaptive "gemini" concurrency limit.
+    """
+    with get_limiter("gemini").slot():
+        return chat.send_message(prompt)
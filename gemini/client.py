@@ -1,10 +1,12 @@
-import yaml
-import google.genai as genai
 from logger import Logger
 
 
 def create_gemini_client(api_keys_path="api_keys.yml"):
     """Reads API key from YAML and initializes the Google GenAI client."""
+    # Deferred: google.genai alone takes hundreds of milliseconds to import
+    import yaml
+    import google.genai as genai
+
     try:
         with open(api_keys_path, "r", encoding="utf-8") as f:
             yml = yaml.safe_load(f)
@@ -4,9 +4,11 @@ from datetime import datetime
 from typing import Any, List
 
 from logger import Logger
-from .gemini_prompts import GEMINI_GENERATE_DESCRIPTION_PROMPT
+from utils.description_store import safe_filename
+from .gemini_prompts import GEMINI_DESCRIPTION_PREFIX_PROMPT
+from .gemini_prompts import GEMINI_DESCRIPTION_SUFFIX_PROMPT
 from .gemini_prompts import GEMINI_PROOFREAD_DESCRIPTION_PROMPT
-from .chat import call_gemini
+from .chat import call_gemini, create_gemini_chat
 
 
 class DescriptionGenerator:
@@ -15,7 +17,14 @@ class DescriptionGenerator:
     Intended to replace the previous module-level helper functions.
     """
 
-    def __init__(self, client: Any = None, chat: Any = None, examples_dir: str = "shorts_descriptions"):
+    def __init__(
+        self,
+        client: Any = None,
+        chat: Any = None,
+        examples_dir: str = "shorts_descriptions",
+        store: Any = None,
+        model: str | None = None,
+    ):
         """Create a DescriptionGenerator.
 
         Args:
@@ -24,10 +33,22 @@ class DescriptionGenerator:
             chat: Optional chat session object. If provided, `send_prompt` will use it.
             examples_dir: Path to a directory containing example caption files used
                 for few-shot prompt construction.
+            store: Optional `DescriptionStore`; `save_output` also records every
+                description there with its phase, model and prompt hash.
+            model: Gemini model name recorded in the store.
         """
         self.client = client
         self.chat = chat
         self.examples_dir = examples_dir
+        self.store = store
+        self.model = model
+        # Prompt and phase of the last generate_description call, for the store
+        self.last_prompt = None
+        self.last_phase = None
+        # Topic of the last generate_prompt_parts call, recorded by save_output
+        self.topic = None
+        # Set by start_chat when the chat's first message omits a cached prefix
+        self._cached_prefix = None
 
     def get_most_recent_files(self, directory: str, n: int = 3) -> List[str]:
         """Return the most recently modified files in `directory`.
@@ -65,7 +86,25 @@ class DescriptionGenerator:
         Returns:
             The rendered prompt string ready to send to Gemini, or None on error.
         """
-        Logger.phase("Prompt Generation")
+        parts = self.generate_prompt_parts(topic, srt_file_path)
+        return "".join(parts) if parts else None
+
+    @Logger.phase("Prompt Generation")
+    def generate_prompt_parts(self, topic: str, srt_file_path: str) -> tuple[str, str] | None:
+        """Build the Gemini prompt as a static prefix and a per-video suffix.
+
+        The prefix (instructions and example captions) only changes when the
+        examples do, so it can be cached with `PromptCache`; the suffix holds the
+        topic and transcript.
+
+        Args:
+            topic: The video/topic name used in the prompt.
+            srt_file_path: Path to the SRT transcript file to include.
+
+        Returns:
+            (prefix, suffix), or None on error.
+        """
+        self.topic = topic
 
         # 1. Read the video transcript from the provided SRT file
         try:
@@ -78,7 +117,7 @@ class DescriptionGenerator:
 
         # 2. Retrieve the 3 most recent captions to use as style references
         Logger.info("Fetching recent caption examples for style matching...")
-        caption_files = self.get_most_recent_files("shorts_descriptions")
+        caption_files = self.get_most_recent_files(self.examples_dir)
         captions = []
         titles = []  # New list for titles
 
@@ -108,11 +147,9 @@ class DescriptionGenerator:
             captions.extend(["[No example provided]"] * (3 - len(captions)))
             titles.extend(["[No Title Provided]"] * (3 - len(titles)))  # Pad titles as well
 
-        # 3. Inject variables into the master prompt template
+        # 3. Inject variables into the prompt templates
         try:
-            final_prompt = GEMINI_GENERATE_DESCRIPTION_PROMPT.format(
-                topic=topic,
-                transcript=transcript,
+            prefix = GEMINI_DESCRIPTION_PREFIX_PROMPT.format(
                 caption1=captions[0],
                 caption2=captions[1],
                 caption3=captions[2],
@@ -120,12 +157,33 @@ class DescriptionGenerator:
                 title2=titles[1],
                 title3=titles[2],
             )
+            suffix = GEMINI_DESCRIPTION_SUFFIX_PROMPT.format(topic=topic, transcript=transcript)
             Logger.success("Gemini prompt generated successfully.")
-            return final_prompt
+            return prefix, suffix
         except KeyError as e:
             Logger.error(f"Formatting error: Missing key in prompt template: {e}")
             return None
 
+    def start_chat(
+        self, prefix: str, suffix: str, model: str = "gemini-2.5-flash", prompt_cache: Any = None
+    ) -> str:
+        """Open a new chat for one video and return the first message to send.
+
+        Args:
+            prefix: Static part of the prompt from `generate_prompt_parts`.
+            suffix: Per-video part of the prompt.
+            model: Gemini model name.
+            prompt_cache: Optional `PromptCache`. When it holds the prefix, the
+                chat starts on the cached context and only `suffix` is sent.
+
+        Returns:
+            The suffix if the prefix is cached, otherwise the full prompt.
+        """
+        cached_content = prompt_cache.get(prefix, model) if prompt_cache else None
+        self.chat = create_gemini_chat(self.client, model=model, cached_content=cached_content)
+        self._cached_prefix = prefix if cached_content else None
+        return suffix if cached_content else prefix + suffix
+
     def generate_description(self, prompt: str, phase: str) -> str | None:
         """Send `prompt` to Gemini using the configured chat session to generate a description.
 
@@ -136,16 +194,26 @@ class DescriptionGenerator:
         Returns:
             The textual response from Gemini or None on error.
         """
-        Logger.phase(phase)
-        try:
-            Logger.info("Sending prompt to Gemini...")
-            # Use the chat object so Gemini retains conversation state between calls
-            response = call_gemini(prompt, self.chat)
-            Logger.success("Received response from Gemini.")
-            return response.text
-        except Exception as e:
-            Logger.error(f"An error occurred with the Gemini API: {e}")
-            return None
+        # The store hashes the whole prompt, whether or not its prefix was cached
+        cached_prefix, self._cached_prefix = self._cached_prefix, None
+        self.last_prompt = (cached_prefix or "") + prompt
+        self.last_phase = phase
+        with Logger.phase(phase):
+            try:
+                Logger.info("Sending prompt to Gemini...")
+                # Use the chat object so Gemini retains conversation state between calls
+                response = call_gemini(prompt, self.chat)
+                Logger.success("Received response from Gemini.")
+                usage = getattr(response, "usage_metadata", None)
+                if getattr(usage, "cached_content_token_count", None):
+                    Logger.info(
+                        f"{usage.cached_content_token_count} of {usage.prompt_token_count} "
+                        "prompt tokens came from the prompt cache."
+                    )
+                return response.text
+            except Exception as e:
+                Logger.error(f"An error occurred with the Gemini API: {e}")
+                return None
 
     def get_filename(self, topic: str) -> str:
         """Generate a safe filename for the topic with today's date.
@@ -160,19 +228,30 @@ class DescriptionGenerator:
         # Generates a filename: 'Topic Name (YYYY-MM-DD).md'.
         # Cleans illegal characters while preserving spaces.
         date_str = datetime.now().strftime("%Y-%m-%d")
-        # Remove chars that are illegal in Windows/macOS filenames
-        safe_topic = re.sub(r'[\\/*?:"<>|]', "", topic).strip()
-        return f"{safe_topic} ({date_str}).md"
+        return f"{safe_filename(topic)} ({date_str}).md"
 
-    def save_output(self, filename: str, description: str) -> None:
+    def save_output(
+        self,
+        filename: str,
+        description: str,
+        phase: str | None = None,
+        prompt: str | None = None,
+        topic: str | None = None,
+    ) -> None:
         """Append Gemini `description` to `filename`.
 
         The method uses append mode so multiple phases (ideas, proofreading) can be
-        saved to the same file.
+        saved to the same file. With a `store`, the description is also recorded
+        as a new version of the topic.
 
         Args:
             filename: Destination markdown filename.
             description: Text to append to the file.
+            phase: Phase recorded in the store (default: the last phase sent).
+            prompt: Prompt whose hash is recorded (default: the last prompt sent).
+            topic: Topic recorded in the store (default: the topic of the last
+                prompt generated). The filename is only a fallback, since
+                characters such as '?' are stripped from it.
         """
         try:
             # Appends the Gemini output to the Markdown file. Using 'a' (append)
@@ -182,3 +261,16 @@ class DescriptionGenerator:
             Logger.success(f"File updated: {filename}")
         except Exception as e:
             Logger.error(f"Could not save file: {e}")
+
+        if self.store is not None:
+            try:
+                self.store.add(
+                    topic or self.topic,
+                    description,
+                    phase or self.last_phase or "unknown",
+                    model=self.model,
+                    prompt=prompt or self.last_prompt,
+                    filename=filename,
+                )
+            except Exception as e:
+                Logger.warning(f"Could not record the description in the store: {e}")
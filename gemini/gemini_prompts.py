@@ -1,8 +1,8 @@
-GEMINI_GENERATE_DESCRIPTION_PROMPT = """
-Write me captions for {topic} on Tiktok/Instagram Reels/Youtube Shorts. Focus on SEO optimization, Keyword usage, and Grammar/spelling. I am providing both my transcript for the video as well as a previous example captions from Tiktok to give you an idea of formatting:
-
-TRANSCRIPT:
-{transcript}
+# The description prompt is split so the part that is the same for every video
+# (instructions and example captions) can be cached once per batch; only the
+# suffix with the topic and transcript changes per video.
+GEMINI_DESCRIPTION_PREFIX_PROMPT = """
+Write me captions for my videos on Tiktok/Instagram Reels/Youtube Shorts. Focus on SEO optimization, Keyword usage, and Grammar/spelling. I am providing previous example captions from Tiktok to give you an idea of formatting. After them I will give you the topic and my transcript for the video:
 
 EXAMPLE CAPTION 1: {title1}
 {caption1}
@@ -14,6 +14,21 @@ EXAMPLE CAPTION 3: {title3}
 {caption3}
 """
 
+GEMINI_DESCRIPTION_SUFFIX_PROMPT = """
+Write the captions for {topic}.
+
+TRANSCRIPT:
+{transcript}
+"""
+
+GEMINI_GENERATE_DESCRIPTION_PROMPT = GEMINI_DESCRIPTION_PREFIX_PROMPT + GEMINI_DESCRIPTION_SUFFIX_PROMPT
+
 GEMINI_PROOFREAD_DESCRIPTION_PROMPT = """
 How is this caption? This is my rough draft after getting inspiration from GEMINI. Focus in Keyword usage, SEO Optimization, Spelling and Grammar, and not using and words that would hurt the algorithm.
 """
+
+GEMINI_TRANSLATE_CAPTIONS_PROMPT = """
+Translate these video caption lines into {language}. The input is a JSON array of strings, one per caption. Reply with ONLY a JSON array of exactly {count} strings, in the same order, one translation per input string. Keep line breaks inside a string, keep names and film titles as they are, and keep each translation about as short as the original so it fits on screen.
+
+{cues}
+"""
@@ -0,0 +1,192 @@
+import hashlib
+import threading
+import time
+from typing import Any, Dict
+
+from logger import Logger
+
+# Cache names carry a hash of the prefix so any process can find and reuse them
+DISPLAY_NAME_PREFIX = "video-uploader-prompt-"
+
+
+class PromptCache:
+    """Registers the static few-shot prefix of the description prompt as a
+    Gemini cached context and reuses it for every video.
+
+    The cache is keyed by a hash of the model and the prefix text. The prefix
+    holds the example captions, so adding or editing an example produces a new
+    key: a fresh cache is created, and the old one is deleted once nobody has
+    asked for it for `idle_seconds` (caches of other models are left alone, and
+    unused ones also expire with their TTL). Caches are found by display name,
+    so a later run within the TTL reuses the same cache.
+
+    If caching is unavailable (for example the prefix is below the model's
+    minimum cacheable size), `get` returns None and callers send the full
+    prompt inline.
+    """
+
+    def __init__(
+        self, client: Any, ttl_seconds: int = 3600, refresh_margin: int = 300, idle_seconds: int = 600
+    ):
+        """Create a PromptCache.
+
+        Args:
+            client: A google.genai client.
+            ttl_seconds: Lifetime of a cache, renewed while it is in use.
+            refresh_margin: Renew the TTL once less than this many seconds remain.
+            idle_seconds: When a new cache is stored, delete caches of the same
+                model that have not been handed out for this long. Keep it
+                above the longest call, since callers may still be using a
+                cache they were given.
+        """
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = refresh_margin
+        self.idle_seconds = idle_seconds
+        # Guards the dicts below only; it is never held during a network call
+        self._lock = threading.Lock()
+        # key -> (cache name, local expiry time, model) or None when caching failed
+        self._entries: Dict[str, tuple | None] = {}
+        # key -> when the cache was last handed out
+        self._last_used: Dict[str, float] = {}
+        # key -> lock held by the one worker creating or renewing that cache
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(prefix: str, model: str) -> str:
+        return hashlib.sha256(f"{model}\n{prefix}".encode("utf-8")).hexdigest()[:32]
+
+    def _count(self, key: str, name: str | None) -> str | None:
+        with self._lock:
+            if name is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._last_used[key] = time.time()
+        return name
+
+    def get(self, prefix: str, model: str = "gemini-2.5-flash") -> str | None:
+        """Return the name of a live cache holding `prefix`, creating it if needed.
+
+        A cache close to expiry is renewed by one caller while the others keep
+        using it; only the first use of a prefix makes callers wait, so a
+        single cache is created.
+
+        Args:
+            prefix: The rendered static part of the prompt.
+            model: Model the cache is created for; chats must use the same model.
+
+        Returns:
+            The cached content name, or None if the prefix could not be cached.
+        """
+        key = self.key(prefix, model)
+        with self._lock:
+            failed = key in self._entries and self._entries[key] is None
+            entry = self._entries.get(key)
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        if failed:
+            return self._count(key, None)
+
+        now = time.time()
+        if entry is not None and now < entry[1]:
+            # Still live: the first caller to find it near expiry renews it,
+            # the others use it without waiting
+            if now >= entry[1] - self.refresh_margin and key_lock.acquire(blocking=False):
+                try:
+                    if self._refresh(entry[0]):
+                        self._store(key, entry[0], model)
+                finally:
+                    key_lock.release()
+            return self._count(key, entry[0])
+
+        with key_lock:
+            # Another caller may have created it (or given up) while this one waited
+            with self._lock:
+                failed = key in self._entries and self._entries[key] is None
+                current = self._entries.get(key)
+            if failed:
+                return self._count(key, None)
+            if current is not None and time.time() < current[1]:
+                return self._count(key, current[0])
+
+            name = self._refresh(current[0]) if current else None
+            name = name or self._find(key, model) or self._create(key, prefix, model)
+            self._store(key, name, model)
+        return self._count(key, name)
+
+    def _store(self, key: str, name: str | None, model: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (name, now + self.ttl_seconds, model) if name else None
+            # Only caches of this model that nobody has asked for lately are
+            # stale; other callers may still be in the middle of using the rest
+            stale = [] if name is None else [
+                (old_key, entry)
+                for old_key, entry in self._entries.items()
+                if old_key != key
+                and entry is not None
+                and entry[2] == model
+                and now - self._last_used.get(old_key, 0) >= self.idle_seconds
+            ]
+            for old_key, _ in stale:
+                del self._entries[old_key]
+                self._last_used.pop(old_key, None)
+        self._drop_stale(stale)
+
+    def _refresh(self, name: str) -> str | None:
+        try:
+            self.client.caches.update(name=name, config={"ttl": f"{self.ttl_seconds}s"})
+            return name
+        except Exception as e:
+            Logger.warning(f"Could not renew prompt cache {name}: {e}")
+            return None
+
+    def _find(self, key: str, model: str) -> str | None:
+        # A cache left by an earlier run is reused and its TTL renewed
+        try:
+            for cache in self.client.caches.list():
+                if cache.display_name == DISPLAY_NAME_PREFIX + key and cache.model.endswith(model):
+                    Logger.info(f"Reusing prompt cache {cache.name}.")
+                    return self._refresh(cache.name)
+        except Exception as e:
+            Logger.warning(f"Could not list prompt caches: {e}")
+        return None
+
+    def _create(self, key: str, prefix: str, model: str) -> str | None:
+        try:
+            cache = self.client.caches.create(
+                model=model,
+                config={
+                    "display_name": DISPLAY_NAME_PREFIX + key,
+                    "contents": [{"role": "user", "parts": [{"text": prefix}]}],
+                    "ttl": f"{self.ttl_seconds}s",
+                },
+            )
+        except Exception as e:
+            Logger.warning(f"Prompt caching unavailable, sending prompts inline: {e}")
+            return None
+        Logger.success(f"Cached the prompt prefix as {cache.name} for {self.ttl_seconds}s.")
+        return cache.name
+
+    def _drop_stale(self, stale: list) -> None:
+        # The example set changed: the old prefixes will not be used again
+        for _, entry in stale:
+            try:
+                self.client.caches.delete(name=entry[0])
+                Logger.info(f"Deleted outdated prompt cache {entry[0]}.")
+            except Exception as e:
+                Logger.warning(f"Could not delete prompt cache {entry[0]}: {e}")
+
+    def clear(self) -> None:
+        """Delete every cache this instance is using."""
+        with self._lock:
+            entries, self._entries = self._entries, {}
+            self._last_used.clear()
+        for entry in entries.values():
+            if entry is not None:
+                try:
+                    self.client.caches.delete(name=entry[0])
+                except Exception as e:
+                    Logger.warning(f"Could not delete prompt cache {entry[0]}: {e}")
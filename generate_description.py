@@ -1,35 +1,35 @@
-import os
 import argparse
 from logger import Logger
-from gemini import (
-    GEMINI_GENERATE_DESCRIPTION_PROMPT,
-    GEMINI_PROOFREAD_DESCRIPTION_PROMPT,
-)
-import re
-from datetime import datetime
-from getkey import getkey, keys
-from gemini import create_gemini_client, create_gemini_chat, call_gemini, DescriptionGenerator
+from gemini import GEMINI_PROOFREAD_DESCRIPTION_PROMPT
+from gemini import create_gemini_client, create_gemini_chat, DescriptionGenerator
+from utils.description_store import DescriptionStore
 
 
-def main():
-    # Setup persistent logging
-    log_file = "automation_debug.log"
-    Logger(log_file_path=log_file)
-
+def main(argv=None):
     # CLI Argument Parsing
     parser = argparse.ArgumentParser(
         description="Generate a Gemini prompt for video descriptions."
     )
     parser.add_argument("topic", help="The topic of the video.")
     parser.add_argument("srt_file", help="The path to the SRT file for the transcript.")
-    args = parser.parse_args()
+    parser.add_argument("--db", default="descriptions.db", help="Description store path ('' disables it).")
+    args = parser.parse_args(argv)
+
+    # Setup persistent logging (after parsing, so --help leaves no log file behind)
+    log_file = "automation_debug.log"
+    Logger(log_file_path=log_file, trace_file_path="automation_trace.json")
 
     topic, srt_file = args.topic, args.srt_file
 
     # Initialize the AI Session and generator
     client = create_gemini_client()
     chat = create_gemini_chat(client)
-    generator = DescriptionGenerator(client=client, chat=chat)
+    generator = DescriptionGenerator(
+        client=client,
+        chat=chat,
+        store=DescriptionStore(args.db) if args.db else None,
+        model="gemini-2.5-flash",
+    )
 
     # Prep data
     prompt = generator.generate_prompt(topic, srt_file)
@@ -46,6 +46,8 @@ def main():
         return
 
     # INTERACTIVE STEP: Pause for user review before proofreading
+    from getkey import getkey, keys
+
     print(
         f"{Logger.WARNING}[INPUT]{Logger.ENDC} Create Description. Hit any key to send to Gemini or ESC to end... "
     )
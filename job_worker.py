@@ -0,0 +1,115 @@
+import argparse
+import sys
+
+from logger import Logger
+from pipeline import JobQueue, PipelineContext, discover_jobs
+from pipeline.worker import JOB_STAGES, enqueue_folder, run_worker
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Queue video folders and run description/upload workers against a shared SQLite job table."
+    )
+    parser.add_argument("--db", default="jobs.db", help="Path of the job database (default: jobs.db).")
+    parser.add_argument(
+        "--no-wal",
+        action="store_true",
+        help="Use a rollback journal instead of WAL (required on network filesystems).",
+    )
+    parser.add_argument(
+        "--root",
+        default=".",
+        help="Shared directory that queued folders are stored relative to, so each host "
+        "can mount it at its own path (default: the working directory).",
+    )
+    parser.add_argument(
+        "--retry-delay",
+        type=float,
+        default=60,
+        help="Seconds before a failed job is retried; doubles with every attempt (default: 60).",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = subparsers.add_parser("enqueue", help="Queue video folders for description.")
+    enqueue.add_argument("folder", help="A video folder or a folder of video folders.")
+    enqueue.add_argument("--kind", choices=list(JOB_STAGES), default="describe")
+
+    work = subparsers.add_parser("work", help="Claim and process jobs until interrupted.")
+    work.add_argument(
+        "--kind",
+        action="append",
+        choices=list(JOB_STAGES),
+        help="Job kind to serve (repeatable). Defaults to all kinds.",
+    )
+    work.add_argument("--lease", type=float, default=300, help="Lease length in seconds.")
+    work.add_argument("--poll", type=float, default=5, help="Idle poll interval in seconds.")
+    work.add_argument(
+        "--caption-languages",
+        default="",
+        help="Comma-separated language codes to translate captions into, e.g. 'es,fr,pt-BR'.",
+    )
+    work.add_argument("--no-email", action="store_true", help="Skip the Email stage.")
+    work.add_argument("--exit-when-idle", action="store_true", help="Stop when the queue is empty.")
+
+    subparsers.add_parser("status", help="Show job counts per kind and status.")
+
+    retry = subparsers.add_parser("retry", help="Re-queue failed jobs.")
+    retry.add_argument("--kind", choices=list(JOB_STAGES))
+
+    args = parser.parse_args(argv)
+
+    Logger(log_file_path="automation.log", trace_file_path="automation_trace.json")
+    job_queue = JobQueue(args.db, wal=not args.no_wal, retry_delay=args.retry_delay)
+
+    if args.command == "enqueue":
+        try:
+            jobs = discover_jobs(args.folder)
+        except ValueError as e:
+            Logger.error(str(e))
+            return 2
+        for job in jobs:
+            try:
+                queued = enqueue_folder(job_queue, job.folder, kind=args.kind, root=args.root)
+            except ValueError as e:
+                Logger.error(str(e))
+                return 2
+            if queued:
+                Logger.success(f"Queued {args.kind} job for {job.name}")
+            else:
+                Logger.info(f"{job.name} is already queued.")
+        return 0
+
+    if args.command == "work":
+        languages = [lang.strip() for lang in args.caption_languages.split(",") if lang.strip()]
+        run_worker(
+            job_queue,
+            args.kind or list(JOB_STAGES),
+            ctx=PipelineContext(caption_languages=languages),
+            lease_seconds=args.lease,
+            poll_seconds=args.poll,
+            send_email=not args.no_email,
+            exit_when_idle=args.exit_when_idle,
+            root=args.root,
+        )
+        return 0
+
+    if args.command == "status":
+        counts = job_queue.counts()
+        if not counts:
+            Logger.info("The job queue is empty.")
+        for kind, statuses in counts.items():
+            summary = ", ".join(f"{status}: {n}" for status, n in sorted(statuses.items()))
+            Logger.info(f"{kind:<10} {summary}")
+        return 0
+
+    if args.command == "retry":
+        Logger.info(f"Re-queued {job_queue.retry_failed(args.kind)} failed job(s).")
+        return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\nInterrupted by user. Leased jobs will be picked up again once their lease expires.")
+        sys.exit(1)
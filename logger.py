@@ -1,6 +1,95 @@
+import atexit
+import functools
+import json
 import logging
+import os
 import sys
+import threading
 import time
+from collections import defaultdict, deque
+
+# Reference point for trace timestamps (Chrome traces expect microseconds)
+_TRACE_EPOCH_NS = time.perf_counter_ns()
+
+# How many spans and counter samples the trace keeps; older ones are dropped so a
+# long-running worker does not grow without bound. The phase summary is kept
+# as running totals and stays complete.
+MAX_TRACE_SPANS = 20000
+MAX_TRACE_COUNTERS = 20000
+
+
+class Phase:
+    """A timed, nestable span opened by `Logger.phase`.
+
+    Use it as a context manager (``with Logger.phase("Upload"):``) or as a
+    decorator (``@Logger.phase("Upload")``). Each span records wall time and the
+    CPU time of the running thread, plus the video it belongs to. Nested spans
+    inherit the video of the enclosing span when none is given.
+    """
+
+    _local = threading.local()
+
+    def __init__(self, name, video=None):
+        self.name = name
+        self.video = video
+        self._start_ns = None
+        self._cpu_start_ns = None
+
+    @classmethod
+    def _stack(cls):
+        if not hasattr(cls._local, "stack"):
+            cls._local.stack = []
+        return cls._local.stack
+
+    @classmethod
+    def current(cls):
+        """Return the innermost open span on this thread, or None."""
+        stack = cls._stack()
+        return stack[-1] if stack else None
+
+    def __enter__(self):
+        parent = Phase.current()
+        if self.video is None and parent is not None:
+            self.video = parent.video
+        self._depth = len(Phase._stack())
+        Phase._stack().append(self)
+
+        Logger._banner(self.name, self.video)
+        self._cpu_start_ns = time.thread_time_ns()
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        cpu_ns = time.thread_time_ns() - self._cpu_start_ns
+
+        stack = Phase._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+
+        Logger._record_span(
+            {
+                "name": self.name,
+                "video": self.video,
+                "start_ns": self._start_ns - _TRACE_EPOCH_NS,
+                "wall_ns": end_ns - self._start_ns,
+                "cpu_ns": cpu_ns,
+                "depth": self._depth,
+                "tid": threading.get_ident(),
+                "thread": threading.current_thread().name,
+                "error": exc_type.__name__ if exc_type else None,
+            }
+        )
+        return False
+
+    def __call__(self, func):
+        # A fresh span per call so the decorator is reentrant and thread-safe
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Phase(self.name, self.video):
+                return func(*args, **kwargs)
+
+        return wrapper
 
 
 class Logger:
@@ -12,7 +101,15 @@ class Logger:
     BOLD = "\033[1m"
     ENDC = "\033[0m"
 
-    def __init__(self, log_file_path, level=logging.INFO):
+    # Most recent finished phase spans and counter samples, shared across threads
+    _spans = deque(maxlen=MAX_TRACE_SPANS)
+    _counters = deque(maxlen=MAX_TRACE_COUNTERS)
+    _phase_totals = defaultdict(lambda: {"calls": 0, "wall_ns": 0, "cpu_ns": 0})
+    _spans_lock = threading.Lock()
+    _trace_file_path = None
+    _report_registered = False
+
+    def __init__(self, log_file_path, level=logging.INFO, trace_file_path=None):
         self._logger = logging.getLogger(__name__)
         self._logger.setLevel(level)
 
@@ -25,13 +122,183 @@ class Logger:
             file_handler.setFormatter(formatter)
             self._logger.addHandler(file_handler)
 
+        # Print the phase summary (and write the trace, if requested) at exit
+        if trace_file_path:
+            Logger._trace_file_path = trace_file_path
+        if not Logger._report_registered:
+            atexit.register(Logger.report_phases)
+            Logger._report_registered = True
+
     @staticmethod
-    def phase(name):
+    def phase(name, video=None):
+        """Open a timed phase span. Use with `with` or as a decorator."""
+        return Phase(name, video)
+
+    @staticmethod
+    def current_video():
+        """Return the video of the innermost open span on this thread, or None.
+
+        Span stacks are per thread, so capture this before handing work to a
+        thread pool and pass it to `Logger.phase` inside the task.
+        """
+        span = Phase.current()
+        return span.video if span is not None else None
+
+    @staticmethod
+    def _banner(name, video=None):
+        label = f"{name.upper()} [{video}]" if video else name.upper()
         print(f"\n{Logger.BOLD}{Logger.HEADER}{'='*60}{Logger.ENDC}")
-        print(f"{Logger.BOLD}{Logger.HEADER} PHASE: {name.upper()} ".center(60, " "))
+        print(f"{Logger.BOLD}{Logger.HEADER} PHASE: {label} ".center(60, " "))
         print(f"{Logger.BOLD}{Logger.HEADER}{'='*60}{Logger.ENDC}")
         # Also log to file without colors
-        logging.getLogger(__name__).info(f"PHASE: {name.upper()}")
+        logging.getLogger(__name__).info(f"PHASE: {label}")
+
+    @staticmethod
+    def _record_span(span):
+        with Logger._spans_lock:
+            Logger._spans.append(span)
+            row = Logger._phase_totals[(span["name"], span["video"] or "-")]
+            row["calls"] += 1
+            row["wall_ns"] += span["wall_ns"]
+            row["cpu_ns"] += span["cpu_ns"]
+        logging.getLogger(__name__).debug(
+            f"PHASE DONE: {span['name']} wall={span['wall_ns'] / 1e9:.3f}s "
+            f"cpu={span['cpu_ns'] / 1e9:.3f}s"
+        )
+
+    @staticmethod
+    def counter(name, **values):
+        """Record a sample of numeric values (e.g. a concurrency limit) for the trace."""
+        sample = {"name": name, "ts_ns": time.perf_counter_ns() - _TRACE_EPOCH_NS, "values": values}
+        with Logger._spans_lock:
+            Logger._counters.append(sample)
+
+    @staticmethod
+    def counters():
+        """Return a snapshot of the most recent counter samples."""
+        with Logger._spans_lock:
+            return list(Logger._counters)
+
+    @staticmethod
+    def spans():
+        """Return a snapshot of the most recent finished phase spans."""
+        with Logger._spans_lock:
+            return list(Logger._spans)
+
+    @staticmethod
+    def clear_spans():
+        """Forget all recorded spans, counter samples and phase totals."""
+        with Logger._spans_lock:
+            Logger._spans.clear()
+            Logger._counters.clear()
+            Logger._phase_totals.clear()
+
+    @staticmethod
+    def write_trace(path):
+        """Write finished spans and counters as Chrome trace-event JSON (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        events = []
+        thread_names = {}
+        for span in Logger.spans():
+            thread_names[span["tid"]] = span["thread"]
+            args = {"cpu_ms": round(span["cpu_ns"] / 1e6, 3)}
+            if span["video"]:
+                args["video"] = span["video"]
+            if span["error"]:
+                args["error"] = span["error"]
+            events.append(
+                {
+                    "name": span["name"],
+                    "cat": "phase",
+                    "ph": "X",
+                    "ts": span["start_ns"] / 1e3,
+                    "dur": span["wall_ns"] / 1e3,
+                    "pid": pid,
+                    "tid": span["tid"],
+                    "args": args,
+                }
+            )
+        for sample in Logger.counters():
+            events.append(
+                {
+                    "name": sample["name"],
+                    "cat": "counter",
+                    "ph": "C",
+                    "ts": sample["ts_ns"] / 1e3,
+                    "pid": pid,
+                    "args": sample["values"],
+                }
+            )
+        for tid, thread_name in thread_names.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": thread_name},
+                }
+            )
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    @staticmethod
+    def phase_summary():
+        """Aggregate finished spans per (phase, video).
+
+        Covers every span since start (or `clear_spans`), including ones the
+        trace has already dropped.
+
+        Returns:
+            List of dicts with call count, total/mean wall seconds and total CPU seconds,
+            ordered by total wall time (slowest first).
+        """
+        with Logger._spans_lock:
+            totals = {key: dict(row) for key, row in Logger._phase_totals.items()}
+
+        rows = [
+            {
+                "phase": name,
+                "video": video,
+                "calls": row["calls"],
+                "wall_s": row["wall_ns"] / 1e9,
+                "mean_s": row["wall_ns"] / 1e9 / row["calls"],
+                "cpu_s": row["cpu_ns"] / 1e9,
+            }
+            for (name, video), row in totals.items()
+        ]
+        rows.sort(key=lambda r: r["wall_s"], reverse=True)
+        return rows
+
+    @staticmethod
+    def report_phases():
+        """Print the phase summary table and write the trace file, if configured."""
+        rows = Logger.phase_summary()
+        if not rows:
+            return
+
+        header = f"{'Phase':<32} {'Video':<24} {'Calls':>5} {'Wall s':>9} {'Mean s':>9} {'CPU s':>9}"
+        lines = [header, "-" * len(header)]
+        for r in rows:
+            lines.append(
+                f"{r['phase'][:32]:<32} {r['video'][:24]:<24} {r['calls']:>5} "
+                f"{r['wall_s']:>9.3f} {r['mean_s']:>9.3f} {r['cpu_s']:>9.3f}"
+            )
+
+        print(f"\n{Logger.BOLD}{Logger.HEADER}PHASE TIMINGS{Logger.ENDC}")
+        for line in lines:
+            print(f"    {line}")
+        logging.getLogger(__name__).info("PHASE TIMINGS\n" + "\n".join(lines))
+
+        if Logger._trace_file_path:
+            try:
+                Logger.write_trace(Logger._trace_file_path)
+                logging.getLogger(__name__).info(
+                    f"Trace written to {Logger._trace_file_path}"
+                )
+            except OSError as e:
+                Logger.error(f"Could not write trace file: {e}")
 
     @staticmethod
     def info(msg):
@@ -0,0 +1,26 @@
+from .checkpoint import Checkpoint
+from .runner import Job, Stage, Pipeline
+from .job_queue import JobQueue, QueuedJob
+from .stages import (
+    DEFAULT_WORKERS,
+    DESCRIBE_STAGES,
+    UPLOAD_STAGES,
+    PipelineContext,
+    build_stages,
+    discover_jobs,
+)
+
+__all__ = [
+    "Checkpoint",
+    "Job",
+    "Stage",
+    "Pipeline",
+    "JobQueue",
+    "QueuedJob",
+    "DEFAULT_WORKERS",
+    "DESCRIBE_STAGES",
+    "UPLOAD_STAGES",
+    "PipelineContext",
+    "build_stages",
+    "discover_jobs",
+]
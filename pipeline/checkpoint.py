@@ -0,0 +1,94 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+from logger import Logger
+
+CHECKPOINT_FILENAME = ".pipeline_state.json"
+
+
+def _rebase(value, old: str, new: str):
+    """Move path strings under folder `old` to folder `new`, recursing into containers."""
+    if isinstance(value, str):
+        if value == old:
+            return new
+        for sep in {os.sep, "/"}:
+            if value.startswith(old + sep):
+                return str(Path(new) / value[len(old) + 1 :])
+        return value
+    if isinstance(value, list):
+        return [_rebase(item, old, new) for item in value]
+    if isinstance(value, dict):
+        return {key: _rebase(item, old, new) for key, item in value.items()}
+    return value
+
+
+class Checkpoint:
+    """Per-video record of finished pipeline stages and their outputs.
+
+    The state lives next to the video assets as a small JSON file so a crashed
+    batch can be re-run and each video resumes after its last finished stage.
+    Paths recorded under the folder are rebased when the folder is opened from
+    another location, e.g. by a worker that mounts the share elsewhere.
+    """
+
+    def __init__(self, folder: str | Path):
+        """Load (or start) the checkpoint for a video folder.
+
+        Args:
+            folder: The video asset folder the checkpoint belongs to.
+        """
+        self.folder = str(Path(folder).resolve())
+        self.path = Path(folder) / CHECKPOINT_FILENAME
+        self._lock = threading.Lock()
+        self.completed: list[str] = []
+        self.data: dict = {}
+
+        if self.path.exists():
+            try:
+                state = json.loads(self.path.read_text(encoding="utf-8"))
+                self.completed = state.get("completed", [])
+                self.data = state.get("data", {})
+                saved_folder = state.get("folder")
+                if saved_folder and saved_folder != self.folder:
+                    self.data = _rebase(self.data, saved_folder, self.folder)
+            except (OSError, ValueError) as e:
+                Logger.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+
+    def is_done(self, stage: str) -> bool:
+        """Return True if `stage` already finished for this video."""
+        return stage in self.completed
+
+    def mark_done(self, stage: str, **outputs) -> None:
+        """Record `stage` as finished along with any JSON-serializable outputs."""
+        with self._lock:
+            self.data.update(outputs)
+            if stage not in self.completed:
+                self.completed.append(stage)
+            self._save()
+
+    def update(self, **outputs) -> None:
+        """Save partial outputs of a stage that has not finished yet."""
+        with self._lock:
+            self.data.update(outputs)
+            self._save()
+
+    def reset(self) -> None:
+        """Forget all finished stages (the next run starts from scratch)."""
+        with self._lock:
+            self.completed = []
+            self.data = {}
+            if self.path.exists():
+                self.path.unlink()
+
+    def _save(self) -> None:
+        # Write to a temp file and rename so a crash never leaves half a checkpoint
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"folder": self.folder, "completed": self.completed, "data": self.data},
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, self.path)
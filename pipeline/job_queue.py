@@ -0,0 +1,287 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List
+
+# Job lifecycle: pending -> leased -> done, or back to pending on a retryable
+# failure (after a growing delay) / expired lease, and finally failed once
+# attempts run out.
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind          TEXT    NOT NULL,
+    dedupe_key    TEXT,
+    payload       TEXT    NOT NULL,
+    status        TEXT    NOT NULL DEFAULT 'pending',
+    priority      INTEGER NOT NULL DEFAULT 0,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL DEFAULT 3,
+    not_before    REAL    NOT NULL DEFAULT 0,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    result        TEXT,
+    last_error    TEXT,
+    created_at    REAL    NOT NULL,
+    updated_at    REAL    NOT NULL,
+    UNIQUE (kind, dedupe_key)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (kind, status, priority, id);
+"""
+
+
+def default_owner() -> str:
+    """Identify this worker as host:pid so leases can be traced back to a machine."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class QueuedJob:
+    """A row of the job table as seen by the worker that claimed it."""
+
+    def __init__(self, row: sqlite3.Row):
+        self.id = row["id"]
+        self.kind = row["kind"]
+        self.payload = json.loads(row["payload"])
+        self.attempts = row["attempts"]
+        self.max_attempts = row["max_attempts"]
+        self.lease_owner = row["lease_owner"]
+        self.lease_expires = row["lease_expires"]
+
+    def __repr__(self):
+        return f"QueuedJob(id={self.id}, kind={self.kind!r}, attempts={self.attempts})"
+
+
+class JobQueue:
+    """Durable job table in SQLite with lease-based claiming.
+
+    Any number of worker processes can share one database file. A worker claims
+    a job by taking a time-limited lease, extends it with `heartbeat` while it
+    works, and releases it with `complete` or `fail`. Jobs whose lease expires
+    (the worker crashed or lost its connection) become claimable again.
+
+    WAL mode gives concurrent readers and a single writer on one machine. SQLite's
+    WAL index relies on shared memory, so when the database sits on a network
+    filesystem shared by several hosts, open it with `wal=False` (rollback
+    journal with file locks) instead.
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path = "jobs.db",
+        wal: bool = True,
+        busy_timeout: float = 30,
+        retry_delay: float = 60,
+        max_retry_delay: float = 3600,
+    ):
+        """Open (and create if needed) the job database.
+
+        Args:
+            db_path: Path of the SQLite database file.
+            wal: Use WAL journaling. Disable for databases on network filesystems.
+            busy_timeout: Seconds to wait for another writer before giving up.
+            retry_delay: Seconds a failed job waits before its second attempt;
+                the wait doubles with every further attempt.
+            max_retry_delay: Upper bound on that wait.
+        """
+        self.db_path = str(db_path)
+        self.wal = wal
+        self.busy_timeout = busy_timeout
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "not_before" not in columns:
+            # Databases created before failed jobs were delayed
+            try:
+                conn.execute("ALTER TABLE jobs ADD COLUMN not_before REAL NOT NULL DEFAULT 0")
+            except sqlite3.OperationalError as e:
+                if "duplicate column" not in str(e):
+                    raise
+
+    def _conn(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path, timeout=self.busy_timeout, isolation_level=None
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA journal_mode={'WAL' if self.wal else 'DELETE'}")
+            conn.execute("PRAGMA synchronous=NORMAL" if self.wal else "PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, sql: str, params: Iterable = ()) -> int:
+        """Run a single write statement and return the number of changed rows."""
+        return self._conn().execute(sql, tuple(params)).rowcount
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict,
+        dedupe_key: str | None = None,
+        priority: int = 0,
+        max_attempts: int = 3,
+    ) -> int | None:
+        """Add a job.
+
+        Args:
+            kind: Job type workers filter on (e.g. 'describe', 'upload').
+            payload: JSON-serializable job arguments.
+            dedupe_key: If given, a second job with the same kind and key is ignored.
+            priority: Lower values are claimed first.
+            max_attempts: Attempts before the job is marked failed.
+
+        Returns:
+            The new job ID, or None if an identical job was already queued.
+        """
+        now = time.time()
+        cursor = self._conn().execute(
+            "INSERT OR IGNORE INTO jobs "
+            "(kind, dedupe_key, payload, priority, max_attempts, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (kind, dedupe_key, json.dumps(payload), priority, max_attempts, now, now),
+        )
+        return cursor.lastrowid if cursor.rowcount else None
+
+    def claim(self, kinds: List[str], owner: str, lease_seconds: float = 300) -> QueuedJob | None:
+        """Atomically lease the next pending (or abandoned) job of one of `kinds`.
+
+        Jobs waiting out the delay after a failure are skipped until it is over.
+
+        Returns:
+            The claimed job, or None if nothing is available.
+        """
+        conn = self._conn()
+        now = time.time()
+        placeholders = ", ".join("?" for _ in kinds)
+
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can never
+        # select the same row between the SELECT and the UPDATE
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Abandoned jobs that already used up their attempts are not retried
+            conn.execute(
+                "UPDATE jobs SET status = ?, last_error = 'Lease expired', "
+                "lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts",
+                (FAILED, now, LEASED, now),
+            )
+            row = conn.execute(
+                f"SELECT id FROM jobs WHERE kind IN ({placeholders}) "
+                "AND ((status = ? AND not_before <= ?) OR (status = ? AND lease_expires < ?)) "
+                "ORDER BY priority, id LIMIT 1",
+                (*kinds, PENDING, now, LEASED, now),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (LEASED, owner, now + lease_seconds, now, row["id"]),
+            )
+            job = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return QueuedJob(job)
+
+    def heartbeat(self, job_id: int, owner: str, lease_seconds: float = 300) -> bool:
+        """Extend the lease on `job_id`. Returns False if `owner` no longer holds it."""
+        now = time.time()
+        return bool(
+            self._write(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (now + lease_seconds, now, job_id, LEASED, owner),
+            )
+        )
+
+    def complete(self, job_id: int, owner: str, result: dict | None = None) -> bool:
+        """Mark a leased job as done. Returns False if the lease was lost."""
+        return bool(
+            self._write(
+                "UPDATE jobs SET status = ?, result = ?, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (DONE, json.dumps(result or {}), time.time(), job_id, LEASED, owner),
+            )
+        )
+
+    def fail(self, job_id: int, owner: str, error: str, retry: bool = True) -> bool:
+        """Release a leased job after an error.
+
+        The job goes back to pending while it has attempts left (and `retry` is
+        True), otherwise it is marked failed. A retried job is not claimed again
+        for `retry_delay` seconds, doubling with every attempt up to
+        `max_retry_delay`, so a job that always fails does not hot-loop.
+        Returns False if the lease was lost.
+        """
+        now = time.time()
+        return bool(
+            self._write(
+                "UPDATE jobs SET status = CASE WHEN ? AND attempts < max_attempts "
+                "THEN ? ELSE ? END, not_before = ? + MIN(?, ? * (1 << MAX(attempts - 1, 0))), "
+                "last_error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (
+                    int(retry),
+                    PENDING,
+                    FAILED,
+                    now,
+                    self.max_retry_delay,
+                    self.retry_delay,
+                    error,
+                    now,
+                    job_id,
+                    LEASED,
+                    owner,
+                ),
+            )
+        )
+
+    def retry_failed(self, kind: str | None = None) -> int:
+        """Move failed jobs back to pending with a fresh attempt budget."""
+        sql = "UPDATE jobs SET status = ?, attempts = 0, not_before = 0, updated_at = ? WHERE status = ?"
+        params = [PENDING, time.time(), FAILED]
+        if kind:
+            sql += " AND kind = ?"
+            params.append(kind)
+        return self._write(sql, params)
+
+    def counts(self) -> dict:
+        """Return {kind: {status: count}} for a quick overview of the queue."""
+        counts: dict = {}
+        for row in self._conn().execute(
+            "SELECT kind, status, COUNT(*) AS n FROM jobs GROUP BY kind, status"
+        ):
+            counts.setdefault(row["kind"], {})[row["status"]] = row["n"]
+        return counts
+
+    def list_jobs(self, status: str | None = None) -> List[sqlite3.Row]:
+        """Return job rows, optionally filtered by status, oldest first."""
+        if status:
+            return self._conn().execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY id", (status,)
+            ).fetchall()
+        return self._conn().execute("SELECT * FROM jobs ORDER BY id").fetchall()
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,149 @@
+import queue
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, List
+
+from logger import Logger
+from .checkpoint import Checkpoint
+
+# Marks the end of the job stream on a stage's input queue
+_STOP = object()
+
+
+class Job:
+    """A single video moving through the pipeline.
+
+    `checkpoint.data` holds the durable outputs of finished stages, while
+    `context` holds in-memory objects (e.g. a Gemini chat) that cannot survive
+    a restart.
+    """
+
+    def __init__(self, folder: str | Path):
+        self.folder = Path(folder)
+        self.name = self.folder.name
+        self.checkpoint = Checkpoint(self.folder)
+        self.context: dict = {}
+        self.error: str | None = None
+
+    @property
+    def data(self) -> dict:
+        return self.checkpoint.data
+
+
+class Stage:
+    """A named pipeline step backed by its own bounded pool of worker threads."""
+
+    def __init__(self, name: str, func: Callable[[Job], dict | None], workers: int = 1):
+        """Create a Stage.
+
+        Args:
+            name: Stage name, used for logging, phase spans and checkpoints.
+            func: Called with the Job. Returns a dict of JSON-serializable outputs
+                to checkpoint (or None). Raising marks the job as failed.
+            workers: Number of jobs this stage may process concurrently.
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+
+
+class Pipeline:
+    """Runs jobs through a chain of stages, each with its own worker pool.
+
+    Stages are connected by bounded queues, so while one video is uploading the
+    next one can already be waiting on Gemini. Each finished stage is
+    checkpointed per video, and stages that already finished are skipped.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 8):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.finished: List[Job] = []
+        self.failed: List[Job] = []
+        self._results_lock = threading.Lock()
+
+    def run(self, jobs: Iterable[Job]) -> List[Job]:
+        """Push `jobs` through every stage and block until all are finished.
+
+        Returns:
+            The jobs that completed every stage. Failed jobs are in `self.failed`.
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        remaining = [stage.workers for stage in self.stages]
+        remaining_lock = threading.Lock()
+        threads = []
+
+        def worker(index: int) -> None:
+            stage = self.stages[index]
+            inbox = queues[index]
+            outbox = queues[index + 1] if index + 1 < len(self.stages) else None
+
+            while True:
+                job = inbox.get()
+                if job is _STOP:
+                    break
+                if self._process(stage, job):
+                    if outbox is not None:
+                        outbox.put(job)
+                    else:
+                        with self._results_lock:
+                            self.finished.append(job)
+
+            # The last worker of a stage to exit closes the next stage's queue
+            with remaining_lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last and outbox is not None:
+                for _ in range(self.stages[index + 1].workers):
+                    outbox.put(_STOP)
+
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=worker, args=(index,), name=f"{stage.name}-{n + 1}", daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        for job in jobs:
+            queues[0].put(job)
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_STOP)
+
+        for thread in threads:
+            thread.join()
+
+        Logger.info(
+            f"Pipeline finished: {len(self.finished)} completed, {len(self.failed)} failed."
+        )
+        return self.finished
+
+    def run_one(self, job: Job) -> bool:
+        """Run a single job through every stage sequentially on the calling thread.
+
+        Returns:
+            True if the job completed every stage.
+        """
+        for stage in self.stages:
+            if not self._process(stage, job):
+                return False
+        with self._results_lock:
+            self.finished.append(job)
+        return True
+
+    def _process(self, stage: Stage, job: Job) -> bool:
+        if job.checkpoint.is_done(stage.name):
+            Logger.info(f"[{job.name}] Skipping '{stage.name}' (already checkpointed).")
+            return True
+
+        with Logger.phase(stage.name, video=job.name):
+            try:
+                outputs = stage.func(job) or {}
+                job.checkpoint.mark_done(stage.name, **outputs)
+                return True
+            except Exception as e:
+                job.error = f"{stage.name}: {e}"
+                Logger.error(f"[{job.name}] Stage '{stage.name}' failed: {e}", exc_info=True)
+                with self._results_lock:
+                    self.failed.append(job)
+                return False
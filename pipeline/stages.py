@@ -0,0 +1,374 @@
+import threading
+import time
+from functools import partial
+from pathlib import Path
+from typing import Dict, List
+
+from logger import Logger
+from gemini import (
+    GEMINI_PROOFREAD_DESCRIPTION_PROMPT,
+    DescriptionGenerator,
+    PromptCache,
+    create_gemini_chat,
+    create_gemini_client,
+    translate_srt,
+)
+from youtube import (
+    YOUTUBE_DESCRIPTION,
+    create_youtube_client,
+    get_youtube_credentials,
+    prepare_caption,
+    upload_caption_tracks,
+    upload_video,
+    verify_caption_status,
+)
+from scripts.email_description import email_description, get_config
+from utils.description_store import DescriptionStore
+from utils.description_to_list import parse_description
+from utils.keywords import KeywordTable, suggest_video_tags
+from utils.video_asset_utils import retrieve_video_asset_paths
+from .runner import Job, Stage
+
+# A hand-written description in the video folder takes priority over Gemini's
+DESCRIPTION_FILENAME = "description.md"
+
+# Stage order and default worker pool sizes. The pools for Gemini and upload
+# stages are upper bounds: the adaptive limiters in utils.concurrency_limit
+# decide how many of those calls (or upload chunks) actually run at once.
+DEFAULT_WORKERS: Dict[str, int] = {
+    "Discover": 1,
+    "Build Prompt": 2,
+    "Gemini Ideas": 8,
+    "Proofread": 8,
+    "Parse": 1,
+    "Render": 1,
+    "Translate Captions": 4,
+    "Upload": 4,
+    "Captions": 2,
+    "Email": 1,
+}
+
+# Stage subsets for split deployments: Gemini work can run anywhere, while
+# uploads run on the machine with the best uplink
+DESCRIBE_STAGES = [
+    "Discover",
+    "Build Prompt",
+    "Gemini Ideas",
+    "Proofread",
+    "Parse",
+    "Render",
+    "Translate Captions",
+]
+UPLOAD_STAGES = ["Upload", "Captions", "Email"]
+
+
+class PipelineContext:
+    """Shared, lazily created clients and settings used by the stages."""
+
+    def __init__(
+        self,
+        api_keys_path: str = "api_keys.yml",
+        login_path: str = "login_details.yml",
+        examples_dir: str = "shorts_descriptions",
+        model: str = "gemini-2.5-flash",
+        caption_settle_seconds: float = 2,
+        caption_languages: List[str] | None = None,
+        transcript_language: str = "en-US",
+        keyword_table_path: str = "keyword_df.json",
+        prompt_cache_ttl: int = 3600,
+        description_db_path: str | None = "descriptions.db",
+    ):
+        self.api_keys_path = api_keys_path
+        self.login_path = Path(login_path)
+        self.examples_dir = examples_dir
+        self.model = model
+        self.caption_settle_seconds = caption_settle_seconds
+        self.caption_languages = caption_languages or []
+        self.transcript_language = transcript_language
+        self.keyword_table_path = keyword_table_path
+        self.prompt_cache_ttl = prompt_cache_ttl
+        self.description_db_path = description_db_path
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._gemini_client = None
+        self._youtube_credentials = None
+        self._email_config = None
+        self._keyword_table = None
+        self._prompt_cache = None
+        self._description_store = None
+
+    @property
+    def gemini_client(self):
+        with self._lock:
+            if self._gemini_client is None:
+                self._gemini_client = create_gemini_client(self.api_keys_path)
+                if self._gemini_client is None:
+                    raise RuntimeError("Could not create the Gemini client.")
+            return self._gemini_client
+
+    @property
+    def prompt_cache(self) -> PromptCache | None:
+        # Every video in the run shares the cached few-shot prefix (0 disables it)
+        if not self.prompt_cache_ttl:
+            return None
+        client = self.gemini_client
+        with self._lock:
+            if self._prompt_cache is None:
+                self._prompt_cache = PromptCache(client, ttl_seconds=self.prompt_cache_ttl)
+            return self._prompt_cache
+
+    @property
+    def description_store(self) -> DescriptionStore | None:
+        # Every Gemini description is also recorded in SQLite (None disables it)
+        if not self.description_db_path:
+            return None
+        with self._lock:
+            if self._description_store is None:
+                self._description_store = DescriptionStore(self.description_db_path)
+            return self._description_store
+
+    @property
+    def youtube(self):
+        # One OAuth flow per run, but one API client per worker thread
+        with self._lock:
+            if self._youtube_credentials is None:
+                self._youtube_credentials = get_youtube_credentials()
+        if getattr(self._local, "youtube", None) is None:
+            self._local.youtube = create_youtube_client(self._youtube_credentials)
+        return self._local.youtube
+
+    @property
+    def keyword_table(self) -> KeywordTable:
+        with self._lock:
+            if self._keyword_table is None:
+                self._keyword_table = KeywordTable.load_or_build(
+                    self.keyword_table_path, [self.examples_dir]
+                )
+            return self._keyword_table
+
+    @property
+    def email_config(self):
+        with self._lock:
+            if self._email_config is None:
+                self._email_config = get_config(self.login_path)
+            return self._email_config
+
+
+def discover_jobs(root: str | Path) -> List[Job]:
+    """Return a Job for `root` itself or for each of its sub-folders.
+
+    Folders are only checked for assets by the Discover stage, so missing files
+    show up as failed jobs instead of being silently skipped.
+    """
+    root = Path(root)
+    if not root.is_dir():
+        raise ValueError(f"Path is not a directory: {root}")
+
+    if any(f.suffix.lower() == ".mov" for f in root.iterdir() if f.is_file()):
+        return [Job(root)]
+    return [Job(folder) for folder in sorted(root.iterdir()) if folder.is_dir()]
+
+
+def _generator(ctx: PipelineContext, job: Job) -> DescriptionGenerator:
+    if "generator" not in job.context:
+        job.context["generator"] = DescriptionGenerator(
+            client=ctx.gemini_client,
+            examples_dir=ctx.examples_dir,
+            store=ctx.description_store,
+            model=ctx.model,
+        )
+    return job.context["generator"]
+
+
+def discover(ctx: PipelineContext, job: Job) -> dict:
+    video, cover, transcript = retrieve_video_asset_paths(job.folder)
+    Logger.info(f"[{job.name}] Found {Path(video).name}, {Path(cover).name}, {Path(transcript).name}")
+    return {"video": video, "cover": cover, "transcript": transcript, "topic": job.name}
+
+
+def build_prompt(ctx: PipelineContext, job: Job) -> dict:
+    generator = _generator(ctx, job)
+    parts = generator.generate_prompt_parts(job.data["topic"], job.data["transcript"])
+    if not parts:
+        raise RuntimeError("Prompt generation failed.")
+    output_file = job.folder / generator.get_filename(job.data["topic"])
+    return {"prompt_prefix": parts[0], "prompt_suffix": parts[1], "output_file": str(output_file)}
+
+
+def gemini_ideas(ctx: PipelineContext, job: Job) -> dict:
+    generator = _generator(ctx, job)
+    # Each video gets its own chat so proofreading sees only its own ideas
+    if "prompt_prefix" in job.data:
+        prompt = generator.start_chat(
+            job.data["prompt_prefix"], job.data["prompt_suffix"], ctx.model, ctx.prompt_cache
+        )
+    else:
+        # Checkpoint written before prompts were split
+        generator.chat = create_gemini_chat(ctx.gemini_client, model=ctx.model)
+        prompt = job.data["prompt"]
+    ideas = generator.generate_description(prompt, "Calling Gemini for Ideas")
+    if not ideas:
+        raise RuntimeError("Gemini returned no ideas.")
+    generator.save_output(job.data["output_file"], ideas, topic=job.data["topic"])
+    job.context["chat_has_ideas"] = True
+    return {"ideas": ideas}
+
+
+def proofread(ctx: PipelineContext, job: Job) -> dict:
+    generator = _generator(ctx, job)
+    prompt = GEMINI_PROOFREAD_DESCRIPTION_PROMPT
+    if not job.context.get("chat_has_ideas"):
+        # Resumed from a checkpoint: the chat history is gone, so resend the draft
+        generator.chat = create_gemini_chat(ctx.gemini_client, model=ctx.model)
+        prompt = f"{prompt}\n{job.data['ideas']}"
+    text = generator.generate_description(prompt, "Calling Gemini for Proofreading")
+    if not text:
+        raise RuntimeError("Gemini returned no proofread description.")
+    generator.save_output(job.data["output_file"], text, topic=job.data["topic"])
+    return {"proofread": text}
+
+
+def parse(ctx: PipelineContext, job: Job) -> dict:
+    description_file = job.folder / DESCRIPTION_FILENAME
+    if description_file.exists():
+        text = description_file.read_text(encoding="utf-8")
+    else:
+        description_file = Path(job.data["output_file"])
+        text = job.data["proofread"]
+
+    parts = parse_description(text)
+    if len(parts) < 4:
+        raise ValueError(
+            f"Description has {len(parts)} of 4 parts (title, synopsis, thoughts, hashtags). "
+            f"Write {job.folder / DESCRIPTION_FILENAME} and re-run to resume."
+        )
+    return {"description_parts": parts, "description_file": str(description_file)}
+
+
+def render(ctx: PipelineContext, job: Job) -> dict:
+    title, synopsis, thoughts, hashtags = job.data["description_parts"][:4]
+    description = YOUTUBE_DESCRIPTION.format(
+        synopsis=synopsis, thoughts=thoughts, hashtags=hashtags
+    )
+    transcript = Path(job.data["transcript"]).read_text(encoding="utf-8", errors="replace")
+    table = ctx.keyword_table
+    suggestions = suggest_video_tags(
+        table, transcript, title=title, description=f"{synopsis}\n{thoughts}\n{hashtags}"
+    )
+    Logger.info(f"[{job.name}] Tags: {', '.join(suggestions['tags'])}")
+
+    # Count this video so later videos' tags favour what makes each one distinct.
+    # It is keyed by folder, so a re-run does not count it again
+    paths = [Path(job.data["description_file"]), Path(job.data["transcript"])]
+    if table.add_files(paths, doc_id=job.folder.name):
+        table.save(ctx.keyword_table_path)
+
+    return {
+        "title": title,
+        "description": description,
+        "tags": suggestions["tags"],
+        "suggested_hashtags": suggestions["hashtags"],
+    }
+
+
+def translate_captions(ctx: PipelineContext, job: Job) -> dict:
+    if not ctx.caption_languages:
+        return {"caption_tracks": {}}
+
+    transcript = Path(job.data["transcript"])
+    translations = translate_srt(
+        ctx.gemini_client,
+        transcript.read_text(encoding="utf-8"),
+        ctx.caption_languages,
+        model=ctx.model,
+    )
+
+    captions_dir = job.folder / "captions"
+    captions_dir.mkdir(exist_ok=True)
+    tracks = {}
+    for language, srt_text in translations.items():
+        path = captions_dir / f"{transcript.stem}.{language}.srt"
+        path.write_text(srt_text, encoding="utf-8")
+        tracks[language] = str(path)
+    return {"caption_tracks": tracks}
+
+
+def upload(ctx: PipelineContext, job: Job) -> dict:
+    # Captions go up in a later stage; check them now so a bad SRT fails the
+    # job before the video is uploaded rather than after
+    for path in [job.data["transcript"], *job.data.get("caption_tracks", {}).values()]:
+        prepare_caption(path)
+
+    video_id = upload_video(
+        video_file=job.data["video"],
+        title=job.data["title"],
+        description=job.data["description"],
+        tags=job.data["tags"],
+        srt_file_path=None,  # Captions run as their own stage
+        youtube=ctx.youtube,
+    )
+    return {"video_id": video_id}
+
+
+def captions(ctx: PipelineContext, job: Job) -> dict:
+    tracks = {ctx.transcript_language: job.data["transcript"]}
+    tracks.update(job.data.get("caption_tracks", {}))
+
+    # Tracks that went up in an earlier, partially failed attempt are not re-sent
+    uploaded = job.data.get("captions_uploaded", [])
+    pending = {language: path for language, path in tracks.items() if language not in uploaded}
+    results = upload_caption_tracks(
+        ctx.youtube, job.data["video_id"], pending, default_language=ctx.transcript_language
+    )
+    uploaded += [language for language, result in results.items() if not isinstance(result, Exception)]
+    job.checkpoint.update(captions_uploaded=uploaded)
+
+    failed = [language for language in tracks if language not in uploaded]
+    if failed:
+        raise RuntimeError(f"Caption upload failed for: {', '.join(failed)}")
+
+    # Give YouTube a moment to register the new entry
+    time.sleep(ctx.caption_settle_seconds)
+    verify_caption_status(ctx.youtube, job.data["video_id"])
+    return {}
+
+
+def email(ctx: PipelineContext, job: Job) -> dict:
+    email_description(Path(job.data["description_file"]), ctx.email_config)
+    return {}
+
+
+def build_stages(
+    ctx: PipelineContext,
+    workers: Dict[str, int] | None = None,
+    send_email: bool = True,
+    only: List[str] | None = None,
+) -> List[Stage]:
+    """Create the default stage chain.
+
+    Args:
+        ctx: Shared clients and settings.
+        workers: Optional per-stage worker counts overriding `DEFAULT_WORKERS`.
+        send_email: Whether to finish with the Email stage.
+        only: Optional list of stage names to keep (e.g. `UPLOAD_STAGES`).
+    """
+    funcs = {
+        "Discover": discover,
+        "Build Prompt": build_prompt,
+        "Gemini Ideas": gemini_ideas,
+        "Proofread": proofread,
+        "Parse": parse,
+        "Render": render,
+        "Translate Captions": translate_captions,
+        "Upload": upload,
+        "Captions": captions,
+        "Email": email,
+    }
+    if not send_email:
+        funcs.pop("Email")
+    if only is not None:
+        funcs = {name: func for name, func in funcs.items() if name in only}
+
+    counts = dict(DEFAULT_WORKERS, **(workers or {}))
+    return [Stage(name, partial(func, ctx), counts[name]) for name, func in funcs.items()]
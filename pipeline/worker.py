@@ -0,0 +1,185 @@
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+from logger import Logger
+from .job_queue import JobQueue, QueuedJob, default_owner
+from .runner import Job, Pipeline
+from .stages import DESCRIBE_STAGES, UPLOAD_STAGES, PipelineContext, build_stages
+
+# Job kinds and the stages each one runs. A finished 'describe' job queues the
+# matching 'upload' job, so the two can be served by different machines.
+JOB_STAGES = {
+    "describe": DESCRIBE_STAGES,
+    "upload": UPLOAD_STAGES,
+}
+NEXT_KIND = {"describe": "upload"}
+
+
+def queue_path(folder: str | Path, root: str | Path | None = None) -> str:
+    """Return how `folder` is stored in a job payload.
+
+    With a `root` the folder is stored relative to it, so workers on other hosts
+    can resolve it against their own mount of the same tree.
+
+    Raises:
+        ValueError: If the folder is not inside `root`.
+    """
+    folder = Path(folder).resolve()
+    if root is None:
+        return str(folder)
+    root = Path(root).resolve()
+    try:
+        return folder.relative_to(root).as_posix()
+    except ValueError:
+        raise ValueError(f"{folder} is not inside the jobs root {root}") from None
+
+
+def resolve_folder(folder: str, root: str | Path | None = None) -> Path:
+    """Resolve a payload folder against this host's jobs `root`."""
+    return Path(root or ".") / folder
+
+
+def enqueue_folder(
+    job_queue: JobQueue,
+    folder: str | Path,
+    kind: str = "describe",
+    root: str | Path | None = None,
+) -> int | None:
+    """Queue a video folder. Queuing the same folder twice is a no-op.
+
+    The folder is stored relative to `root` when one is given (see `queue_path`).
+    """
+    folder = queue_path(folder, root)
+    return job_queue.enqueue(kind, {"folder": folder}, dedupe_key=folder)
+
+
+class _Heartbeat:
+    """Keeps a job's lease alive from a background thread while it is processed."""
+
+    def __init__(self, job_queue: JobQueue, job: QueuedJob, owner: str, lease_seconds: float):
+        self.job_queue = job_queue
+        self.job = job
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{job.id}", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            if not self.job_queue.heartbeat(self.job.id, self.owner, self.lease_seconds):
+                self.lost = True
+                Logger.warning(f"Lost the lease on job {self.job.id}; another worker may take it.")
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+def process_job(
+    job_queue: JobQueue,
+    queued: QueuedJob,
+    ctx: PipelineContext,
+    owner: str,
+    lease_seconds: float = 300,
+    send_email: bool = True,
+    root: str | Path | None = None,
+) -> bool:
+    """Run the stages for one claimed job and report the outcome to the queue.
+
+    Relative payload folders are resolved against `root` (default: the working
+    directory).
+    """
+    folder = queued.payload["folder"]
+    pipeline = Pipeline(
+        build_stages(ctx, send_email=send_email, only=JOB_STAGES[queued.kind])
+    )
+    job = Job(str(resolve_folder(folder, root)))
+
+    Logger.info(f"Claimed {queued.kind} job {queued.id} for {job.name} (attempt {queued.attempts}).")
+    with _Heartbeat(job_queue, queued, owner, lease_seconds) as heartbeat:
+        ok = pipeline.run_one(job)
+
+    if heartbeat.lost:
+        return False
+    if not ok:
+        job_queue.fail(queued.id, owner, job.error or "Unknown error")
+        return False
+
+    job_queue.complete(queued.id, owner, {"completed": job.checkpoint.completed})
+    next_kind = NEXT_KIND.get(queued.kind)
+    if next_kind:
+        # Keep the folder exactly as queued so it stays relative to the root
+        job_queue.enqueue(next_kind, {"folder": folder}, dedupe_key=folder)
+    Logger.success(f"Finished {queued.kind} job {queued.id} for {job.name}.")
+    return True
+
+
+def run_worker(
+    job_queue: JobQueue,
+    kinds: List[str],
+    ctx: PipelineContext | None = None,
+    owner: str | None = None,
+    lease_seconds: float = 300,
+    poll_seconds: float = 5,
+    send_email: bool = True,
+    exit_when_idle: bool = False,
+    root: str | Path | None = None,
+) -> int:
+    """Claim and process jobs of `kinds` until interrupted.
+
+    Args:
+        job_queue: The shared job queue.
+        kinds: Job kinds this worker serves, e.g. ['upload'] on the upload host.
+        ctx: Shared clients and settings (created on demand if omitted).
+        owner: Lease owner name, defaults to host:pid.
+        lease_seconds: Lease length; heartbeats renew it every third of this.
+        poll_seconds: Sleep between claims when the queue is empty.
+        send_email: Whether upload jobs end with the Email stage.
+        exit_when_idle: Return once no claimable job is left instead of polling.
+        root: Directory that relative job folders are resolved against.
+
+    Returns:
+        The number of jobs processed successfully.
+    """
+    unknown = [kind for kind in kinds if kind not in JOB_STAGES]
+    if unknown:
+        raise ValueError(f"Unknown job kind(s): {', '.join(unknown)}")
+
+    ctx = ctx or PipelineContext()
+    owner = owner or default_owner()
+    processed = 0
+    Logger.info(f"Worker {owner} serving {', '.join(kinds)} jobs from {job_queue.db_path}")
+
+    while True:
+        try:
+            queued = job_queue.claim(kinds, owner, lease_seconds)
+        except Exception as e:
+            # A locked or briefly unreachable database must not kill the worker
+            Logger.error(f"Could not claim a job: {e}", exc_info=True)
+            time.sleep(poll_seconds)
+            continue
+        if queued is None:
+            if exit_when_idle:
+                return processed
+            time.sleep(poll_seconds)
+            continue
+
+        try:
+            if process_job(job_queue, queued, ctx, owner, lease_seconds, send_email, root):
+                processed += 1
+        except Exception as e:
+            Logger.error(f"Job {queued.id} crashed: {e}", exc_info=True)
+            try:
+                job_queue.fail(queued.id, owner, f"{type(e).__name__}: {e}")
+            except Exception as fail_error:
+                # The lease expires on its own and the job is picked up again
+                Logger.error(f"Could not record the failure of job {queued.id}: {fail_error}")
@@ -0,0 +1,96 @@
+import argparse
+import sys
+
+from logger import Logger
+from pipeline import (
+    DEFAULT_WORKERS,
+    Pipeline,
+    PipelineContext,
+    build_stages,
+    discover_jobs,
+)
+from utils.concurrency_limit import report_limiters
+
+
+def parse_workers(values):
+    """Parse repeated `--workers "Stage Name=N"` options into a dict."""
+    workers = {}
+    for value in values or []:
+        name, _, count = value.rpartition("=")
+        if name not in DEFAULT_WORKERS or not count.isdigit():
+            raise argparse.ArgumentTypeError(
+                f"Invalid --workers '{value}'. Stages: {', '.join(DEFAULT_WORKERS)}"
+            )
+        workers[name] = int(count)
+    return workers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run every video folder through description, upload, captions and email."
+    )
+    parser.add_argument(
+        "folder", help="A video asset folder, or a folder containing one sub-folder per video."
+    )
+    parser.add_argument(
+        "--workers",
+        action="append",
+        metavar="STAGE=N",
+        help="Worker pool size for a stage, e.g. --workers 'Gemini Ideas=6'. Repeatable.",
+    )
+    parser.add_argument(
+        "--caption-languages",
+        default="",
+        help="Comma-separated language codes to translate captions into, e.g. 'es,fr,pt-BR'.",
+    )
+    parser.add_argument(
+        "--prompt-cache-ttl",
+        type=int,
+        default=3600,
+        help="Seconds the cached example-caption prefix lives (0 sends full prompts).",
+    )
+    parser.add_argument("--no-email", action="store_true", help="Skip the Email stage.")
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore existing checkpoints and run every stage again.",
+    )
+    args = parser.parse_args(argv)
+
+    Logger(log_file_path="automation.log", trace_file_path="automation_trace.json")
+
+    try:
+        workers = parse_workers(args.workers)
+        jobs = discover_jobs(args.folder)
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        Logger.error(str(e))
+        return 2
+
+    if not jobs:
+        Logger.warning(f"No video folders found in {args.folder}")
+        return 0
+    if args.restart:
+        for job in jobs:
+            job.checkpoint.reset()
+
+    Logger.info(f"Queued {len(jobs)} video(s): {', '.join(job.name for job in jobs)}")
+    ctx = PipelineContext(
+        caption_languages=[lang.strip() for lang in args.caption_languages.split(",") if lang.strip()],
+        prompt_cache_ttl=args.prompt_cache_ttl,
+    )
+    stages = build_stages(ctx, workers=workers, send_email=not args.no_email)
+    pipeline = Pipeline(stages)
+    pipeline.run(jobs)
+    report_limiters()
+
+    for job in pipeline.failed:
+        Logger.error(f"[{job.name}] {job.error}")
+    return 1 if pipeline.failed else 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\nInterrupted by user. Re-run to resume from the last checkpoint.")
+        sys.exit(1)
@@ -1,8 +1,5 @@
 import sys
-import smtplib
-from email.message import EmailMessage
 from pathlib import Path
-import yaml
 
 try:
     from logger import Logger
@@ -14,6 +11,8 @@ except ImportError:
 
 def get_config(login_file: Path) -> dict:
     """Load and validate configuration from YAML."""
+    import yaml
+
     if not login_file.exists():
         raise FileNotFoundError(f"Missing login file: {login_file}")
 
@@ -36,9 +35,11 @@ def get_config(login_file: Path) -> dict:
     return conf
 
 
+@Logger.phase("Email Description")
 def email_description(path: Path, conf: dict) -> None:
     """Send video description using provided configuration dictionary."""
-    Logger.phase("Email Description")
+    import smtplib
+    from email.message import EmailMessage
 
     if not path.exists():
         raise FileNotFoundError(f"File not found: {path}")
@@ -74,7 +75,9 @@ def email_description(path: Path, conf: dict) -> None:
     )
 
     with smtplib.SMTP(conf["host"], int(conf["port"])) as smtp:
-        smtp.starttls()
+        # STARTTLS can only be turned off explicitly (e.g. for a local test server)
+        if conf.get("starttls", True):
+            smtp.starttls()
         smtp.login(conf["user_name"], conf["credential"])
         smtp.send_message(msg)
 
@@ -84,11 +87,11 @@ def email_description(path: Path, conf: dict) -> None:
 def main(argv: list[str] | None = None) -> int:
     Logger(log_file_path="automation.log")
     login_path = Path("login_details.yml")
-    argv = argv or sys.argv
+    argv = sys.argv[1:] if argv is None else argv
 
     # 1. Determine the path (Argv or Input)
-    if len(argv) >= 2:
-        file_path = Path(argv[1])
+    if argv:
+        file_path = Path(argv[0])
     else:
         prompt = f"\n{Logger.BOLD}{Logger.INFO}[INPUT]{Logger.ENDC} Enter the path to the description file (or 'q' to quit): "
         print(prompt, end="")
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Tests import the project's top-level packages (`utils`, `youtube`, `benchmarks`...)
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
@@ -0,0 +1,120 @@
+import json
+import logging
+
+import pytest
+
+from benchmarks.fakes import FakeGenaiClient
+from gemini.batch import main, run_backlog
+from logger import Logger
+
+
+@pytest.fixture
+def backlog(tmp_path):
+    examples = tmp_path / "examples"
+    examples.mkdir()
+    (examples / "Old Movie (2025-01-01).md").write_text("An example caption.", encoding="utf-8")
+
+    manifest = []
+    for k in range(3):
+        srt = tmp_path / f"movie{k}.srt"
+        srt.write_text(f"1\n00:00:01,000 --> 00:00:02,000\nLine {k}\n", encoding="utf-8")
+        manifest.append({"topic": f"Movie {k}", "srt": str(srt)})
+
+    output_dir = tmp_path / "out"
+    options = {"output_dir": str(output_dir), "examples_dir": str(examples), "poll_seconds": 0.01}
+    return manifest, options, output_dir / ".gemini_batch.json"
+
+
+def interrupt(client, manifest, options):
+    """Run until the first batch job is submitted, then stop as a killed run would."""
+    client.batch_latency = 60
+    with pytest.raises(TimeoutError):
+        run_backlog(client, manifest, timeout=0, **options)
+    # The job finishes while nobody is watching
+    client.batch_latency = 0
+    for job in client.batches._jobs.values():
+        job.ready_at = 0
+
+
+def test_an_interrupted_run_resumes_its_jobs_and_prompts(backlog, tmp_path):
+    manifest, options, state_path = backlog
+    client = FakeGenaiClient(latency=0)
+    interrupt(client, manifest, options)
+
+    state = json.loads(state_path.read_text(encoding="utf-8"))
+    assert list(state["jobs"]) == ["ideas"]
+    submitted = client.batches._jobs[state["jobs"]["ideas"]].requests
+
+    # A newer example would change freshly rendered prompts, but not the saved ones
+    (tmp_path / "examples" / "New Movie (2026-01-01).md").write_text("A new caption.", encoding="utf-8")
+    results = run_backlog(client, manifest, **options)
+
+    assert len(client.batches._jobs) == 2  # ideas (resumed) + proofread, none twice
+    proofread = [job for name, job in client.batches._jobs.items() if name != state["jobs"]["ideas"]][0]
+    assert [r["contents"][0] for r in proofread.requests] == [r["contents"][0] for r in submitted]
+    for entry in manifest:
+        text = open(results[entry["topic"]], encoding="utf-8").read()
+        assert text.count(client.response_text) == 2
+    assert not state_path.exists()
+
+
+def test_a_state_file_from_another_run_is_refused(backlog):
+    manifest, options, state_path = backlog
+    client = FakeGenaiClient(latency=0)
+    interrupt(client, manifest, options)
+    before = state_path.read_text(encoding="utf-8")
+
+    with pytest.raises(ValueError, match="different backlog run"):
+        run_backlog(client, manifest[:2], **options)
+
+    # A changed transcript is a different run too
+    with open(manifest[0]["srt"], "a", encoding="utf-8") as f:
+        f.write("\n2\n00:00:03,000 --> 00:00:04,000\nMore\n")
+    with pytest.raises(ValueError, match="different backlog run"):
+        run_backlog(client, manifest, **options)
+
+    assert state_path.read_text(encoding="utf-8") == before
+    assert len(client.batches._jobs) == 1
+
+
+def test_failed_requests_leave_the_other_topics_done(backlog):
+    manifest, options, state_path = backlog
+    # Request 1 fails in each batch: Movie 1's ideas, then Movie 2's proofreading
+    client = FakeGenaiClient(latency=0, batch_fail_indices=(1,))
+
+    results = run_backlog(client, manifest, **options)
+
+    assert open(results["Movie 0"], encoding="utf-8").read().count(client.response_text) == 2
+    assert results["Movie 1"] is None
+    assert results["Movie 2"] is None
+    # Only the topics whose ideas came back are proofread
+    proofread = list(client.batches._jobs.values())[1]
+    assert len(proofread.requests) == 2
+    assert not state_path.exists()
+
+
+def test_the_cli_explains_how_to_resume_after_a_timeout(backlog, tmp_path, monkeypatch, capsys):
+    manifest, options, state_path = backlog
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    client = FakeGenaiClient(latency=0, batch_latency=60)
+    monkeypatch.setattr("gemini.client.create_gemini_client", lambda path: client)
+    # main() sets up the log file and the trace written at exit; keep both out of the tree
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(logging.getLogger("logger"), "handlers", [])
+    monkeypatch.setattr(Logger, "_trace_file_path", None)
+    argv = [
+        str(manifest_path),
+        "--output-dir", options["output_dir"],
+        "--examples-dir", options["examples_dir"],
+        "--timeout-hours", "0.000001",
+        "--poll-seconds", "0.01",
+        "--db", "",
+    ]
+
+    assert main(argv) == 1
+
+    out = capsys.readouterr().out
+    assert str(state_path) in out
+    assert f"python cli.py batch {manifest_path}" in out
+    assert state_path.exists()
@@ -0,0 +1,21 @@
+from benchmarks.fakes import FakeGenaiClient
+from gemini.caption_translator import translate_cue_texts, translate_srt
+
+SRT = "1\n00:00:01,000 --> 00:00:02,000\nHello\n\n2\n00:00:03,000 --> 00:00:04,000\nWorld\n\n"
+
+
+def test_cue_texts_are_translated_in_one_request():
+    client = FakeGenaiClient(latency=0, response_text='["Hola", "Mundo"]')
+
+    assert translate_cue_texts(client, ["Hello", "World"], "es") == ["Hola", "Mundo"]
+    assert client.calls == 1
+
+
+def test_a_blocked_reply_keeps_the_original_captions():
+    client = FakeGenaiClient(latency=0)
+    # Blocked or empty responses carry no text at all
+    client.response_text = None
+
+    translations = translate_srt(client, SRT, ["es"])
+
+    assert translations == {"es": SRT}
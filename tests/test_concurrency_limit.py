@@ -0,0 +1,230 @@
+import threading
+import time
+
+import pytest
+
+from utils import concurrency_limit
+from utils.concurrency_limit import AdaptiveLimiter
+
+
+class FakeClock:
+    """Stands in for the `time` module inside utils.concurrency_limit."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(concurrency_limit, "time", clock)
+    return clock
+
+
+def finish(limiter, rtt, **kwargs):
+    """Run one call that took `rtt` seconds."""
+    started = limiter.acquire()
+    limiter.release(started - rtt, **kwargs)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for the other threads.")
+        time.sleep(0.001)
+
+
+def start_queued(limiter, name, order, errors):
+    """Start a thread that queues on `limiter`, and wait until it holds its ticket."""
+
+    def run():
+        try:
+            started = limiter.acquire()
+        except BaseException as e:
+            errors.append((name, type(e).__name__))
+            return
+        order.append(name)
+        limiter.release(started)
+
+    ticket = limiter._next_ticket
+    thread = threading.Thread(target=run, name=name)
+    thread.start()
+    wait_for(lambda: limiter._next_ticket > ticket)
+    return thread
+
+
+class Interrupted(BaseException):
+    pass
+
+
+def interrupt_waits(limiter, names):
+    """Make `Condition.wait` raise in the named threads (like a KeyboardInterrupt)."""
+    wait = limiter._cond.wait
+
+    def interrupted(*args):
+        if threading.current_thread().name in names:
+            raise Interrupted()
+        return wait(*args)
+
+    limiter._cond.wait = interrupted
+
+
+def test_callers_are_admitted_in_arrival_order():
+    limiter = AdaptiveLimiter("test", initial=1, max_limit=1)
+    held = limiter.acquire()
+    order, errors = [], []
+    threads = [start_queued(limiter, name, order, errors) for name in "abcde"]
+
+    limiter.release(held)
+    for thread in threads:
+        thread.join(5)
+
+    assert order == list("abcde")
+    assert errors == []
+
+
+def test_abandoned_tickets_are_skipped():
+    limiter = AdaptiveLimiter("test", initial=1, max_limit=1)
+    held = limiter.acquire()
+    interrupt_waits(limiter, {"b", "c"})
+    order, errors = [], []
+    threads = [start_queued(limiter, name, order, errors) for name in "abcd"]
+
+    limiter.release(held)
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ["a", "d"]
+    assert errors == [("b", "Interrupted"), ("c", "Interrupted")]
+    assert limiter._abandoned == set()
+    assert limiter.inflight == 0
+
+
+def test_an_interrupted_caller_at_the_head_hands_on_its_turn():
+    limiter = AdaptiveLimiter("test", initial=1, max_limit=1)
+    held = limiter.acquire()
+    interrupt_waits(limiter, {"a"})
+    order, errors = [], []
+    threads = [start_queued(limiter, name, order, errors) for name in "ab"]
+
+    limiter.release(held)
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ["b"]
+    assert errors == [("a", "Interrupted")]
+
+
+def test_a_burst_of_overloads_backs_off_once_per_round_trip(clock):
+    limiter = AdaptiveLimiter("test", initial=16, max_limit=32)
+    finish(limiter, 1.0)  # Baseline round trip: 1s
+    starts = [limiter.acquire() for _ in range(12)]
+
+    for started in starts[:4]:
+        limiter.release(started, TimeoutError())
+    assert limiter.limit == 8
+    assert limiter.overloads == 4
+
+    # A round trip later the next overload counts again
+    clock.now += 1.0
+    limiter.release(starts[4], TimeoutError())
+    assert limiter.limit == 4
+
+
+def test_overloads_inside_the_window_cap_the_limit_at_what_was_accepted(clock):
+    limiter = AdaptiveLimiter("test", initial=16, max_limit=32)
+    finish(limiter, 1.0)
+    starts = [limiter.acquire() for _ in range(10)]
+
+    limiter.release(starts[0], TimeoutError())  # 16 -> 8
+    for started in starts[1:4]:
+        limiter.release(started, TimeoutError())
+
+    # The last rejection came with 7 calls in flight: 6 others were accepted
+    assert limiter.limit == 6
+    assert [(d["to"], d["reason"]) for d in limiter.decisions] == [
+        (8, "overload: TimeoutError"),
+        (7, "overload: still rejecting"),
+        (6, "overload: still rejecting"),
+    ]
+
+
+def test_latency_does_not_raise_the_limit_while_a_backoff_settles(clock):
+    limiter = AdaptiveLimiter("test", initial=4, max_limit=32)
+    finish(limiter, 1.0)
+    started = limiter.acquire()
+    limiter.release(started, TimeoutError())
+    assert limiter._limit == 2
+
+    started = limiter.acquire()
+    limiter.release(started - 1.0)
+    assert limiter._limit == 2
+
+    clock.now += 1.0
+    started = limiter.acquire()
+    limiter.release(started - 1.0)
+    assert limiter._limit > 2
+
+
+def test_latency_adjusts_the_limit_once_per_round_trip(clock):
+    limiter = AdaptiveLimiter("test", initial=4, max_limit=32)
+    finish(limiter, 1.0)
+    starts = [limiter.acquire() for _ in range(4)]
+
+    limiter.release(starts[0] - 1.0)
+    adjusted = limiter._limit
+    assert adjusted > 4
+    for started in starts[1:3]:
+        limiter.release(started - 1.0)
+    assert limiter._limit == adjusted
+
+    # Keep the limit in use, or latency says nothing about it
+    clock.now += 1.0
+    starts = [limiter.acquire() for _ in range(2)]
+    limiter.release(starts[0] - 1.0)
+    assert limiter._limit > adjusted
+
+
+def test_the_limit_stays_within_its_bounds(clock):
+    limiter = AdaptiveLimiter("test", initial=2, min_limit=2, max_limit=3)
+    for _ in range(5):
+        clock.now += 10
+        started = limiter.acquire()
+        limiter.release(started, TimeoutError())
+    assert limiter.limit == 2
+
+    for _ in range(20):
+        clock.now += 10
+        starts = [limiter.acquire() for _ in range(limiter.limit)]
+        for started in starts:
+            limiter.release(started - 1.0)
+    assert limiter.limit == 3
+    assert limiter._limit <= 3
+
+
+def test_unsampled_calls_leave_the_baseline_alone():
+    limiter = AdaptiveLimiter("upload", initial=1, max_limit=4)
+    for _ in range(20):
+        finish(limiter, 1.0)
+    baseline = limiter.metrics()["long_rtt_s"]
+
+    # The short last chunk of an upload
+    finish(limiter, 0.05, sample=False)
+
+    assert limiter.metrics()["long_rtt_s"] == baseline
+    assert limiter.samples == 20
+
+
+def test_unsampled_calls_still_count_overloads():
+    limiter = AdaptiveLimiter("upload", initial=4, max_limit=4)
+    started = limiter.acquire()
+    limiter.release(started, error=TimeoutError(), sample=False)
+    assert limiter.overloads == 1
+    assert limiter.limit == 2
@@ -0,0 +1,51 @@
+from gemini.description_generator import DescriptionGenerator
+from utils.description_store import DescriptionStore
+
+TOPIC = "Is This Thing On? Review"
+
+
+def test_reimporting_saved_files_adds_nothing(tmp_path):
+    store = DescriptionStore(tmp_path / "descriptions.db")
+    generator = DescriptionGenerator(store=store, model="gemini-2.5-flash")
+    filename = tmp_path / generator.get_filename(TOPIC)
+    generator.save_output(str(filename), "Ideas text\n", "ideas", "prompt", TOPIC)
+    generator.save_output(str(filename), "Proofread text\n", "proofread", "prompt", TOPIC)
+
+    assert store.import_markdown(filename) == 0
+    assert store.topics() == [TOPIC]
+
+    # A phase added to the file by hand joins the same video
+    with open(filename, "a", encoding="utf-8") as f:
+        f.write("\n\n---\n\nHand edit")
+    assert store.import_markdown(filename) == 1
+    assert [d.phase for d in store.versions(TOPIC)] == ["ideas", "proofread", "imported"]
+
+
+def test_imported_files_take_their_topic_from_the_filename(tmp_path):
+    store = DescriptionStore(tmp_path / "descriptions.db")
+    path = tmp_path / "Hamnet Review (2025-12-05).md"
+    path.write_text("\n\n---\n\nIdeas\n\n---\n\nProofread", encoding="utf-8")
+
+    assert store.import_markdown(path) == 2
+    assert store.import_markdown(path) == 0
+    assert store.topics() == ["Hamnet Review"]
+
+
+def test_export_keeps_unsafe_topics_inside_the_folder(tmp_path):
+    store = DescriptionStore(tmp_path / "descriptions.db")
+    store.add("../AC/DC: Live?", "Text", "manual")
+    out_dir = tmp_path / "out"
+
+    paths = store.export_markdown("../AC/DC: Live?", out_dir)
+
+    assert [path.name for path in paths] == ["..ACDC Live.md"]
+    assert all(path.parent == out_dir for path in paths)
+
+
+def test_the_database_is_created_on_first_use(tmp_path):
+    db_path = tmp_path / "descriptions.db"
+    store = DescriptionStore(db_path)
+    assert not db_path.exists()
+
+    store.add("Topic", "Text", "manual")
+    assert db_path.exists()
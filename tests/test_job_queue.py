@@ -0,0 +1,148 @@
+import json
+import sqlite3
+
+import pytest
+
+from pipeline import job_queue as job_queue_module
+from pipeline import worker
+from pipeline.checkpoint import Checkpoint
+from pipeline.job_queue import FAILED, JobQueue
+from pipeline.worker import enqueue_folder, run_worker
+
+
+class FakeClock:
+    """Stands in for the `time` module inside pipeline.job_queue."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(job_queue_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.db", retry_delay=10, max_retry_delay=25)
+    yield queue
+    queue.close()
+
+
+def test_delay_doubles_and_is_capped(queue, clock):
+    queue.enqueue("describe", {"folder": "a"}, max_attempts=5)
+    expected = [10, 20, 25, 25]
+    for delay in expected:
+        job = queue.claim(["describe"], "w1")
+        assert job is not None
+        queue.fail(job.id, "w1", "boom")
+        clock.now += delay - 0.5
+        assert queue.claim(["describe"], "w1") is None
+        clock.now += 0.5
+
+
+def test_job_fails_after_max_attempts_and_retry_resets(queue, clock):
+    queue.enqueue("describe", {"folder": "a"}, max_attempts=2)
+    for _ in range(2):
+        job = queue.claim(["describe"], "w1")
+        queue.fail(job.id, "w1", "boom")
+        clock.now += 100
+
+    assert queue.counts() == {"describe": {FAILED: 1}}
+    assert queue.claim(["describe"], "w1") is None
+
+    assert queue.retry_failed() == 1
+    job = queue.claim(["describe"], "w1")
+    assert job is not None
+    assert job.attempts == 1
+
+
+def test_old_database_gets_the_backoff_column(tmp_path):
+    schema = "\n".join(
+        line for line in job_queue_module._SCHEMA.splitlines() if "not_before" not in line
+    )
+    conn = sqlite3.connect(tmp_path / "jobs.db")
+    conn.executescript(schema)
+    conn.close()
+
+    queue = JobQueue(tmp_path / "jobs.db")
+    queue.enqueue("describe", {"folder": "a"})
+    assert queue.claim(["describe"], "w1") is not None
+    queue.close()
+
+
+def test_worker_survives_a_crashing_job(queue, clock, monkeypatch):
+    queue.enqueue("describe", {"folder": "a"}, max_attempts=1)
+    queue.enqueue("describe", {"folder": "b"})
+    seen = []
+
+    def process_job(job_queue, queued, *args):
+        seen.append(queued.payload["folder"])
+        if queued.payload["folder"] == "a":
+            raise RuntimeError("disk full")
+        job_queue.complete(queued.id, "w1")
+        return True
+
+    monkeypatch.setattr(worker, "process_job", process_job)
+    processed = run_worker(queue, ["describe"], ctx=object(), owner="w1", exit_when_idle=True)
+
+    assert seen == ["a", "b"]
+    assert processed == 1
+    failed = queue.list_jobs(FAILED)
+    assert [json.loads(row["payload"])["folder"] for row in failed] == ["a"]
+    assert failed[0]["last_error"] == "RuntimeError: disk full"
+
+
+def test_worker_survives_a_failing_claim(queue, monkeypatch):
+    calls = []
+    real_claim = queue.claim
+
+    def claim(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return real_claim(*args, **kwargs)
+
+    monkeypatch.setattr(queue, "claim", claim)
+    assert run_worker(queue, ["describe"], ctx=object(), owner="w1", poll_seconds=0, exit_when_idle=True) == 0
+    assert len(calls) == 2
+
+
+def test_folder_is_queued_relative_to_root(queue, tmp_path):
+    root = tmp_path / "share"
+    (root / "videos" / "Movie 1").mkdir(parents=True)
+
+    assert enqueue_folder(queue, root / "videos" / "Movie 1", root=root)
+    assert enqueue_folder(queue, root / "videos" / "Movie 1", root=root) is None
+    job = queue.claim(["describe"], "w1")
+    assert job.payload == {"folder": "videos/Movie 1"}
+
+    with pytest.raises(ValueError, match="not inside"):
+        enqueue_folder(queue, tmp_path, root=root)
+
+
+def test_checkpoint_paths_follow_a_moved_folder(tmp_path):
+    first = tmp_path / "host-a" / "Movie 1"
+    first.mkdir(parents=True)
+    checkpoint = Checkpoint(first)
+    checkpoint.mark_done(
+        "transcribe",
+        video=str(first / "Movie 1.mp4"),
+        caption_tracks={"es": str(first / "Movie 1.es.srt")},
+        title="Movie 1",
+    )
+
+    second = tmp_path / "host-b" / "Movie 1"
+    first.parent.rename(tmp_path / "host-b")
+    moved = Checkpoint(second)
+
+    assert moved.data == {
+        "video": str(second.resolve() / "Movie 1.mp4"),
+        "caption_tracks": {"es": str(second.resolve() / "Movie 1.es.srt")},
+        "title": "Movie 1",
+    }
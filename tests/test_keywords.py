@@ -0,0 +1,21 @@
+import threading
+
+from utils.keywords import KeywordTable
+
+
+def test_concurrent_saves_merge_and_leave_no_lock_file(tmp_path):
+    path = tmp_path / "keyword_df.json"
+    tables = []
+    for i in range(8):
+        table = KeywordTable()
+        table.add_document(f"movie review number {i}", f"video:{i}")
+        tables.append(table)
+
+    threads = [threading.Thread(target=table.save, args=(path,)) for table in tables]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert KeywordTable.load(path).documents == 8
+    assert not (tmp_path / "keyword_df.json.lock").exists()
@@ -0,0 +1,38 @@
+from collections import defaultdict, deque
+
+import pytest
+
+from logger import Logger
+
+
+@pytest.fixture
+def small_trace(monkeypatch):
+    monkeypatch.setattr(Logger, "_spans", deque(maxlen=3))
+    monkeypatch.setattr(Logger, "_counters", deque(maxlen=2))
+    monkeypatch.setattr(
+        Logger, "_phase_totals", defaultdict(lambda: {"calls": 0, "wall_ns": 0, "cpu_ns": 0})
+    )
+
+
+def test_trace_keeps_only_recent_spans_but_summary_counts_all(small_trace, capsys):
+    for i in range(10):
+        with Logger.phase("Upload", video=f"Movie {i % 2}"):
+            pass
+        Logger.counter("limit", value=i)
+
+    assert len(Logger.spans()) == 3
+    assert [sample["values"]["value"] for sample in Logger.counters()] == [8, 9]
+    calls = {row["video"]: row["calls"] for row in Logger.phase_summary()}
+    assert calls == {"Movie 0": 5, "Movie 1": 5}
+
+
+def test_clear_spans_resets_trace_and_summary(small_trace, capsys):
+    with Logger.phase("Upload"):
+        pass
+    Logger.counter("limit", value=1)
+
+    Logger.clear_spans()
+
+    assert Logger.spans() == []
+    assert Logger.counters() == []
+    assert Logger.phase_summary() == []
@@ -0,0 +1,54 @@
+from benchmarks.fakes import FakeGenaiClient
+from gemini.prompt_cache import PromptCache
+
+OLD_PREFIX = "Old examples. " * 200
+NEW_PREFIX = "New examples. " * 200
+
+
+def live_caches(client):
+    return {cache.name for cache in client.caches.list()}
+
+
+def test_a_prefix_is_cached_once_and_reused():
+    client = FakeGenaiClient(latency=0)
+    cache = PromptCache(client)
+
+    name = cache.get(OLD_PREFIX)
+
+    assert cache.get(OLD_PREFIX) == name
+    assert client.caches.created == 1
+    assert (cache.hits, cache.misses) == (2, 0)
+
+
+def test_caches_of_other_models_are_kept():
+    client = FakeGenaiClient(latency=0)
+    cache = PromptCache(client, idle_seconds=0)
+
+    flash = cache.get(OLD_PREFIX, model="gemini-2.5-flash")
+    pro = cache.get(OLD_PREFIX, model="gemini-2.5-pro")
+
+    assert flash != pro
+    assert live_caches(client) == {flash, pro}
+
+
+def test_a_cache_in_use_survives_a_new_prefix():
+    client = FakeGenaiClient(latency=0)
+    cache = PromptCache(client)
+
+    old = cache.get(OLD_PREFIX)
+    new = cache.get(NEW_PREFIX)
+
+    # Another worker may still be sending a prompt against the old cache
+    assert live_caches(client) == {old, new}
+    assert client.caches.deleted == 0
+
+
+def test_an_idle_cache_is_deleted_when_its_prefix_is_replaced():
+    client = FakeGenaiClient(latency=0)
+    cache = PromptCache(client, idle_seconds=0)
+
+    cache.get(OLD_PREFIX)
+    new = cache.get(NEW_PREFIX)
+
+    assert live_caches(client) == {new}
+    assert client.caches.deleted == 1
@@ -0,0 +1,86 @@
+import pytest
+from googleapiclient.errors import HttpError
+
+from benchmarks.fakes import FakeYouTubeServer
+from utils.concurrency_limit import get_limiter, reset_limiters
+from youtube.youtube import UPLOAD_CHUNK_RETRIES, upload_video
+
+GOOD_SRT = "1\r\n00:00:01,000 --> 00:00:02,000\r\nHello\r\n\r\n2\r\n00:00:03,000 --> 00:00:04,000\r\nWorld\r\n"
+
+
+@pytest.fixture
+def server():
+    with FakeYouTubeServer() as server:
+        yield server
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"\0" * 4096)
+    return path
+
+
+def _good_srt(tmp_path):
+    path = tmp_path / "good.srt"
+    path.write_bytes(GOOD_SRT.encode("utf-8"))
+    return path
+
+
+def upload(server, video_file, srt_path):
+    return upload_video(
+        video_file=str(video_file),
+        title="Title",
+        description="Description",
+        tags=["tag"],
+        srt_file_path=str(srt_path),
+        youtube=server.build_client(),
+    )
+
+
+def test_bad_srt_is_refused_before_the_video_upload(server, video_file, tmp_path):
+    srt = tmp_path / "bad.srt"
+    srt.write_text("not a subtitle file\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="Refusing to upload"):
+        upload(server, video_file, srt)
+
+    assert server.stats == {"bytes_received": 0, "videos": 0, "captions": 0}
+
+
+def test_fixable_srt_is_uploaded_after_the_video(server, video_file, tmp_path, monkeypatch):
+    monkeypatch.setattr("youtube.youtube.time.sleep", lambda seconds: None)
+    assert upload(server, video_file, _good_srt(tmp_path)).startswith("video-")
+    assert server.stats["videos"] == 1
+    assert server.stats["captions"] == 1
+
+
+def test_overloaded_chunks_are_retried_and_the_upload_resumes(server, video_file, tmp_path, monkeypatch):
+    monkeypatch.setattr("youtube.youtube.time.sleep", lambda seconds: None)
+    reset_limiters()
+    server.fail_chunks(2, status=503)
+
+    assert upload(server, video_file, _good_srt(tmp_path)).startswith("video-")
+    assert server.stats["videos"] == 1
+    assert get_limiter("youtube-upload").metrics()["overloads"] == 2
+
+
+def test_chunk_retries_are_bounded(server, video_file, tmp_path, monkeypatch):
+    monkeypatch.setattr("youtube.youtube.time.sleep", lambda seconds: None)
+    reset_limiters()
+    server.fail_chunks(UPLOAD_CHUNK_RETRIES + 1, status=429)
+
+    with pytest.raises(HttpError):
+        upload(server, video_file, _good_srt(tmp_path))
+    assert server.stats["videos"] == 0
+
+
+def test_other_chunk_errors_are_not_retried(server, video_file, tmp_path, monkeypatch):
+    monkeypatch.setattr("youtube.youtube.time.sleep", lambda seconds: None)
+    reset_limiters()
+    server.fail_chunks(2, status=400)
+
+    with pytest.raises(HttpError):
+        upload(server, video_file, _good_srt(tmp_path))
+    assert server.stats["videos"] == 0
+    assert get_limiter("youtube-upload").metrics()["errors"] == 1
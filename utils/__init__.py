@@ -1,3 +1,22 @@
-from .video_asset_utils import retrieve_video_asset_paths, get_video_asset_paths
+import importlib
 
-__all__ = ["retrieve_video_asset_paths", "get_video_asset_paths"]
+# Submodules are imported on first attribute access to keep CLI startup cheap
+_EXPORTS = {
+    "retrieve_video_asset_paths": ".video_asset_utils",
+    "get_video_asset_paths": ".video_asset_utils",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,312 @@
+"""Adaptive concurrency limits for calls to remote backends.
+
+Each backend (Gemini, the YouTube upload endpoint) gets an `AdaptiveLimiter`
+that caps how many calls are in flight and resizes that cap from what it
+observes:
+
+- Latency (gradient): a fast-moving average of recent call latency is compared
+  with a baseline that tracks unloaded latency. While recent calls are about as
+  fast as the baseline the limit grows; when queueing makes them slower it
+  shrinks in proportion.
+- Errors (AIMD): a call that fails with a sign of overload (HTTP 429/5xx, a
+  timeout or a dropped connection) cuts the limit multiplicatively.
+
+Every limit change is recorded as a decision, logged to the debug log and added
+to the Chrome trace as a counter, and `limiter_metrics()` returns the current
+state of every backend.
+
+Usage:
+    with get_limiter("gemini").slot():
+        response = chat.send_message(prompt)
+"""
+
+import math
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict
+
+from logger import Logger
+
+# HTTP statuses that mean "send less", not "this request is wrong"
+OVERLOAD_STATUSES = {429, 500, 502, 503, 504}
+
+# Starting points per backend. Gemini handles many parallel chats; uploads share
+# one uplink, so they start serial and only widen while chunks stay fast.
+DEFAULT_LIMITS: Dict[str, dict] = {
+    "gemini": {"initial": 4, "min_limit": 1, "max_limit": 32},
+    "youtube-upload": {"initial": 1, "min_limit": 1, "max_limit": 4},
+}
+
+
+def _status_code(exc: BaseException) -> int | None:
+    # google.genai errors carry `.code`; googleapiclient HttpError carries `.resp.status`
+    for value in (
+        getattr(exc, "code", None),
+        getattr(exc, "status_code", None),
+        getattr(getattr(exc, "resp", None), "status", None),
+    ):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def is_overload(exc: BaseException) -> bool:
+    """Return True if `exc` suggests the backend (or the link to it) is saturated."""
+    if isinstance(exc, (TimeoutError, socket.timeout, ConnectionError)):
+        return True
+    return _status_code(exc) in OVERLOAD_STATUSES
+
+
+class AdaptiveLimiter:
+    """A resizable semaphore driven by call latency and overload errors.
+
+    The limit is a float so small adjustments accumulate; callers are admitted
+    while fewer than `int(limit)` calls are in flight. Lowering the limit never
+    interrupts running calls, it only holds back new ones.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: float = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        tolerance: float = 1.25,
+        smoothing: float = 0.5,
+        backoff: float = 0.5,
+        short_window: int = 5,
+        long_window: int = 1000,
+    ):
+        """Create a limiter.
+
+        Args:
+            name: Backend name used in logs, metrics and the trace.
+            initial: Starting limit.
+            min_limit: The limit never drops below this.
+            max_limit: The limit never grows above this.
+            tolerance: How much slower than the baseline recent calls may be
+                before the limit shrinks (1.25 = 25% slower).
+            smoothing: Fraction of each latency-based adjustment that is applied.
+            backoff: Factor the limit is multiplied by after an overload error.
+            short_window: Samples averaged for the recent latency.
+            long_window: Samples averaged for the baseline latency.
+        """
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.backoff = backoff
+        self._short_alpha = 2 / (short_window + 1)
+        self._long_alpha = 2 / (long_window + 1)
+
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._inflight = 0
+        self._next_ticket = 0
+        self._serving = 0
+        # Tickets whose callers gave up (e.g. KeyboardInterrupt) while queued
+        self._abandoned = set()
+        # No further overload backoff before this time (one per round trip)
+        self._backoff_until = 0.0
+        # No further latency-based adjustment before this time
+        self._next_update = 0.0
+        self._short_rtt = None
+        self._long_rtt = None
+        self._cond = threading.Condition()
+
+        self.samples = 0
+        self.errors = 0
+        self.overloads = 0
+        self.waited_s = 0.0
+        self.max_inflight = 0
+        self.decisions = deque(maxlen=500)
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    def acquire(self) -> float:
+        """Block until a slot is free. Returns the monotonic start time of the call."""
+        start = time.monotonic()
+        with self._cond:
+            # Tickets admit callers in arrival order, so none is starved
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            try:
+                while ticket != self._serving or self._inflight >= self.limit:
+                    self._cond.wait()
+            except BaseException:
+                # Hand the turn on (or mark it skipped) so later callers are not stuck
+                if ticket == self._serving:
+                    self._advance()
+                else:
+                    self._abandoned.add(ticket)
+                self._cond.notify_all()
+                raise
+            self._advance()
+            self._inflight += 1
+            self.max_inflight = max(self.max_inflight, self._inflight)
+            now = time.monotonic()
+            self.waited_s += now - start
+            # The next ticket may fit under the limit too
+            self._cond.notify_all()
+        return now
+
+    def _advance(self) -> None:
+        self._serving += 1
+        while self._serving in self._abandoned:
+            self._abandoned.discard(self._serving)
+            self._serving += 1
+
+    def release(self, started: float, error: BaseException | None = None, sample: bool = True) -> None:
+        """Free a slot and feed the call's latency and outcome to the limit.
+
+        Pass `sample=False` for a call whose latency is not comparable with the
+        others (e.g. the short last chunk of an upload). Its errors still count.
+        """
+        rtt = time.monotonic() - started
+        with self._cond:
+            inflight = self._inflight
+            self._inflight -= 1
+            if error is not None:
+                self.errors += 1
+                if is_overload(error):
+                    self.overloads += 1
+                    # A burst of rejections is one signal: back off once per round trip
+                    now = time.monotonic()
+                    if now >= self._backoff_until:
+                        self._backoff_until = now + (self._long_rtt or rtt)
+                        self._set_limit(self._limit * self.backoff, f"overload: {type(error).__name__}")
+                    elif inflight - 1 < self._limit:
+                        # Rejected calls free their slot at once; without a cap the
+                        # queue refills it and the backend keeps rejecting
+                        self._set_limit(inflight - 1, "overload: still rejecting")
+            elif sample:
+                self._on_sample(rtt, inflight)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, sample: bool = True):
+        """Hold a slot for the duration of one backend call (see `release` for `sample`)."""
+        started = self.acquire()
+        try:
+            yield
+        except BaseException as e:
+            self.release(started, e, sample)
+            raise
+        self.release(started, sample=sample)
+
+    def _on_sample(self, rtt: float, inflight: int) -> None:
+        self.samples += 1
+        if self._short_rtt is None:
+            self._short_rtt = self._long_rtt = rtt
+            return
+        self._short_rtt += self._short_alpha * (rtt - self._short_rtt)
+        # The baseline follows faster calls quickly and slower ones slowly, so it
+        # tracks unloaded latency instead of drifting up with our own queueing
+        alpha = self._short_alpha if rtt < self._long_rtt else self._long_alpha
+        self._long_rtt += alpha * (rtt - self._long_rtt)
+
+        # Callers are not using the current limit, so latency says nothing about it
+        if inflight < self._limit / 2:
+            return
+        # Calls finishing now were admitted a round trip ago, so the effect of a
+        # change only shows up one round trip later: adjust once per round trip
+        now = time.monotonic()
+        if now < self._next_update:
+            return
+        self._next_update = now + self._short_rtt
+
+        gradient = max(0.5, min(1.0, self.tolerance * self._long_rtt / self._short_rtt))
+        # A little headroom lets the limit probe upwards while latency holds
+        target = self._limit * gradient + math.log(self._limit + 1)
+        new_limit = self._limit * (1 - self.smoothing) + target * self.smoothing
+        # Hold the limit while a backoff is still settling
+        if new_limit > self._limit and now < self._backoff_until:
+            return
+        reason = "latency rising" if gradient < 1 else "latency steady"
+        self._set_limit(new_limit, reason)
+
+    def _set_limit(self, value: float, reason: str) -> None:
+        old = self.limit
+        self._limit = min(max(value, self.min_limit), self.max_limit)
+        if self.limit == old:
+            return
+        decision = {
+            "time": time.time(),
+            "from": old,
+            "to": self.limit,
+            "reason": reason,
+            "short_rtt_s": round(self._short_rtt, 4) if self._short_rtt else None,
+            "long_rtt_s": round(self._long_rtt, 4) if self._long_rtt else None,
+        }
+        self.decisions.append(decision)
+        Logger.counter(f"limit: {self.name}", limit=self.limit, inflight=self._inflight)
+        Logger.debug(f"Concurrency limit for {self.name}: {old} -> {self.limit} ({reason})")
+
+    def metrics(self) -> dict:
+        """Current limit, traffic counters and the latest decisions."""
+        with self._cond:
+            return {
+                "name": self.name,
+                "limit": self.limit,
+                "inflight": self._inflight,
+                "max_inflight": self.max_inflight,
+                "samples": self.samples,
+                "errors": self.errors,
+                "overloads": self.overloads,
+                "waited_s": round(self.waited_s, 3),
+                "short_rtt_s": round(self._short_rtt, 4) if self._short_rtt else None,
+                "long_rtt_s": round(self._long_rtt, 4) if self._long_rtt else None,
+                "decisions": list(self.decisions)[-20:],
+            }
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str, **settings) -> AdaptiveLimiter:
+    """Return the process-wide limiter for backend `name`, creating it on first use.
+
+    Settings come from `DEFAULT_LIMITS`, overridden by `settings` (only applied
+    when the limiter is created).
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = AdaptiveLimiter(name, **{**DEFAULT_LIMITS.get(name, {}), **settings})
+            _limiters[name] = limiter
+        return limiter
+
+
+def reset_limiters() -> None:
+    """Forget every limiter, so the next `get_limiter` starts fresh (benchmarks)."""
+    with _limiters_lock:
+        _limiters.clear()
+
+
+def limiter_metrics() -> Dict[str, dict]:
+    """Metrics of every limiter created in this process."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.metrics() for limiter in limiters}
+
+
+def report_limiters() -> None:
+    """Log a one-line summary per backend."""
+    for name, m in limiter_metrics().items():
+        Logger.info(
+            f"Concurrency {name}: limit {m['limit']} (peak in flight {m['max_inflight']}), "
+            f"{m['samples']} calls, {m['overloads']} overload errors, "
+            f"{len(m['decisions'])} recent limit changes, {m['waited_s']}s queued"
+        )
@@ -0,0 +1,397 @@
+"""Versioned store of generated descriptions with a full-text index.
+
+Every description Gemini writes (ideas, proofread, or imported from an existing
+markdown file) is one row with its topic, phase, model, prompt hash and
+timestamp, plus its parts as split by `parse_description`. An FTS5 index over
+topic and text makes searching thousands of past captions instant, and the
+per-topic markdown files can still be exported in the format `save_output`
+writes.
+
+Usage:
+    python cli.py descriptions import shorts_descriptions
+    python cli.py descriptions search "letterboxd hashtags"
+    python cli.py descriptions show 42
+    python cli.py descriptions export out_dir
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List
+
+from utils.description_to_list import parse_description
+
+# Separator `DescriptionGenerator.save_output` writes before every phase
+PHASE_SEPARATOR = "\n\n---\n\n"
+
+# " (YYYY-MM-DD)" at the end of a description filename
+_DATE_PATTERN = re.compile(r"\s*\(\d{4}-\d{2}-\d{2}\)$")
+
+# Characters that are illegal in Windows/macOS filenames (or separate folders)
+_UNSAFE_FILENAME_CHARS = re.compile(r'[\\/*?:"<>|]')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS descriptions (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    topic        TEXT    NOT NULL,
+    version      INTEGER NOT NULL,
+    phase        TEXT    NOT NULL,
+    model        TEXT,
+    prompt_hash  TEXT,
+    filename     TEXT,
+    text         TEXT    NOT NULL,
+    parts        TEXT    NOT NULL,
+    created_at   REAL    NOT NULL,
+    UNIQUE (topic, version)
+);
+CREATE INDEX IF NOT EXISTS descriptions_filename ON descriptions (filename);
+CREATE VIRTUAL TABLE IF NOT EXISTS descriptions_fts USING fts5(
+    topic, text, content='descriptions', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS descriptions_ai AFTER INSERT ON descriptions BEGIN
+    INSERT INTO descriptions_fts (rowid, topic, text) VALUES (new.id, new.topic, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS descriptions_ad AFTER DELETE ON descriptions BEGIN
+    INSERT INTO descriptions_fts (descriptions_fts, rowid, topic, text)
+    VALUES ('delete', old.id, old.topic, old.text);
+END;
+"""
+
+
+def topic_from_filename(filename: str | Path) -> str:
+    """'Hamnet Review (2025-12-05).md' -> 'Hamnet Review'."""
+    return _DATE_PATTERN.sub("", Path(filename).stem).strip()
+
+
+def safe_filename(name: str) -> str:
+    """Strip characters that are illegal in filenames (including path separators)."""
+    return _UNSAFE_FILENAME_CHARS.sub("", name).strip()
+
+
+def prompt_hash(prompt: str | None) -> str | None:
+    if prompt is None:
+        return None
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+class StoredDescription:
+    """A row of the description store."""
+
+    def __init__(self, row: sqlite3.Row):
+        self.id = row["id"]
+        self.topic = row["topic"]
+        self.version = row["version"]
+        self.phase = row["phase"]
+        self.model = row["model"]
+        self.prompt_hash = row["prompt_hash"]
+        self.filename = row["filename"]
+        self.text = row["text"]
+        self.parts: List[str] = json.loads(row["parts"])
+        self.created_at = row["created_at"]
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+    def __repr__(self):
+        return f"StoredDescription(id={self.id}, topic={self.topic!r}, version={self.version}, phase={self.phase!r})"
+
+
+class DescriptionStore:
+    """SQLite store of every generated description, indexed with FTS5.
+
+    Versions are numbered per topic in the order they were saved, so the ideas
+    and proofread passes of a video (and any later re-generations) can be
+    compared side by side. A video's descriptions are keyed by the markdown
+    file they were saved to, so re-importing that file adds nothing new.
+    Connections are per thread, as in `JobQueue`, and the database file is only
+    opened (and created) on first use.
+    """
+
+    def __init__(self, db_path: str | Path = "descriptions.db", busy_timeout: float = 30):
+        """Open (and create if needed) the description database.
+
+        Args:
+            db_path: Path of the SQLite database file.
+            busy_timeout: Seconds to wait for another writer before giving up.
+        """
+        self.db_path = str(db_path)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def topic_for(self, filename: str | Path) -> str:
+        """The topic of the video whose descriptions are saved to `filename`.
+
+        The topic recorded when the file was first saved wins, since the
+        filename has characters such as '?' stripped; otherwise it is derived
+        from the filename.
+        """
+        row = self._conn().execute(
+            "SELECT topic FROM descriptions WHERE filename = ? ORDER BY id LIMIT 1",
+            (Path(filename).name,),
+        ).fetchone()
+        return row["topic"] if row else topic_from_filename(filename)
+
+    def add(
+        self,
+        topic: str | None,
+        text: str,
+        phase: str,
+        model: str | None = None,
+        prompt: str | None = None,
+        filename: str | None = None,
+        created_at: float | None = None,
+    ) -> int:
+        """Record a description as the next version of `topic`.
+
+        Args:
+            topic: Video topic; found with `topic_for(filename)` when None.
+            text: The description as Gemini returned it.
+            phase: Which pass produced it (e.g. 'Calling Gemini for Ideas').
+            model: Gemini model name.
+            prompt: The prompt that produced it; only its hash is stored.
+            filename: Markdown file the description was also written to.
+            created_at: Unix timestamp (default: now).
+
+        Returns:
+            The new row ID.
+        """
+        topic = topic or self.topic_for(filename)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute(
+                "SELECT COALESCE(MAX(version), 0) + 1 FROM descriptions WHERE topic = ?", (topic,)
+            ).fetchone()[0]
+            cursor = conn.execute(
+                "INSERT INTO descriptions "
+                "(topic, version, phase, model, prompt_hash, filename, text, parts, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    topic,
+                    version,
+                    phase,
+                    model,
+                    prompt_hash(prompt),
+                    Path(filename).name if filename else None,
+                    text,
+                    json.dumps(parse_description(text), ensure_ascii=False),
+                    created_at if created_at is not None else time.time(),
+                ),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.lastrowid
+
+    def get(self, description_id: int) -> StoredDescription | None:
+        row = self._conn().execute(
+            "SELECT * FROM descriptions WHERE id = ?", (description_id,)
+        ).fetchone()
+        return StoredDescription(row) if row else None
+
+    def versions(self, topic: str) -> List[StoredDescription]:
+        """Every stored version of `topic`, oldest first."""
+        rows = self._conn().execute(
+            "SELECT * FROM descriptions WHERE topic = ? ORDER BY version", (topic,)
+        ).fetchall()
+        return [StoredDescription(row) for row in rows]
+
+    def latest(self, topic: str, phase: str | None = None) -> StoredDescription | None:
+        """The newest version of `topic`, optionally only from `phase`."""
+        sql = "SELECT * FROM descriptions WHERE topic = ?"
+        params: list = [topic]
+        if phase:
+            sql += " AND phase = ?"
+            params.append(phase)
+        row = self._conn().execute(sql + " ORDER BY version DESC LIMIT 1", params).fetchone()
+        return StoredDescription(row) if row else None
+
+    def topics(self) -> List[str]:
+        rows = self._conn().execute("SELECT DISTINCT topic FROM descriptions ORDER BY topic")
+        return [row["topic"] for row in rows]
+
+    def search(self, query: str, limit: int = 20, phase: str | None = None) -> List[dict]:
+        """Full-text search over topics and description text, best match first.
+
+        Args:
+            query: An FTS5 query ('hashtags', '"slow burn"', 'topic:hamnet', 'film*').
+            limit: Maximum number of results.
+            phase: Only return descriptions from this phase.
+
+        Returns:
+            Dicts with id, topic, version, phase, created_at and a highlighted snippet.
+        """
+        sql = (
+            "SELECT d.id, d.topic, d.version, d.phase, d.created_at, "
+            "snippet(descriptions_fts, 1, '[', ']', '...', 12) AS snippet "
+            "FROM descriptions_fts JOIN descriptions d ON d.id = descriptions_fts.rowid "
+            "WHERE descriptions_fts MATCH ?"
+        )
+        params: list = [query]
+        if phase:
+            sql += " AND d.phase = ?"
+            params.append(phase)
+        sql += " ORDER BY bm25(descriptions_fts) LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self._conn().execute(sql, params)]
+
+    def delete(self, description_id: int) -> bool:
+        return bool(
+            self._conn().execute("DELETE FROM descriptions WHERE id = ?", (description_id,)).rowcount
+        )
+
+    def import_markdown(self, path: str | Path, phase: str = "imported") -> int:
+        """Add the phases of an existing markdown file, skipping ones already stored.
+
+        Phases saved to the same file before (by `save_output` or an earlier
+        import) are recognized and skipped, and new ones join that video's topic.
+
+        Args:
+            path: A description file written by `save_output` (or by hand).
+            phase: Phase recorded for the imported versions.
+
+        Returns:
+            The number of new versions.
+        """
+        path = Path(path)
+        topic = self.topic_for(path)
+        rows = self._conn().execute(
+            "SELECT text FROM descriptions WHERE filename = ?", (path.name,)
+        ).fetchall()
+        known = {row["text"].strip() for row in rows}
+        created_at = path.stat().st_mtime
+        added = 0
+        for text in path.read_text(encoding="utf-8").split(PHASE_SEPARATOR):
+            text = text.strip()
+            if text and text not in known:
+                self.add(topic, text, phase, filename=path.name, created_at=created_at)
+                known.add(text)
+                added += 1
+        return added
+
+    def export_markdown(self, topic: str, out_dir: str | Path) -> List[Path]:
+        """Write `topic`'s versions to markdown files, as `save_output` does.
+
+        Versions go to the file they were saved to (one per generation date);
+        versions without a filename go to '<topic>.md', with the characters
+        `safe_filename` strips removed from the topic.
+
+        Returns:
+            The files written.
+        """
+        files: dict = {}
+        for d in self.versions(topic):
+            filename = Path(d.filename).name if d.filename else f"{safe_filename(topic) or 'untitled'}.md"
+            files.setdefault(filename, []).append(d.text)
+
+        paths = []
+        for filename, texts in files.items():
+            path = Path(out_dir) / filename
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("".join(PHASE_SEPARATOR + text for text in texts), encoding="utf-8")
+            paths.append(path)
+        return paths
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _markdown_files(paths: Iterable[str]) -> List[Path]:
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(p for p in sorted(path.rglob("*.md")) if not p.name.startswith("."))
+        elif path.is_file():
+            files.append(path)
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search, show, import and export stored descriptions.")
+    parser.add_argument("--db", default="descriptions.db", help="Description database path.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    search = subparsers.add_parser("search", help="Full-text search of past descriptions.")
+    search.add_argument("query", help="FTS5 query, e.g. 'hashtags' or '\"slow burn\"'.")
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument("--phase", default=None)
+
+    show = subparsers.add_parser("show", help="Print one version as a JSON list of parts.")
+    show.add_argument("id", type=int)
+    show.add_argument("--text", action="store_true", help="Print the raw text instead.")
+
+    versions = subparsers.add_parser("versions", help="List the versions of a topic.")
+    versions.add_argument("topic")
+
+    importer = subparsers.add_parser("import", help="Add existing markdown files or folders.")
+    importer.add_argument("paths", nargs="+")
+
+    export = subparsers.add_parser("export", help="Write markdown files for every (or one) topic.")
+    export.add_argument("out_dir")
+    export.add_argument("--topic", default=None)
+
+    args = parser.parse_args(argv)
+    store = DescriptionStore(args.db)
+
+    if args.command == "search":
+        try:
+            results = store.search(args.query, limit=args.limit, phase=args.phase)
+        except sqlite3.OperationalError as e:
+            print(f"Invalid search query: {e}", file=sys.stderr)
+            return 2
+        for result in results:
+            print(f"{result['id']:>6}  {result['topic']} v{result['version']} [{result['phase']}]")
+            print(f"        {' '.join(result['snippet'].split())}")
+        return 0
+
+    if args.command == "show":
+        description = store.get(args.id)
+        if description is None:
+            print(f"No description with id {args.id}.", file=sys.stderr)
+            return 1
+        print(description.text if args.text else json.dumps(description.parts, ensure_ascii=False))
+        return 0
+
+    if args.command == "versions":
+        for d in store.versions(args.topic):
+            created = time.strftime("%Y-%m-%d %H:%M", time.localtime(d.created_at))
+            print(f"{d.id:>6}  v{d.version}  {created}  {d.phase}  {d.model or '-'}  {d.prompt_hash or '-'}")
+        return 0
+
+    if args.command == "import":
+        files = _markdown_files(args.paths)
+        added = sum(store.import_markdown(path) for path in files)
+        print(f"Imported {added} version(s) from {len(files)} file(s).", file=sys.stderr)
+        return 0
+
+    topics = [args.topic] if args.topic else store.topics()
+    for topic in topics:
+        for path in store.export_markdown(topic, args.out_dir):
+            print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,7 +6,8 @@ Expected MD format:
 3..n. Thoughts (one or more paragraphs), terminated by a line containing a single dash `-`
 Last. Hashtags (single line starting with `#`)
 
-Usage: import from `utils.description_to_list` and call `description_to_list(Path)`
+Usage: import from `utils.description_to_list` and call `description_to_list(Path)`,
+or `parse_description(text)` when the markdown is already in memory.
 """
 
 import json
@@ -15,7 +16,11 @@ from pathlib import Path
 
 
 def description_to_list(path: Path):
-    text = path.read_text(encoding="utf-8").strip()
+    return parse_description(path.read_text(encoding="utf-8"))
+
+
+def parse_description(text: str):
+    text = text.strip()
     if not text:
         return []
 
@@ -76,17 +81,19 @@ def description_to_list(path: Path):
     return parts
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: md_to_list.py path/to/file.md", file=sys.stderr)
-        sys.exit(2)
-    path = Path(sys.argv[1])
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Usage: description_to_list.py path/to/file.md", file=sys.stderr)
+        return 2
+    path = Path(argv[0])
     if not path.exists():
         print(f"File not found: {path}", file=sys.stderr)
-        sys.exit(2)
+        return 2
     parts = description_to_list(path)
     print(json.dumps(parts, ensure_ascii=False))
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
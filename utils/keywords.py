@@ -0,0 +1,409 @@
+"""Local keyword, tag and hashtag extraction for video uploads.
+
+Keywords are scored with TF-IDF over 1-3 word n-grams: how often a phrase
+appears in this video's transcript and description, weighed against how many
+past videos used it. The document-frequency table is built from the
+`shorts_descriptions` archive and past transcripts, stored as JSON and updated
+incrementally as new videos are processed. Several processes may update the
+same table: saves merge with the file on disk under a lock. No network calls
+are made.
+
+Usage:
+    table = KeywordTable.load_or_build("keyword_df.json", ["shorts_descriptions"])
+    keywords = extract_keywords(transcript_text, table, title=title)
+    tags = build_tags(keywords)
+    hashtags = suggest_hashtags(keywords)
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+from utils.srt import parse_srt
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are only serialized within the process
+    fcntl = None
+
+# YouTube's limit for the combined `tags` field
+TAGS_CHAR_BUDGET = 500
+
+# Bumped when document keys change; older tables are rebuilt from the sources
+TABLE_VERSION = 2
+
+# Words, keeping hyphenated names ("chan-wook") and contractions together
+_WORD_PATTERN = re.compile(r"[^\W_]+(?:[-'][^\W_]+)*")
+_HASHTAG_PATTERN = re.compile(r"#([^\W_]+)")
+
+# Function words and spoken filler that never make useful tags
+STOPWORDS = frozenset(
+    """
+    a about above after again against all also am an and any are aren't as at be
+    because been before being below between both but by can can't cannot could
+    couldn't did didn't do does doesn't doing don't down during each even ever few
+    for from further get gets getting go goes going gonna got had hadn't has hasn't
+    have haven't having he he'd he'll he's her here here's hers herself him himself
+    his how how's i i'd i'll i'm i've if in into is isn't it it's its itself just
+    kind know let's like lot made make makes many me more most much must mustn't my
+    myself no nor not now of off oh ok okay on once one only or other ought our ours
+    ourselves out over own pretty really right said same say says see she she'd
+    she'll she's should shouldn't so some something such than that that's the their
+    theirs them themselves then there there's these they they'd they'll they're
+    they've thing things think this those though through to too um uh under until up
+    us very want was wasn't way we we'd we'll we're we've well were weren't what
+    what's when when's where where's which while who who's whom why why's will with
+    won't would wouldn't yeah yes yet you you'd you'll you're you've your yours
+    yourself yourselves
+    """.split()
+)
+
+# Longer phrases are rarer but more specific, so they get a boost
+_NGRAM_WEIGHTS = {1: 1.0, 2: 1.6, 3: 1.9}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of `text`, with hashtags split into their word and
+    possessives ("film's") reduced to the noun."""
+    text = _HASHTAG_PATTERN.sub(r" \1 ", text.lower().replace("’", "'"))
+    return [
+        word[:-2] if word.endswith("'s") else word for word in _WORD_PATTERN.findall(text)
+    ]
+
+
+def ngrams(tokens: List[str], max_n: int = 3) -> Iterable[str]:
+    """Yield 1..max_n word phrases that neither start nor end with a stopword."""
+    usable = [t not in STOPWORDS and len(t) > 1 and not t.isdigit() for t in tokens]
+    yield from (t for t, ok in zip(tokens, usable) if ok)
+    for n in range(2, max_n + 1):
+        for i in range(len(tokens) - n + 1):
+            if usable[i] and usable[i + n - 1]:
+                yield " ".join(tokens[i:i + n])
+
+
+def document_text(path: Path) -> str:
+    """Return the plain text of a description (.md) or transcript (.srt) file."""
+    text = path.read_text(encoding="utf-8", errors="replace")
+    if path.suffix.lower() == ".srt":
+        return "\n".join(cue.text for cue in parse_srt(text))
+    return text
+
+
+@contextmanager
+def _file_lock(path: str | Path):
+    """Hold an exclusive lock on `path`.lock across processes (where supported).
+
+    The lock file is removed on release. A process that was waiting on a file
+    removed meanwhile notices it no longer matches the path and locks afresh.
+    """
+    if fcntl is None:
+        yield
+        return
+    lock_path = f"{path}.lock"
+    while True:
+        f = open(lock_path, "a")
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            if os.stat(lock_path).st_ino == os.fstat(f.fileno()).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        f.close()
+    try:
+        yield
+    finally:
+        try:
+            os.unlink(lock_path)
+        except FileNotFoundError:
+            pass
+        # Closing releases the lock
+        f.close()
+
+
+class KeywordTable:
+    """Document-frequency table of n-grams across past videos.
+
+    Each document is counted once per distinct n-gram. A video is one document
+    keyed by its folder, and archive files are keyed by name, so re-adding a
+    video (even after its description file grew) is a no-op and the table can
+    be updated incrementally after every video.
+
+    Documents added since the table was loaded are kept aside until `save`,
+    which applies them to the table on disk, so concurrent workers do not
+    overwrite each other's counts.
+    """
+
+    def __init__(self, documents: int = 0, df: dict | None = None, seen: Iterable[str] = ()):
+        self.documents = documents
+        self.df = df or {}
+        self.seen = set(seen)
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def idf(self, term: str) -> float:
+        # Smoothed so unseen terms score highest without dividing by zero
+        return math.log((self.documents + 1) / (self.df.get(term, 0) + 1)) + 1
+
+    def add_document(self, text: str, doc_id: str | None = None) -> bool:
+        """Count the n-grams of `text`. Returns False if it was already counted.
+
+        Args:
+            text: Document text.
+            doc_id: Key of the document (default: a hash of `text`).
+        """
+        doc_id = doc_id or hashlib.sha1(text.encode("utf-8")).hexdigest()
+        terms = set(ngrams(tokenize(text)))
+        with self._lock:
+            if doc_id in self.seen:
+                return False
+            self._apply(doc_id, terms)
+            self._pending[doc_id] = terms
+        return True
+
+    def _apply(self, doc_id: str, terms: Iterable[str]) -> None:
+        self.seen.add(doc_id)
+        self.documents += 1
+        for term in terms:
+            self.df[term] = self.df.get(term, 0) + 1
+
+    def add_files(self, paths: Iterable[Path], doc_id: str | None = None) -> int:
+        """Add .md/.srt files, skipping ones already counted. Returns how many were new.
+
+        Args:
+            paths: Description and transcript files.
+            doc_id: Count all `paths` as one document with this key (e.g. a
+                video folder). By default each file is a document keyed by
+                its name.
+        """
+        if doc_id is not None:
+            text = "\n".join(document_text(path) for path in paths)
+            return int(bool(text.strip()) and self.add_document(text, f"video:{doc_id}"))
+
+        added = 0
+        for path in paths:
+            text = document_text(path)
+            if text.strip() and self.add_document(text, f"file:{path.name}"):
+                added += 1
+        return added
+
+    def save(self, path: str | Path) -> None:
+        """Apply the documents added since loading to the table at `path`.
+
+        The file is re-read under a lock, so documents other processes saved in
+        the meantime are kept, and this table is updated to the merged counts.
+        """
+        with self._lock, _file_lock(path):
+            merged = self.load(path) if Path(path).exists() else None
+            if merged is None:
+                merged = KeywordTable()
+            for doc_id, terms in self._pending.items():
+                if doc_id not in merged.seen:
+                    merged._apply(doc_id, terms)
+
+            state = {
+                "version": TABLE_VERSION,
+                "documents": merged.documents,
+                "seen": sorted(merged.seen),
+                "df": merged.df,
+            }
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, path)
+
+            self.documents, self.df, self.seen = merged.documents, merged.df, merged.seen
+            self._pending = {}
+
+    @classmethod
+    def load(cls, path: str | Path) -> "KeywordTable | None":
+        """Load the table at `path`, or return None if it predates `TABLE_VERSION`."""
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != TABLE_VERSION:
+            return None
+        return cls(state["documents"], state["df"], state.get("seen", ()))
+
+    @classmethod
+    def load_or_build(cls, path: str | Path, sources: Iterable[str | Path]) -> "KeywordTable":
+        """Load the table at `path`, adding any new files from `sources`, and save it.
+
+        Args:
+            path: JSON file holding the table.
+            sources: Files or directories of .md descriptions and .srt transcripts.
+        """
+        # A table written with older document keys is rebuilt (and replaced on
+        # save) rather than counting its files a second time
+        table = (cls.load(path) if Path(path).exists() else None) or cls()
+        if table.add_files(_source_files(sources)):
+            table.save(path)
+        return table
+
+
+def _source_files(sources: Iterable[str | Path]) -> List[Path]:
+    files = []
+    for source in sources:
+        source = Path(source)
+        if source.is_dir():
+            files.extend(
+                p for p in sorted(source.rglob("*"))
+                if p.suffix.lower() in (".md", ".srt") and not p.name.startswith(".")
+            )
+        elif source.is_file():
+            files.append(source)
+    return files
+
+
+def extract_keywords(
+    text: str, table: KeywordTable, title: str = "", top_n: int = 30
+) -> List[Tuple[str, float]]:
+    """Rank the n-grams of a video by TF-IDF against `table`.
+
+    Args:
+        text: Transcript and/or description text of the video.
+        table: Document frequencies of past videos.
+        title: Video title; its phrases are weighted up.
+        top_n: Number of keywords to return.
+
+    Returns:
+        (phrase, score) pairs, best first. Phrases contained in a better-ranked
+        longer phrase are dropped.
+    """
+    counts = Counter(ngrams(tokenize(text)))
+    title_terms = set(ngrams(tokenize(title)))
+    counts.update({term: 3 for term in title_terms})  # Title phrases count extra
+
+    scored = []
+    for term, tf in counts.items():
+        n = term.count(" ") + 1
+        # Longer phrases must repeat (or be in the title) to be more than noise
+        if n > 1 and tf < 2 and term not in title_terms:
+            continue
+        score = (1 + math.log(tf)) * table.idf(term) * _NGRAM_WEIGHTS[n]
+        scored.append((score, term))
+    scored.sort(reverse=True)
+
+    keywords: List[Tuple[str, float]] = []
+    chosen: List[str] = []
+    for score, term in scored:
+        padded = f" {term} "
+        if any(padded in f" {other} " for other in chosen):
+            continue
+        keywords.append((term, round(score, 4)))
+        chosen.append(term)
+        if len(keywords) >= top_n:
+            break
+    return keywords
+
+
+def _tag_cost(tag: str) -> int:
+    # YouTube counts the separating comma, and tags with spaces are quoted
+    return len(tag) + 1 + (2 if " " in tag else 0)
+
+
+def build_tags(
+    keywords: List[Tuple[str, float]], extra: Iterable[str] = (), budget: int = TAGS_CHAR_BUDGET
+) -> List[str]:
+    """Pick tags for `videos.insert` within YouTube's character budget.
+
+    Args:
+        keywords: Output of `extract_keywords`.
+        extra: Tags to include first (e.g. hashtags from the description).
+        budget: Total character budget.
+    """
+    tags, used, seen = [], 0, set()
+    for tag in list(extra) + [term for term, _ in keywords]:
+        tag = tag.strip().lstrip("#")
+        if not tag or tag.lower() in seen or len(tag) > 100:
+            continue
+        cost = _tag_cost(tag)
+        if used + cost > budget:
+            continue
+        tags.append(tag)
+        seen.add(tag.lower())
+        used += cost
+    return tags
+
+
+def suggest_hashtags(keywords: List[Tuple[str, float]], n: int = 5) -> List[str]:
+    """Turn the top keywords into hashtags (spaces and punctuation removed, at most 30 characters)."""
+    hashtags = []
+    for term, _ in keywords:
+        hashtag = "#" + re.sub(r"[\s'-]", "", term)
+        if len(hashtag) <= 30 and hashtag not in hashtags:
+            hashtags.append(hashtag)
+        if len(hashtags) >= n:
+            break
+    return hashtags
+
+
+def suggest_video_tags(
+    table: KeywordTable, transcript: str, title: str = "", description: str = ""
+) -> dict:
+    """Suggest `tags` and hashtags for one video.
+
+    Hashtags already written in the description are kept as the first tags;
+    the rest of the budget is filled with the best keywords.
+
+    Args:
+        table: Document frequencies of past videos.
+        transcript: Transcript text (SRT or plain).
+        title: Video title.
+        description: Description text, including its hashtag line.
+
+    Returns:
+        {"tags": [...], "hashtags": [...], "keywords": [(phrase, score), ...]}
+    """
+    if "-->" in transcript:
+        transcript = "\n".join(cue.text for cue in parse_srt(transcript))
+    keywords = extract_keywords(f"{transcript}\n{description}", table, title=title)
+    existing = _HASHTAG_PATTERN.findall(description)
+    return {
+        "tags": build_tags(keywords, extra=existing),
+        "hashtags": suggest_hashtags(keywords),
+        "keywords": keywords,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the keyword table or extract tags for a video.")
+    parser.add_argument("files", nargs="*", help="Transcript/description files of the video to tag.")
+    parser.add_argument("--table", default="keyword_df.json", help="Keyword table path.")
+    parser.add_argument(
+        "--source",
+        action="append",
+        default=None,
+        help="Archive files or folders added to the table (default: shorts_descriptions).",
+    )
+    parser.add_argument("--title", default="", help="Video title.")
+    args = parser.parse_args(argv)
+
+    table = KeywordTable.load_or_build(args.table, args.source or ["shorts_descriptions"])
+    print(f"Keyword table: {table.documents} documents, {len(table.df)} phrases", file=sys.stderr)
+    if not args.files:
+        return 0
+
+    text = "\n".join(document_text(Path(f)) for f in args.files)
+    keywords = extract_keywords(text, table, title=args.title)
+    print(json.dumps(
+        {
+            "keywords": keywords,
+            "tags": build_tags(keywords),
+            "hashtags": suggest_hashtags(keywords),
+        },
+        ensure_ascii=False,
+        indent=2,
+    ))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
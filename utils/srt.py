@@ -0,0 +1,332 @@
+"""SRT reading, writing, validation and normalization.
+
+`parse_srt` keeps timecodes as the exact strings from the source file, so a file
+can be parsed, have its text replaced (e.g. translated) and be written back
+without any change to the timing.
+
+`check_srt` / `check_srt_file` validate a file in a single streaming pass and,
+optionally, fix what they find: BOM, CRLF line endings, non-UTF-8 encoding,
+timecode formatting, numbering, empty cues, cue order, overlaps and long lines.
+"""
+
+import argparse
+import re
+import sys
+import textwrap
+from typing import Iterable, List
+
+
+class Cue:
+    """One subtitle block: sequence number, start/end timecodes and text."""
+
+    __slots__ = ("index", "start", "end", "text")
+
+    def __init__(self, index: int, start: str, end: str, text: str):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.text = text
+
+    def with_text(self, text: str) -> "Cue":
+        return Cue(self.index, self.start, self.end, text)
+
+    def __repr__(self):
+        return f"Cue({self.index}, {self.start!r}, {self.end!r}, {self.text!r})"
+
+
+def parse_srt(text: str) -> List[Cue]:
+    """Parse SRT `text` into cues. Blocks without a timecode line are skipped."""
+    text = text.lstrip("﻿").replace("\r\n", "\n").replace("\r", "\n")
+    cues = []
+    for block in text.split("\n\n"):
+        lines = [line for line in block.split("\n") if line.strip()]
+        # The sequence number line is optional in the wild; find the timecode line
+        for i, line in enumerate(lines[:2]):
+            if "-->" in line:
+                start, _, end = line.partition("-->")
+                index = int(lines[0]) if i == 1 and lines[0].strip().isdigit() else len(cues) + 1
+                cues.append(Cue(index, start.strip(), end.strip(), "\n".join(lines[i + 1:])))
+                break
+    return cues
+
+
+def compose_srt(cues: List[Cue]) -> str:
+    """Render cues back to SRT text."""
+    return "".join(f"{cue.index}\n{cue.start} --> {cue.end}\n{cue.text}\n\n" for cue in cues)
+
+
+# "HH:MM:SS,mmm --> HH:MM:SS,mmm", tolerating dots, missing zero padding and
+# trailing position settings
+_TIMING_PATTERN = re.compile(
+    r"^\s*(\d+):(\d{1,2}):(\d{1,2})(?:[,.](\d{1,3}))?\s*-->\s*"
+    r"(\d+):(\d{1,2}):(\d{1,2})(?:[,.](\d{1,3}))?"
+)
+_CANONICAL_TIMING = re.compile(r"\d\d:\d\d:\d\d,\d\d\d --> \d\d:\d\d:\d\d,\d\d\d")
+
+
+def format_timecode(ms: int) -> str:
+    """Format milliseconds as an SRT timecode (HH:MM:SS,mmm)."""
+    seconds, ms = divmod(ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{ms:03d}"
+
+
+def _to_ms(h: str, m: str, s: str, frac: str | None) -> int:
+    ms = int(frac.ljust(3, "0")) if frac else 0
+    return ((int(h) * 60 + int(m)) * 60 + int(s)) * 1000 + ms
+
+
+class SrtIssue:
+    """A problem found in an SRT file.
+
+    `fixed` tells whether it was corrected. A `warning` is worth reporting but
+    neither blocks an upload nor changes the file.
+    """
+
+    __slots__ = ("line", "kind", "message", "fixed", "warning")
+
+    def __init__(self, line: int, kind: str, message: str, fixed: bool, warning: bool = False):
+        self.line = line
+        self.kind = kind
+        self.message = message
+        self.fixed = fixed and not warning
+        self.warning = warning
+
+    def __str__(self):
+        status = "warning" if self.warning else "fixed" if self.fixed else "error"
+        return f"line {self.line}: {self.kind} ({status}): {self.message}"
+
+    def __repr__(self):
+        if self.warning:
+            return f"SrtIssue({self.line}, {self.kind!r}, warning=True)"
+        return f"SrtIssue({self.line}, {self.kind!r}, fixed={self.fixed})"
+
+
+class SrtReport:
+    """Result of `check_srt`: the (normalized) cues and every issue found."""
+
+    def __init__(self, cues: List[Cue], issues: List[SrtIssue]):
+        self.cues = cues
+        self.issues = issues
+
+    @property
+    def errors(self) -> List[SrtIssue]:
+        """Issues that were not (or could not be) fixed. Warnings are not errors."""
+        return [issue for issue in self.issues if not issue.fixed and not issue.warning]
+
+    @property
+    def warnings(self) -> List[SrtIssue]:
+        return [issue for issue in self.issues if issue.warning]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def changed(self) -> bool:
+        """True if normalization changed the file."""
+        return any(issue.fixed for issue in self.issues)
+
+    def text(self) -> str:
+        return compose_srt(self.cues)
+
+    def summary(self, limit: int = 5) -> str:
+        counts = {}
+        for issue in self.issues:
+            counts[issue.kind] = counts.get(issue.kind, 0) + 1
+        lines = [f"{len(self.cues)} cues, {len(self.issues)} issue(s): " + ", ".join(
+            f"{kind} x{n}" for kind, n in counts.items()
+        )]
+        lines += [f"  {issue}" for issue in self.errors[:limit]]
+        return "\n".join(lines)
+
+
+def check_srt(
+    lines: Iterable[str],
+    fix: bool = True,
+    max_line_length: int = 42,
+    max_lines: int = 2,
+) -> SrtReport:
+    """Validate (and optionally normalize) SRT content in one pass over its lines.
+
+    Each cue is checked against its predecessor only, as it is read, so the
+    cost is linear in the file size. The resulting cues are all kept for the
+    report. Cues that start before their predecessor are the one case that
+    needs a final sort (done only if seen).
+
+    Args:
+        lines: SRT lines, with or without line endings (e.g. an open file).
+        fix: Correct the problems that can be corrected. When False every
+            problem other than a warning is reported as an error (the report
+            is for checking only).
+        max_line_length: Longest allowed caption line; longer cues are re-wrapped.
+        max_lines: Lines per cue above which a warning (not an error) is
+            reported.
+
+    Returns:
+        An SrtReport with the resulting cues and all issues.
+    """
+    issues: List[SrtIssue] = []
+    cues: List[Cue] = []
+    starts: List[int] = []
+    ends: List[int] = []
+
+    def report(line_no, kind, message, fixable=True):
+        issues.append(SrtIssue(line_no, kind, message, fix and fixable))
+
+    def wrap(text_lines, line_no):
+        if any(len(line) > max_line_length for line in text_lines):
+            report(line_no, "line_length", f"Line longer than {max_line_length} characters.")
+            if fix:
+                text_lines = textwrap.wrap(" ".join(text_lines), max_line_length)
+        if len(text_lines) > max_lines:
+            # Splitting a cue would need new timings, so only warn about it
+            issues.append(
+                SrtIssue(line_no, "too_many_lines", f"Cue has {len(text_lines)} lines.", False, warning=True)
+            )
+        return text_lines
+
+    def finish(timing, text_lines, line_no):
+        start, end, index, start_text, end_text = timing
+        if not text_lines:
+            report(line_no, "empty_cue", "Cue has no text.")
+            if fix:
+                return
+        if end <= start:
+            report(line_no, "non_positive_duration", "Cue ends before it starts.")
+            if fix:
+                end = start + 1000
+                end_text = format_timecode(end)
+
+        text_lines = wrap(text_lines, line_no)
+
+        if cues and start < starts[-1]:
+            report(line_no, "out_of_order", "Cue starts before the previous cue.")
+        elif cues and start < ends[-1]:
+            report(line_no, "overlap", "Cue starts before the previous cue ends.")
+            if fix:
+                ends[-1] = max(starts[-1] + 1, start)
+                cues[-1].end = format_timecode(ends[-1])
+
+        if index != len(cues) + 1:
+            report(line_no, "numbering", f"Expected cue number {len(cues) + 1}, found {index}.")
+            if fix:
+                index = len(cues) + 1
+
+        starts.append(start)
+        ends.append(end)
+        cues.append(Cue(index, start_text, end_text, "\n".join(text_lines)))
+
+    # (start_ms, end_ms, index, start_timecode, end_timecode) of the cue being read
+    timing = None
+    text_lines: List[str] = []
+    pending_index = None
+    saw_crlf = False
+
+    line_no = 0
+    for line_no, raw in enumerate(lines, 1):
+        if line_no == 1 and raw.startswith("\ufeff"):
+            report(1, "bom", "File starts with a byte order mark.")
+            raw = raw[1:]
+        if raw.endswith("\r\n") or raw.endswith("\r"):
+            saw_crlf = True
+        line = raw.rstrip()
+
+        if not line:
+            if timing is not None:
+                finish(timing, text_lines, line_no)
+                timing, text_lines = None, []
+            continue
+
+        if "-->" in line:
+            match = _TIMING_PATTERN.match(line)
+            if match is None:
+                issues.append(SrtIssue(line_no, "bad_timecode", f"Unreadable timing: {line!r}", False))
+                continue
+            if timing is not None:
+                # A new timing line inside a cue: the blank separator is missing
+                report(line_no, "missing_blank_line", "No blank line between cues.")
+                if text_lines and text_lines[-1].isdigit():
+                    pending_index = int(text_lines.pop())
+                finish(timing, text_lines, line_no)
+                text_lines = []
+
+            g = match.groups()
+            start, end = _to_ms(*g[:4]), _to_ms(*g[4:])
+            if _CANONICAL_TIMING.fullmatch(line):
+                # Fast path: the common, well-formed case needs no re-formatting
+                start_text, end_text = line[:12], line[17:29]
+            else:
+                report(line_no, "timecode_format", f"Non-standard timing: {line.strip()!r}")
+                start_text, end_text = format_timecode(start), format_timecode(end)
+            index = pending_index if pending_index is not None else 0
+            timing, pending_index = (start, end, index, start_text, end_text), None
+        elif timing is not None:
+            text_lines.append(line)
+        elif line.isdigit():
+            pending_index = int(line)
+        elif cues:
+            # Text after a blank line inside a cue belongs to the previous cue
+            report(line_no, "stray_text", "Text outside a cue (blank line inside a caption?).")
+            if fix:
+                cues[-1].text = "\n".join(wrap(cues[-1].text.split("\n") + [line], line_no))
+        else:
+            issues.append(SrtIssue(line_no, "stray_text", f"Text before the first cue: {line!r}", False))
+
+    if timing is not None:
+        finish(timing, text_lines, line_no)
+    if saw_crlf:
+        report(1, "line_endings", "File uses CR/LF line endings.")
+
+    if fix and any(issue.kind == "out_of_order" for issue in issues):
+        order = sorted(range(len(cues)), key=starts.__getitem__)
+        cues = [cues[i] for i in order]
+        starts = [starts[i] for i in order]
+        ends = [ends[i] for i in order]
+        for i in range(len(cues)):
+            cues[i].index = i + 1
+            if i and starts[i] < ends[i - 1]:
+                ends[i - 1] = max(starts[i - 1] + 1, starts[i])
+                cues[i - 1].end = format_timecode(ends[i - 1])
+
+    if not cues and not any(issue.kind == "bad_timecode" for issue in issues):
+        issues.append(SrtIssue(line_no, "no_cues", "File contains no cues.", False))
+    return SrtReport(cues, issues)
+
+
+def check_srt_file(path, fix: bool = True, **kwargs) -> SrtReport:
+    """Run `check_srt` on a file, streaming it line by line.
+
+    Files that are not valid UTF-8 are read as Windows-1252 (the usual culprit)
+    and reported with an 'encoding' issue; the normalized output is UTF-8.
+    """
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return check_srt(f, fix=fix, **kwargs)
+    except UnicodeDecodeError:
+        with open(path, "r", encoding="cp1252", errors="replace", newline="") as f:
+            report = check_srt(f, fix=fix, **kwargs)
+        report.issues.insert(0, SrtIssue(1, "encoding", "File is not valid UTF-8.", fix))
+        return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate and normalize an SRT file.")
+    parser.add_argument("srt_file", help="The SRT file to check.")
+    parser.add_argument("--no-fix", action="store_true", help="Report problems without fixing them.")
+    parser.add_argument("--write", metavar="PATH", help="Write the normalized SRT to PATH.")
+    parser.add_argument("--max-line-length", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    report = check_srt_file(args.srt_file, fix=not args.no_fix, max_line_length=args.max_line_length)
+    print(report.summary(limit=20))
+    if args.write and report.ok:
+        with open(args.write, "w", encoding="utf-8", newline="\n") as f:
+            f.write(report.text())
+        print(f"Wrote {args.write}")
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
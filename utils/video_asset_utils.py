@@ -58,8 +58,6 @@ def get_video_asset_paths():
     # 1. Initialize your custom logger
     Logger(log_file_path="automation.log")
 
-    Logger.phase("Video Asset Discovery")
-
     while True:
         try:
             # Get user input with your class's color formatting
@@ -73,16 +71,18 @@ def get_video_asset_paths():
                 Logger.info("Exiting workflow.")
                 break
 
-            Logger.info(f"Scanning directory: {user_input}")
+            # Time the scan only, not the wait for input
+            with Logger.phase("Video Asset Discovery"):
+                Logger.info(f"Scanning directory: {user_input}")
 
-            # Attempt to retrieve paths
-            video, cover, transcript = retrieve_video_asset_paths(user_input)
+                # Attempt to retrieve paths
+                video, cover, transcript = retrieve_video_asset_paths(user_input)
 
-            # Log successes using your class methods
-            Logger.info(f"Video Path: {video}")
-            Logger.info(f"Cover Path: {cover}")
-            Logger.info(f"Transcript Path: {transcript}")
-            Logger.success("All required assets located successfully.")
+                # Log successes using your class methods
+                Logger.info(f"Video Path: {video}")
+                Logger.info(f"Cover Path: {cover}")
+                Logger.info(f"Transcript Path: {transcript}")
+                Logger.success("All required assets located successfully.")
 
             return video, cover, transcript
 
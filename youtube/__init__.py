@@ -0,0 +1,30 @@
+import importlib
+
+# Submodules are imported on first attribute access so `import youtube` does not
+# pull in the Google API client libraries until they are needed.
+_EXPORTS = {
+    "YOUTUBE_DESCRIPTION": ".constants",
+    "get_youtube_credentials": ".youtube",
+    "create_youtube_client": ".youtube",
+    "upload_video": ".youtube",
+    "prepare_caption": ".youtube",
+    "upload_caption": ".youtube",
+    "upload_caption_tracks": ".youtube",
+    "verify_caption_status": ".youtube",
+    "MmapMediaUpload": ".media",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
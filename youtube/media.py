@@ -0,0 +1,181 @@
+"""Memory-mapped media source for resumable YouTube uploads.
+
+`MmapMediaUpload` serves upload chunks as `memoryview` slices of a read-only
+mmap of the video, so no chunk is copied into a Python `bytes` object, and it
+hashes each chunk as it is served. Pages of chunks the server has already
+acknowledged are released with `madvise(MADV_DONTNEED)`, so resident memory per
+upload stays around one chunk whatever the file size.
+
+Usage:
+    media = MmapMediaUpload("video.mov")
+    request = youtube.videos().insert(part="snippet", body=body, media_body=media)
+    ...
+    print(media.hexdigest())
+    media.close()
+"""
+
+import hashlib
+import json
+import mimetypes
+import mmap
+import os
+
+from googleapiclient.http import MediaUpload
+
+# Resumable chunks must be multiples of 256 KiB; 32 MiB keeps round trips rare
+# while bounding the mapped pages held per upload
+DEFAULT_CHUNK_SIZE = 32 * 1024 * 1024
+
+
+class MmapMediaUpload(MediaUpload):
+    """A googleapiclient `MediaUpload` backed by an mmap of a local file.
+
+    `googleapiclient` calls `getbytes(begin, length)` for every chunk. The
+    returned slice references the mapping directly, and http.client sends it to
+    the socket without an intermediate copy. Chunks are hashed in order as they
+    are first served; re-sent chunks (after a retry) are not hashed twice.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        mimetype: str | None = None,
+        chunksize: int = DEFAULT_CHUNK_SIZE,
+        resumable: bool = True,
+        hash_algorithm: str = "sha256",
+    ):
+        """Map `filename` for upload.
+
+        Args:
+            filename: Path of the file to upload.
+            mimetype: Content type; guessed from the extension when omitted.
+            chunksize: Bytes per resumable request, a multiple of 256 KiB
+                (-1 sends the whole file in one request).
+            resumable: Whether to use a resumable upload session.
+            hash_algorithm: hashlib algorithm used for `hexdigest`.
+        """
+        if chunksize != -1 and (chunksize <= 0 or chunksize % (256 * 1024)):
+            raise ValueError("chunksize must be -1 or a positive multiple of 256 KiB.")
+
+        self._filename = filename
+        self._mimetype = mimetype or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        self._chunksize = chunksize
+        self._resumable = resumable
+        self._hash = hashlib.new(hash_algorithm)
+        self._hashed_to = 0
+        self._released_to = 0
+        self._slice = None
+
+        with open(filename, "rb") as f:
+            self._size = os.fstat(f.fileno()).st_size
+            # A zero-length file cannot be mapped
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self._size else None
+        if self._mmap is not None and hasattr(self._mmap, "madvise"):
+            self._mmap.madvise(mmap.MADV_SEQUENTIAL)
+        self._view = memoryview(self._mmap) if self._mmap is not None else memoryview(b"")
+
+    def chunksize(self):
+        return self._chunksize
+
+    def mimetype(self):
+        return self._mimetype
+
+    def size(self):
+        return self._size
+
+    def resumable(self):
+        return self._resumable
+
+    def has_stream(self):
+        # False makes googleapiclient request chunks through getbytes
+        return False
+
+    def stream(self):
+        return None
+
+    def getbytes(self, begin, length):
+        """Return up to `length` bytes from `begin` as a zero-copy slice.
+
+        Args:
+            begin: Offset of the first byte.
+            length: Number of bytes (-1 for the rest of the file).
+        """
+        end = self._size if length < 0 else min(begin + length, self._size)
+        # The server has acknowledged everything before `begin`
+        self._release(begin)
+        if self._slice is not None:
+            self._slice.release()
+        self._slice = self._view[begin:end]
+        if begin <= self._hashed_to < end:
+            self._hash.update(self._view[self._hashed_to:end])
+            self._hashed_to = end
+        return self._slice
+
+    def _release(self, offset):
+        if self._mmap is None or not hasattr(self._mmap, "madvise"):
+            return
+        offset -= offset % mmap.PAGESIZE
+        if offset > self._released_to:
+            self._mmap.madvise(mmap.MADV_DONTNEED, self._released_to, offset - self._released_to)
+            self._released_to = offset
+
+    def hexdigest(self) -> str | None:
+        """Hex digest of the file, or None until every byte has been served."""
+        if self._hashed_to < self._size:
+            return None
+        return self._hash.hexdigest()
+
+    def close(self):
+        """Unmap the file. Called automatically when the object is collected."""
+        if self._slice is not None:
+            self._slice.release()
+            self._slice = None
+        self._view.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # A caller still holds a slice; the map closes when it is freed
+            self._mmap = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except AttributeError:
+            pass  # __init__ failed before the file was mapped
+
+    def to_json(self):
+        """JSON with the filename, mimetype, chunk size and resumable flag, like
+        `MediaFileUpload.to_json`. The mapping and hash state are not included.
+
+        Rebuild it with `MmapMediaUpload.from_json`; `MediaUpload.new_from_json`
+        only accepts googleapiclient's own classes.
+        """
+        return json.dumps(
+            {
+                "_filename": self._filename,
+                "_mimetype": self._mimetype,
+                "_chunksize": self._chunksize,
+                "_resumable": self._resumable,
+                "_class": type(self).__name__,
+                "_module": type(self).__module__,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, s):
+        """Map the file described by `to_json` output again.
+
+        Raises:
+            ValueError: If `s` is not a JSON object with a valid filename.
+        """
+        d = json.loads(s)
+        filename = d.get("_filename") if isinstance(d, dict) else None
+        if not isinstance(filename, str) or not filename or "\x00" in filename:
+            raise ValueError("Invalid or missing '_filename' in serialized MmapMediaUpload.")
+        return cls(
+            filename,
+            mimetype=d.get("_mimetype"),
+            chunksize=d.get("_chunksize", DEFAULT_CHUNK_SIZE),
+            resumable=d.get("_resumable", True),
+        )
@@ -1,3 +1,4 @@
+import argparse
 import os
 import sys
 from pathlib import Path
@@ -7,16 +8,22 @@ project_root = Path(__file__).resolve().parents[1]
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-import google_auth_oauthlib.flow
-import googleapiclient.discovery
-import googleapiclient.errors
-from googleapiclient.http import MediaFileUpload
 from utils.description_to_list import description_to_list
-from constants import YOUTUBE_DESCRIPTION
+from utils.srt import check_srt_file
+from utils.keywords import KeywordTable, suggest_video_tags
+from utils.concurrency_limit import get_limiter, is_overload
+from youtube.constants import YOUTUBE_DESCRIPTION
 from utils.video_asset_utils import get_video_asset_paths
 from logger import Logger
+import random
 import time
 
+# Document-frequency table used to pick tags (see utils/keywords.py)
+KEYWORD_TABLE_PATH = "keyword_df.json"
+
+# Times a failed upload chunk is re-sent when the error is a sign of overload
+UPLOAD_CHUNK_RETRIES = 5
+
 # The scopes required to upload videos
 SCOPES = [
     "https://www.googleapis.com/auth/youtube.upload",
@@ -24,27 +31,66 @@ SCOPES = [
 ]
 
 
-def create_youtube_client():
+def get_youtube_credentials(client_secrets_file="client_secrets.json"):
+    """
+    Runs the OAuth flow and returns credentials that can be shared between clients.
+    """
+    import google_auth_oauthlib.flow
+
     os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = "1"
+    flow = google_auth_oauthlib.flow.InstalledAppFlow.from_client_secrets_file(
+        client_secrets_file, SCOPES
+    )
+    return flow.run_local_server(port=0)
+
+
+def create_youtube_client(credentials=None):
+    """
+    Builds a YouTube API client, running the OAuth flow unless `credentials` are given.
+
+    Clients are not thread-safe, so concurrent workers should each build their own
+    from the same credentials.
+    """
+    import googleapiclient.discovery
+
     api_service_name = "youtube"
     api_version = "v3"
-    client_secrets_file = "client_secrets.json"
 
     # Get credentials and create an API client
-    flow = google_auth_oauthlib.flow.InstalledAppFlow.from_client_secrets_file(
-        client_secrets_file, SCOPES
-    )
-    credentials = flow.run_local_server(port=0)
-    Logger.info("YouTube client created via OAuth flow.")
+    if credentials is None:
+        credentials = get_youtube_credentials()
+        Logger.info("YouTube client created via OAuth flow.")
     return googleapiclient.discovery.build(
         api_service_name, api_version, credentials=credentials
     )
 
 
-def upload_video(video_file, title, description, tags, srt_file_path, category_id="1"):
-    Logger.phase("YouTube Upload")
+@Logger.phase("YouTube Upload")
+def upload_video(
+    video_file, title, description, tags, srt_file_path, category_id="1", youtube=None
+):
+    """
+    Uploads a video and, if `srt_file_path` is given, its caption track.
+
+    The SRT is checked (and normalized) before the video goes up, so a bad file
+    raises a ValueError without leaving an uploaded video behind.
+
+    Pass an existing `youtube` client to skip the OAuth flow (e.g. when uploading
+    several videos in one run). Returns the new video ID.
+    """
+    from youtube.media import MmapMediaUpload
+
     Logger.info(f"Preparing to upload: {video_file}")
-    youtube = create_youtube_client()
+    srt_bytes = None
+    if srt_file_path is None:
+        Logger.info("No SRT file given, skipping caption upload.")
+    elif os.path.exists(srt_file_path):
+        srt_bytes = prepare_caption(srt_file_path)
+    else:
+        Logger.warning("SRT file not found, skipping caption upload.")
+
+    if youtube is None:
+        youtube = create_youtube_client()
 
     body = {
         "snippet": {
@@ -74,60 +120,198 @@ def upload_video(video_file, title, description, tags, srt_file_path, category_i
         },
     }
 
+    # Chunks are served straight from an mmap of the file, hashed on the way out
+    media = MmapMediaUpload(video_file)
+
     # Call the API's videos.insert method to create and upload the video
     insert_request = youtube.videos().insert(
         part="snippet,status",
         body=body,
-        media_body=MediaFileUpload(video_file, chunksize=-1, resumable=True),
+        media_body=media,
     )
 
     print(f"Uploading file: {video_file}...")
     response = None
-    while response is None:
-        status, response = insert_request.next_chunk()
-        if status:
-            print(f"Uploaded {int(status.progress() * 100)}%")
+    # Chunks of concurrent uploads share the adaptive "youtube-upload" limit
+    limiter = get_limiter("youtube-upload")
+    retries = 0
+    try:
+        while response is None:
+            # The short last chunk is much faster than the others, so its
+            # latency would read as a drop in the baseline
+            remaining = media.size() - insert_request.resumable_progress
+            try:
+                with limiter.slot(sample=remaining >= media.chunksize()):
+                    status, response = insert_request.next_chunk()
+            except Exception as e:
+                if not is_overload(e) or retries >= UPLOAD_CHUNK_RETRIES:
+                    raise
+                # The limiter has backed off; the next call asks the server how
+                # far the upload got and resumes from the last committed byte
+                retries += 1
+                delay = random.random() * 2**retries
+                Logger.warning(
+                    f"Upload chunk failed ({e}), retry {retries}/{UPLOAD_CHUNK_RETRIES} in {delay:.1f}s"
+                )
+                time.sleep(delay)
+                continue
+            retries = 0
+            if status:
+                print(f"Uploaded {int(status.progress() * 100)}%")
+    finally:
+        media.close()
 
     video_id = response["id"]
     Logger.success(f"Upload Complete! Video ID: {video_id}")
+    Logger.info(f"SHA-256 of uploaded file: {media.hexdigest()}")
 
     # Now upload the captions using the same 'youtube' client
-    srt_file = srt_file_path
-    if os.path.exists(srt_file):
-        upload_caption(youtube, video_id, srt_file)
+    if srt_bytes is not None:
+        upload_caption(youtube, video_id, srt_file_path, srt_bytes=srt_bytes)
 
         # Give YouTube a moment to register the new entry
         time.sleep(2)
 
         # New verification step
         verify_caption_status(youtube, video_id)
-    else:
-        Logger.warning("SRT file not found, skipping caption upload.")
 
+    return video_id
 
-def upload_caption(youtube, video_id, srt_file_path):
+
+def prepare_caption(srt_file_path, fix=True):
+    """
+    Validates an SRT file and returns the bytes to upload.
+
+    Problems that can be fixed (BOM, CRLF, encoding, numbering, overlaps, long
+    lines...) are corrected in the returned copy when `fix` is True; otherwise,
+    or if anything cannot be fixed, a ValueError is raised.
+    """
+    report = check_srt_file(srt_file_path, fix=fix)
+    if not report.ok:
+        raise ValueError(f"Refusing to upload {srt_file_path}: {report.summary()}")
+    for issue in report.warnings:
+        Logger.warning(f"{srt_file_path}: {issue}")
+
+    if report.changed:
+        Logger.warning(f"Normalized {srt_file_path} before upload: {report.summary()}")
+        return report.text().encode("utf-8")
+    with open(srt_file_path, "rb") as f:
+        return f.read()
+
+
+def upload_caption(
+    youtube,
+    video_id,
+    srt_file_path,
+    language="en-US",
+    is_default=True,
+    name="",
+    http=None,
+    fix=True,
+    srt_bytes=None,
+):
     """
     Uploads an SRT file as a caption track for the specified video.
+
+    The file is validated first with `prepare_caption` (see there for `fix`), so
+    a bad file raises a ValueError before any API call is made. Pass `srt_bytes`
+    from an earlier `prepare_caption` call to skip the check.
+
+    Pass `http` to send the request over a different connection than the client's
+    own (required when several threads share one client).
     """
-    Logger.info(f"Uploading captions for video ID: {video_id}...")
+    import io
+    from googleapiclient.http import MediaIoBaseUpload
+
+    if srt_bytes is None:
+        srt_bytes = prepare_caption(srt_file_path, fix=fix)
+    media_body = MediaIoBaseUpload(io.BytesIO(srt_bytes), mimetype="application/octet-stream")
+
+    Logger.info(f"Uploading {language} captions for video ID: {video_id}...")
 
     body = {
         "snippet": {
             "videoId": video_id,
-            "language": "en-US",  # The language of the captions
-            "isDefault": True,  # Auto-display for viewers
+            "language": language,  # The language of the captions
+            "name": name,
+            "isDefault": is_default,  # Auto-display for viewers
         }
     }
 
     insert_request = youtube.captions().insert(
         part="snippet",
         body=body,
-        media_body=MediaFileUpload(srt_file_path, mimetype="application/octet-stream"),
+        media_body=media_body,
         sync=False,  # False to preserve your SRT timings exactly
     )
 
-    response = insert_request.execute()
-    Logger.success(f"Captions uploaded! Status: {response['snippet']['status']}")
+    response = insert_request.execute(http=http)
+    Logger.success(f"Captions uploaded [{language}]! Status: {response['snippet']['status']}")
+    return response
+
+
+def _new_http(youtube):
+    """
+    Returns a fresh HTTP object carrying the client's credentials.
+
+    httplib2 connections are not thread-safe, so each concurrent request needs its own.
+    """
+    import google_auth_httplib2
+    from googleapiclient.http import build_http
+
+    http = youtube._http
+    if isinstance(http, google_auth_httplib2.AuthorizedHttp):
+        return google_auth_httplib2.AuthorizedHttp(http.credentials, http=build_http())
+
+    # Every httplib2.Http has a `credentials` attribute (its own password store),
+    # so only the wrapper type says whether requests are authorized
+    fresh = type(http)(timeout=http.timeout)
+    fresh.redirect_codes = http.redirect_codes
+    return fresh
+
+
+def upload_caption_tracks(youtube, video_id, tracks, default_language="en-US", max_workers=4):
+    """
+    Uploads several caption tracks concurrently through `captions.insert`.
+
+    Args:
+        youtube: The YouTube API client.
+        video_id: The video the tracks belong to.
+        tracks: Dict mapping language code to SRT file path.
+        default_language: The track shown by default.
+        max_workers: Maximum concurrent uploads.
+
+    Returns:
+        Dict mapping language code to the API response, or to the exception raised.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Spans are per thread, so pool threads are tagged with the caller's video
+    video = Logger.current_video()
+
+    def upload(language, srt_file_path):
+        with Logger.phase(f"Caption Upload [{language}]", video=video):
+            return upload_caption(
+                youtube,
+                video_id,
+                srt_file_path,
+                language=language,
+                is_default=language == default_language,
+                http=_new_http(youtube),
+            )
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            language: pool.submit(upload, language, path) for language, path in tracks.items()
+        }
+        for language, future in futures.items():
+            try:
+                results[language] = future.result()
+            except Exception as e:
+                Logger.error(f"Could not upload {language} captions: {e}")
+                results[language] = e
+    return results
 
 
 def verify_caption_status(youtube, video_id):
@@ -158,18 +342,22 @@ def verify_caption_status(youtube, video_id):
         Logger.error(f"Could not verify captions: {e}", exc_info=True)
 
 
-if __name__ == "__main__":
+def main(argv=None):
+    argparse.ArgumentParser(
+        description="Upload a video with its description and captions to YouTube. "
+        "Prompts for the asset folder and the description file."
+    ).parse_args(argv)
+
     # 1. Get the validated asset paths from the user
     # This replaces the hardcoded .mov and .srt strings
-    video_file, cover_file, srt_file_path = get_video_asset_paths()
+    asset_paths = get_video_asset_paths()
 
     # If the user chose to quit ('q'), exit the script gracefully
-    if not video_file:
-        sys.exit(0)
-
-    Logger(log_file_path="automation.log")
+    if not asset_paths:
+        return 0
+    video_file, cover_file, srt_file_path = asset_paths
 
-    Logger.phase("Youtube Upload")
+    Logger(log_file_path="automation.log", trace_file_path="automation_trace.json")
 
     print(
         f"\n{Logger.BOLD}{Logger.INFO}[INPUT]{Logger.ENDC} Enter the path to the description file (or 'q' to quit): ",
@@ -178,22 +366,46 @@ if __name__ == "__main__":
     user_input = input().strip().strip("'").strip('"')
     if user_input.lower() in ["q", "quit"]:
         Logger.info("Exiting workflow.")
-        sys.exit(0)
+        return 0
 
-    path = Path(user_input)
-    description_parts = description_to_list(path)
+    # The OAuth consent also waits on the user, so it stays outside the span too
+    youtube = create_youtube_client()
 
-    title = description_parts[0]
-    description = YOUTUBE_DESCRIPTION.format(
-        synopsis=description_parts[1],
-        thoughts=description_parts[2],
-        hashtags=description_parts[3],
-    )
+    # Time the upload work only, not the wait for input
+    with Logger.phase("Youtube Upload"):
+        path = Path(user_input)
+        description_parts = description_to_list(path)
+
+        title = description_parts[0]
+        description = YOUTUBE_DESCRIPTION.format(
+            synopsis=description_parts[1],
+            thoughts=description_parts[2],
+            hashtags=description_parts[3],
+        )
+
+        # Tags come from the transcript, scored against past descriptions/transcripts
+        table = KeywordTable.load_or_build(KEYWORD_TABLE_PATH, ["shorts_descriptions"])
+        transcript = Path(srt_file_path).read_text(encoding="utf-8", errors="replace")
+        suggestions = suggest_video_tags(
+            table, transcript, title=title, description="\n".join(description_parts[1:])
+        )
+        Logger.info(f"Tags: {', '.join(suggestions['tags'])}")
+        Logger.info(f"Suggested hashtags: {' '.join(suggestions['hashtags'])}")
+
+        upload_video(
+            video_file=video_file,
+            title=title,
+            description=description,
+            tags=suggestions["tags"],
+            srt_file_path=srt_file_path,
+            youtube=youtube,
+        )
+
+        # Count this video so future tags favour what makes each video distinct
+        if table.add_files([path, Path(srt_file_path)], doc_id=Path(video_file).parent.name):
+            table.save(KEYWORD_TABLE_PATH)
+    return 0
 
-    upload_video(
-        video_file=video_file,
-        title=title,
-        description=description,
-        tags=["python", "automation", "api"],
-        srt_file_path=srt_file_path,
-    )
+
+if __name__ == "__main__":
+    sys.exit(main())